@@ -0,0 +1,100 @@
+# 比較 ModelCatalog 從 JSON 與二進位目錄載入的時間與記憶體用量
+# 於專案根目錄執行：
+#     python -m benchmarks.catalog_load                  # 使用模擬的 1000 / 10000 個型號
+#     python -m benchmarks.catalog_load --skus 50000
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from modules.catalog import write_binary_catalog
+
+# 在獨立的行程中載入，避免兩種格式互相影響記憶體用量
+# ru_maxrss 是峰值，匯入模組時的峰值會蓋過載入目錄的增加量，因此讀取 /proc/self/statm 的目前 RSS（僅限 Linux）
+LOADER = """
+import os, sys, time
+from modules.catalog import ModelCatalog
+
+def rss_kb():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') // 1024
+
+before = rss_kb()
+started = time.perf_counter()
+catalog = ModelCatalog(sys.argv[1], binary_path=sys.argv[2])
+elapsed = time.perf_counter() - started
+after = rss_kb()
+print(elapsed, after - before, len(catalog), catalog.mtime[0])
+"""
+
+
+def build_models(skus: int) -> dict:
+    """
+    產生模擬的型號目錄，機型、容量與顏色與實際目錄一樣大量重複。
+
+    Args:
+        skus (int): 型號數量。
+
+    Returns:
+        dict: JSON 格式的型號目錄。
+    """
+    families = ['iphone16', 'iphone16plus', 'iphone16pro', 'iphone16promax']
+    capacities = ['128gb', '256gb', '512gb', '1tb']
+    colors = ['原色鈦金屬', '沙漠色鈦金屬', '白色鈦金屬', '黑色鈦金屬', '群青色', '深青色', '粉紅色', '白色', '黑色']
+    currencies = ['TWD', 'HKD', 'JPY', 'USD']
+    return {
+        f"M{i:05d}ZP/A": {
+            'name': families[i % len(families)],
+            'price': f"{29900 + (i % 40) * 1000}.00",
+            'currency': currencies[i // 1000 % len(currencies)],
+            'capacity': capacities[i // 4 % len(capacities)],
+            'color': colors[i % len(colors)],
+        }
+        for i in range(skus)
+    }
+
+
+def load(json_path: str, binary_path: str) -> tuple:
+    """在子行程中載入目錄，返回 (秒數, RSS 增加量 KB, 型號數量, 實際載入的檔案)。"""
+    output = subprocess.run(
+        [sys.executable, '-c', LOADER, json_path, binary_path],
+        check=True, capture_output=True, text=True, cwd=os.getcwd()
+    ).stdout.split()
+    return float(output[0]), int(output[1]), int(output[2]), output[3]
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.catalog_load', description='型號目錄載入效能比較')
+    parser.add_argument('--skus', type=int, action='append', help='模擬的型號數量，可重複指定（預設 1000 與 10000）')
+    parser.add_argument('--repeat', type=int, default=3, help='每種格式執行次數，取最佳值（預設 3）')
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for skus in args.skus or [1000, 10000]:
+            models = build_models(skus)
+            json_path = os.path.join(tmp, f"models_{skus}.json")
+            binary_path = os.path.join(tmp, f"models_{skus}.bin")
+            with open(json_path, 'w', encoding='utf-8') as f:
+                json.dump(models, f, ensure_ascii=False, indent=4)
+            write_binary_catalog(models, binary_path)
+
+            # 二進位目錄路徑指向不存在的檔案時，ModelCatalog 只會載入 JSON
+            json_runs = [load(json_path, binary_path + '.missing') for _ in range(args.repeat)]
+            binary_runs = [load(json_path, binary_path) for _ in range(args.repeat)]
+            json_time, json_rss = min(run[0] for run in json_runs), min(run[1] for run in json_runs)
+            binary_time, binary_rss = min(run[0] for run in binary_runs), min(run[1] for run in binary_runs)
+            assert binary_runs[0][3] == binary_path and binary_runs[0][2] == skus
+
+            print(f"{skus} 個型號")
+            print(f"  JSON    ：{os.path.getsize(json_path) / 1024:8.0f} KB，"
+                  f"載入 {json_time * 1000:7.1f} ms，RSS +{json_rss} KB")
+            print(f"  二進位  ：{os.path.getsize(binary_path) / 1024:8.0f} KB，"
+                  f"載入 {binary_time * 1000:7.1f} ms，RSS +{binary_rss} KB"
+                  f"（快 {json_time / binary_time:.1f} 倍）")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
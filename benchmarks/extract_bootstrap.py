@@ -0,0 +1,120 @@
+# 比較 PRODUCT_SELECTION_BOOTSTRAP 舊版（BeautifulSoup + json5）與新版（直接掃描原始 HTML）的解析時間
+# 於專案根目錄執行：
+#     python -m benchmarks.extract_bootstrap                          # 使用 benchmarks/fixtures 中已儲存的購買頁面
+#     python -m benchmarks.extract_bootstrap --fixture page.html ...  # 使用其他已儲存的購買頁面
+#     python -m benchmarks.extract_bootstrap --products 200           # 使用產生的模擬頁面
+
+import argparse
+import glob
+import json
+import logging
+import os
+import re
+import time
+from utils.get_iphone_models import IPhoneModelsManager
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures', '*.html')
+
+
+def build_fixture(products: int = 200, filler_scripts: int = 300) -> str:
+    """
+    產生與 Apple 購買頁面結構相近的模擬 HTML：大量無關的 script，加上一段 JS 物件寫法的 productSelectionData。
+
+    Args:
+        products (int): 產品數量。
+        filler_scripts (int): 無關 script 的數量。
+
+    Returns:
+        str: HTML 內容。
+    """
+    colors = ['blacktitanium', 'whitetitanium', 'naturaltitanium', 'deserttitanium']
+    capacities = ['128gb', '256gb', '512gb', '1tb']
+    items, prices = [], []
+    for i in range(products):
+        code = f"M{i:04d}3ZP/A"
+        items.append(
+            f"{{partNumber: '{code}', familyType: 'iphone16pro', dimensionColor: '{colors[i % 4]}', "
+            f"dimensionCapacity: '{capacities[i % 4]}', note: \"含 {{大括號}} 的說明\", tags: ['a', 'b',],}}"
+        )
+        key = code.lower().replace('/', '_')
+        prices.append(f"{key}: {{currentPrice: {{raw_amount: '{36900 + i}.00'}}, priceCurrency: 'TWD'}}")
+    color_values = ", ".join(f"{color}: {{value: '{color} 色'}}" for color in colors)
+    data = (
+        f"{{products: [{', '.join(items)}], "
+        f"displayValues: {{dimensionColor: {{{color_values}}}, prices: {{{', '.join(prices)}}}}},}}"
+    )
+    filler = "".join(
+        f"<script>window.analytics_{i} = {{\"id\": {i}, \"payload\": \"{'x' * 200}\"}};</script>\n"
+        for i in range(filler_scripts)
+    )
+    body = "".join(f"<div class=\"tile\"><p>產品說明 {i}</p></div>\n" for i in range(filler_scripts * 3))
+    bootstrap = f"<script>window.PRODUCT_SELECTION_BOOTSTRAP = {{ productSelectionData: {data} }};</script>\n"
+    return f"<html><head>{filler}</head><body>{body}{bootstrap}</body></html>"
+
+
+def legacy_extract(html_content: str) -> dict:
+    """舊版流程：建立完整 DOM 樹、逐字元堆疊比對大括號、regex 修正後以 json5 解析。"""
+    from bs4 import BeautifulSoup
+    import json5
+
+    for script in BeautifulSoup(html_content, 'html.parser').find_all('script'):
+        content = script.string
+        if content is None or 'window.PRODUCT_SELECTION_BOOTSTRAP' not in content:
+            continue
+        start = content.find('productSelectionData:') + len('productSelectionData:')
+        while content[start] in ' \n\r\t':
+            start += 1
+        stack = []
+        for end in range(start, len(content)):
+            if content[end] == '{':
+                stack.append('{')
+            elif content[end] == '}':
+                stack.pop()
+                if not stack:
+                    break
+        json_str = content[start:end + 1]
+        json_str = re.sub(r'([{,])\s*([a-zA-Z0-9_]+)\s*:', r'\1 "\2":', json_str)
+        json_str = json_str.replace("'", '"')
+        json_str = re.sub(r',(\s*[}\]])', r'\1', json_str)
+        return json5.loads(json_str)
+    return None
+
+
+def measure(func, html_content: str, repeat: int) -> tuple:
+    """執行 repeat 次並返回 (最佳秒數, 結果)。"""
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func(html_content)
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.extract_bootstrap', description='PRODUCT_SELECTION_BOOTSTRAP 解析效能比較')
+    parser.add_argument('--fixture', action='append', help='已儲存的購買頁面 HTML，可重複指定（預設為 benchmarks/fixtures/*.html）')
+    parser.add_argument('--products', type=int, help='改用產生的模擬頁面，並指定產品數量')
+    parser.add_argument('--repeat', type=int, default=5, help='每種方式執行次數，取最佳值（預設 5）')
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING)
+
+    pages = []
+    if args.products:
+        pages.append((f"模擬頁面（{args.products} 個產品）", build_fixture(args.products)))
+    for path in args.fixture or ([] if args.products else sorted(glob.glob(FIXTURES))):
+        with open(path, 'r', encoding='utf-8') as f:
+            pages.append((path, f.read()))
+
+    manager = IPhoneModelsManager(json_path='', url='')
+    for name, html_content in pages:
+        legacy_time, legacy_data = measure(legacy_extract, html_content, args.repeat)
+        fast_time, fast_data = measure(manager.extract_product_selection_bootstrap, html_content, args.repeat)
+        same = json.dumps(legacy_data, sort_keys=True) == json.dumps(fast_data, sort_keys=True)
+        print(f"{name}（{len(html_content) / 1024:.0f} KB）")
+        print(f"  舊版：{legacy_time * 1000:8.1f} ms")
+        print(f"  新版：{fast_time * 1000:8.1f} ms（快 {legacy_time / fast_time:.1f} 倍，結果{'相同' if same else '不同'}）")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,265 @@
+# 本機的模擬 Apple fulfillment-messages 與通知伺服器，供效能測試使用
+# 於專案根目錄執行：
+#     python -m benchmarks.fake_apple --port 8080 --latency 0.05 --throttle-rate 0.01
+#     python -m benchmarks.fake_apple --payload recorded.json --payload recorded2.json
+#     curl http://127.0.0.1:8080/stats  # 取出並歸零請求統計
+
+import argparse
+import copy
+import hashlib
+import json
+import random
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+DEFAULT_PAYLOAD = 'benchmarks/fixtures/fulfillment_tw.json'
+
+
+class FakeAppleServer:
+    """重播錄下的 fulfillment-messages 回應，可設定延遲、錯誤與 429 比例，並接收通知請求。"""
+
+    def __init__(
+        self,
+        payloads: list,
+        host: str = '127.0.0.1',
+        port: int = 0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        retry_after: float = 1,
+        flip_rate: float = 0.0,
+        seed: int = None
+    ):
+        """
+        初始化 FakeAppleServer 實例。
+
+        Args:
+            payloads (list): 錄下的回應（已解析的 JSON），依序輪流重播。
+            host (str): 監聽位址。
+            port (int): 監聽埠號，0 表示自動選擇。
+            latency (float): 每個庫存請求固定的延遲秒數。
+            jitter (float): 額外加上 0 ~ jitter 秒的隨機延遲。
+            error_rate (float): 回應 500 的比例。
+            throttle_rate (float): 回應 429 的比例。
+            retry_after (float): 429 回應的 Retry-After 秒數。
+            flip_rate (float): 每個 (型號, 店鋪) 在每次請求中切換有無現貨的機率，用來產生到貨通知。
+            seed (int): 隨機種子，方便重現結果。
+        """
+        self.payloads = payloads
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.flip_rate = flip_rate
+        self.random = random.Random(seed)
+        self.flipped = set()  # 目前被切換狀態的 (型號, 店鋪編號)
+        self.stats = {'requests': 0, 'not_modified': 0, 'errors': 0, 'throttled': 0, 'notifications': 0}
+        self._index = 0
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        """伺服器網址，可作為 StockChecker 的 base_url。"""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'FakeAppleServer':
+        """在背景執行緒中啟動伺服器。"""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name='fake-apple', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """停止伺服器。"""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def reset_stats(self) -> dict:
+        """
+        取出目前的統計並歸零。
+
+        Returns:
+            dict: 請求、304、錯誤、429 與通知的次數。
+        """
+        with self._lock:
+            stats, self.stats = self.stats, dict.fromkeys(self.stats, 0)
+        return stats
+
+    def build_payload(self, parts: list) -> dict:
+        """
+        依序取出下一個錄下的回應作為範本，產生包含指定型號的回應。
+
+        Args:
+            parts (list): 請求中的型號代碼。
+
+        Returns:
+            dict: 回應 JSON。
+        """
+        with self._lock:
+            template = self.payloads[self._index % len(self.payloads)]
+            self._index += 1
+            if self.flip_rate:
+                for part in parts:
+                    for store in template['body']['content']['pickupMessage']['stores']:
+                        if self.random.random() < self.flip_rate:
+                            self.flipped ^= {(part, store['storeNumber'])}
+            flipped = set(self.flipped)
+        return build_payload(template, parts, flipped)
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass
+
+            def setup(self):
+                super().setup()
+                # 標頭與內容分兩次寫入，關閉 Nagle 以免每個回應多出 delayed ACK 的延遲
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+            def _reply(self, status: int, body: bytes = b'', headers: dict = None) -> None:
+                self.send_response(status)
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                url = urlsplit(self.path)
+                if url.path == '/stats':
+                    self._reply(200, json.dumps(server.reset_stats()).encode('utf-8'), {'Content-Type': 'application/json'})
+                    return
+                if not url.path.endswith('/shop/fulfillment-messages'):
+                    self._reply(404)
+                    return
+                query = parse_qs(url.query)
+                keys = sorted((key for key in query if key.startswith('parts.')), key=lambda k: int(k.split('.')[1]))
+                parts = [query[key][0] for key in keys]
+                delay = server.latency + server.random.uniform(0, server.jitter) if server.jitter else server.latency
+                if delay:
+                    time.sleep(delay)
+                roll = server.random.random()
+                with server._lock:
+                    server.stats['requests'] += 1
+                    if roll < server.throttle_rate:
+                        server.stats['throttled'] += 1
+                    elif roll < server.throttle_rate + server.error_rate:
+                        server.stats['errors'] += 1
+                if roll < server.throttle_rate:
+                    self._reply(429, headers={'Retry-After': f"{server.retry_after:g}"})
+                    return
+                if roll < server.throttle_rate + server.error_rate:
+                    self._reply(500)
+                    return
+                body = json.dumps(server.build_payload(parts), ensure_ascii=False).encode('utf-8')
+                etag = f'"{hashlib.md5(body).hexdigest()}"'
+                if self.headers.get('If-None-Match') == etag:
+                    with server._lock:
+                        server.stats['not_modified'] += 1
+                    self._reply(304, headers={'ETag': etag})
+                    return
+                self._reply(200, body, {'Content-Type': 'application/json', 'ETag': etag})
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                with server._lock:
+                    server.stats['notifications'] += 1
+                self._reply(200, b'{}', {'Content-Type': 'application/json'})
+
+        return Handler
+
+
+def build_payload(template: dict, parts: list, flipped: set = frozenset()) -> dict:
+    """
+    以錄下的回應為範本，產生包含指定型號的回應；範本中沒有的型號沿用範本中的第一個型號。
+
+    Args:
+        template (dict): 錄下的回應。
+        parts (list): 要放入回應的型號代碼。
+        flipped (set): 要反轉有無現貨的 (型號, 店鋪編號)。
+
+    Returns:
+        dict: 回應 JSON。
+    """
+    payload = copy.deepcopy(template)
+    content = payload['body']['content']
+    for store in content['pickupMessage']['stores']:
+        availability = store['partsAvailability']
+        default = next(iter(availability.values()))
+        store['partsAvailability'] = {}
+        for part in parts:
+            entry = copy.copy(availability.get(part, default))
+            entry['partNumber'] = part
+            if (part, store['storeNumber']) in flipped:
+                entry['pickupDisplay'] = 'unavailable' if entry['pickupDisplay'] == 'available' else 'available'
+            store['partsAvailability'][part] = entry
+    delivery = content.get('deliveryMessage', {})
+    if delivery:
+        default = next(iter(delivery.values()))
+        content['deliveryMessage'] = {part: delivery.get(part, default) for part in parts}
+    return payload
+
+
+def load_payloads(paths: list) -> list:
+    """
+    讀取錄下的回應檔案。
+
+    Args:
+        paths (list): JSON 檔案路徑，為空時使用 DEFAULT_PAYLOAD。
+
+    Returns:
+        list: 已解析的回應。
+    """
+    payloads = []
+    for path in paths or [DEFAULT_PAYLOAD]:
+        with open(path, 'r', encoding='utf-8') as f:
+            payloads.append(json.load(f))
+    return payloads
+
+
+def add_server_arguments(parser: argparse.ArgumentParser) -> None:
+    """加入模擬伺服器的共用參數。"""
+    parser.add_argument('--payload', action='append', help=f'錄下的回應 JSON，可重複指定（預設 {DEFAULT_PAYLOAD}）')
+    parser.add_argument('--latency', type=float, default=0.0, help='每個請求的延遲秒數')
+    parser.add_argument('--jitter', type=float, default=0.0, help='額外的隨機延遲上限秒數')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='回應 500 的比例')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='回應 429 的比例')
+    parser.add_argument('--flip-rate', type=float, default=0.0, help='每次請求切換有無現貨的機率')
+    parser.add_argument('--seed', type=int, help='隨機種子')
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.fake_apple', description='模擬 Apple 現貨 API 與通知伺服器')
+    parser.add_argument('--host', default='127.0.0.1', help='監聽位址（預設 127.0.0.1）')
+    parser.add_argument('--port', type=int, default=8080, help='監聽埠號（預設 8080）')
+    add_server_arguments(parser)
+    args = parser.parse_args(argv)
+
+    server = FakeAppleServer(
+        load_payloads(args.payload), host=args.host, port=args.port, latency=args.latency, jitter=args.jitter,
+        error_rate=args.error_rate, throttle_rate=args.throttle_rate, flip_rate=args.flip_rate, seed=args.seed
+    )
+    print(f"模擬伺服器：{server.url}（庫存 /shop/fulfillment-messages，通知 POST 任意路徑，統計 /stats）", flush=True)
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
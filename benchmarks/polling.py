@@ -0,0 +1,176 @@
+# 以模擬的 Apple 伺服器量測 StockChecker 的輪詢效能
+# 於專案根目錄執行：
+#     python -m benchmarks.polling                                   # 1 / 10 / 100 / 1000 個型號
+#     python -m benchmarks.polling --skus 50 --latency 0.05 --throttle-rate 0.02 --cycles 10
+#
+# 模擬伺服器在另一個行程中執行，CPU 時間只計入 StockChecker 本身。
+
+import argparse
+import json
+import logging
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import requests
+from benchmarks.fake_apple import add_server_arguments, build_payload, load_payloads
+from modules.governor import configure_governors
+from modules.notifiers import WebhookNotifier
+from modules.scheduler import AdaptiveScheduler
+from modules.stock import StockChecker
+
+
+def percentile(values: list, pct: float) -> float:
+    """以最近排名法計算百分位數，沒有資料時返回 0。"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered) + 0.5) - 1))]
+
+
+class InstrumentedChecker(StockChecker):
+    """記錄每個請求與每輪檢查耗時的 StockChecker。"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.request_latencies = []
+        self.cycles = []  # [(牆上時間, CPU 時間)]
+        self.cycle_done = threading.Condition()
+
+    def send_request(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return super().send_request(*args, **kwargs)
+        finally:
+            self.request_latencies.append(time.perf_counter() - started)
+
+    def fetch_availability(self, model_codes: list):
+        started, cpu_started = time.perf_counter(), time.process_time()
+        result = super().fetch_availability(model_codes)
+        with self.cycle_done:
+            self.cycles.append((time.perf_counter() - started, time.process_time() - cpu_started))
+            self.cycle_done.notify_all()
+        return result
+
+
+class FakeServerProcess:
+    """在子行程中啟動 benchmarks.fake_apple。"""
+
+    def __init__(self, server_args: list):
+        self.process = subprocess.Popen(
+            [sys.executable, '-m', 'benchmarks.fake_apple', '--port', '0', *server_args],
+            stdout=subprocess.PIPE, text=True
+        )
+        line = self.process.stdout.readline()
+        self.url = line.split('：', 1)[1].split('（', 1)[0].strip()
+
+    def stats(self) -> dict:
+        """取出並歸零伺服器端的請求統計。"""
+        return requests.get(f"{self.url}/stats", timeout=5).json()
+
+    def stop(self) -> None:
+        self.process.terminate()
+        self.process.wait(timeout=5)
+
+
+def make_models(count: int) -> list:
+    """產生 count 個模擬的機型資訊。"""
+    return [
+        {'code': f"B{i:04d}ZP/A", 'model': 'bench', 'price': '0', 'currency': 'TWD', 'capacity': '-', 'color': str(i)}
+        for i in range(count)
+    ]
+
+
+def bench_parse(payloads: list, models: list, repeat: int) -> float:
+    """量測 check_availability 解析一次完整回應的最佳時間（秒）。"""
+    checker = StockChecker('', json_path='', notifiers=[])
+    codes = [model['code'] for model in models]
+    raw = json.dumps(build_payload(payloads[0], codes), ensure_ascii=False)
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        checker.check_availability(json.loads(raw), codes)
+        best = min(best, time.perf_counter() - started)
+    checker.close()
+    return best
+
+
+def bench_single(server: FakeServerProcess, requests_count: int) -> list:
+    """以 request_json_based_on_model 逐一查詢單一型號，返回每個請求的耗時（秒）。"""
+    checker = InstrumentedChecker('', json_path='', notifiers=[], base_url=server.url)
+    for i in range(requests_count):
+        checker.request_json_based_on_model(f"S{i:04d}ZP/A")
+    checker.close()
+    return checker.request_latencies
+
+
+def bench_monitor(server: FakeServerProcess, models: list, cycles: int, batch_size: int) -> tuple:
+    """
+    執行 monitor 直到完成 cycles 輪檢查。
+
+    Returns:
+        tuple: (InstrumentedChecker, 伺服器統計)。
+    """
+    scheduler = AdaptiveScheduler(base_interval=0, min_interval=0, max_interval=0,
+                                  throttle_interval=1, max_throttle_interval=2)
+    checker = InstrumentedChecker(
+        '', json_path='', batch_size=batch_size, scheduler=scheduler, base_url=server.url,
+        notifiers=[WebhookNotifier(f"{server.url}/notify")], summarize_logs=True
+    )
+    server.stats()
+    thread = threading.Thread(target=checker.monitor, args=(models,), daemon=True)
+    thread.start()
+    with checker.cycle_done:
+        checker.cycle_done.wait_for(lambda: len(checker.cycles) >= cycles, timeout=600)
+    checker.stop()
+    thread.join()
+    checker.close()
+    return checker, server.stats()
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.polling', description='StockChecker 輪詢效能測試')
+    parser.add_argument('--skus', type=int, action='append', help='監控的型號數量，可重複指定（預設 1、10、100、1000）')
+    parser.add_argument('--cycles', type=int, default=3, help='每種數量執行幾輪 monitor（預設 3）')
+    parser.add_argument('--batch-size', type=int, default=10, help='每個請求合併查詢的型號數量（預設 10）')
+    parser.add_argument('--rate-limit', type=float, default=10000, help='每秒最多請求數（預設 10000，即幾乎不限制）')
+    parser.add_argument('--single-requests', type=int, default=20, help='request_json_based_on_model 的請求次數（預設 20）')
+    add_server_arguments(parser)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.ERROR)
+
+    server_args = [f"--latency={args.latency}", f"--jitter={args.jitter}", f"--error-rate={args.error_rate}",
+                   f"--throttle-rate={args.throttle_rate}", f"--flip-rate={args.flip_rate}"]
+    server_args += [f"--payload={path}" for path in args.payload or []]
+    if args.seed is not None:
+        server_args.append(f"--seed={args.seed}")
+    # 量測 StockChecker 本身的吞吐量，放寬對 Apple 的速率限制
+    configure_governors(rate=args.rate_limit, burst=max(1, int(args.rate_limit)))
+    payloads = load_payloads(args.payload)
+    server = FakeServerProcess(server_args)
+    try:
+        latencies = bench_single(server, args.single_requests)
+        print(f"request_json_based_on_model：{len(latencies)} 次，"
+              f"p50 {percentile(latencies, 50) * 1000:.1f} ms，p99 {percentile(latencies, 99) * 1000:.1f} ms")
+        print()
+        print(f"{'型號數':>6} {'每輪耗時':>10} {'請求/輪':>8} {'p50':>9} {'p99':>9} {'CPU/型號':>10} {'解析':>9} {'304':>5} {'429':>5} {'錯誤':>5} {'通知':>5}")
+        for count in args.skus or [1, 10, 100, 1000]:
+            models = make_models(count)
+            parse_time = bench_parse(payloads, models, repeat=3)
+            checker, stats = bench_monitor(server, models, args.cycles, args.batch_size)
+            cycles = checker.cycles[:args.cycles]
+            wall = statistics.mean(cycle[0] for cycle in cycles)
+            cpu = sum(cycle[1] for cycle in cycles) / (len(cycles) * count)
+            print(f"{count:>9} {wall * 1000:>10.1f}ms {stats['requests'] / len(cycles):>11.1f} "
+                  f"{percentile(checker.request_latencies, 50) * 1000:>7.1f}ms "
+                  f"{percentile(checker.request_latencies, 99) * 1000:>7.1f}ms "
+                  f"{cpu * 1e6:>9.0f}µs {parse_time * 1000:>8.2f}ms "
+                  f"{stats['not_modified']:>5} {stats['throttled']:>5} {stats['errors']:>7} {stats['notifications']:>7}")
+    finally:
+        server.stop()
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -1,23 +1,25 @@
-import os
+import asyncio
 import logging
+import sqlite3
 import tkinter as tk
 from tkinter import messagebox, ttk
-import threading
 from multiprocessing import freeze_support
-from modules import StockChecker, TextHandler
-
-# 確保 log 資料夾存在
-os.makedirs('log', exist_ok=True)
-
-# 設置日誌，寫入 log/app.log
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("log/app.log", encoding='utf-8'),
-        logging.StreamHandler()
-    ]
+from modules import (
+    AsyncStockChecker, AvailabilityHistory, AvailabilityStateStore, ModelCatalog, TextHandler, create_notifier,
+    setup_logging
 )
+from modules.dashboard import AvailabilityBoard, StatsPanel
+
+# 設置日誌，由背景執行緒寫入 log/app.log（超過 5MB 時輪替並壓縮）
+setup_logging("log/app.log")
+
+# 介面上可選的通知方式：{類型: (顯示名稱, 輸入框對應的 create_notifier 參數)}
+NOTIFIER_CHOICES = {
+    'line': ("LINE Notify", 'token'),
+    'webhook': ("Webhook（Discord/Slack）", 'url'),
+    'telegram': ("Telegram", 'bot_token'),
+}
+
 
 class App:
     """負責建立和管理應用程式 GUI 的類別。"""
@@ -28,9 +30,15 @@ class App:
         self.notebook = self.create_notebook(self.root)  # 創建 Notebook 容器，作為頁籤
         self.models = []  # 存儲機型資訊的列表
         self.device_var = tk.StringVar()  # 用於存儲選擇的機型的變數
-        self.token_var = tk.StringVar()  # 用於存儲 Line Notify Token 的變數
+        self.token_var = tk.StringVar()  # 通知用的 token 或 webhook 網址
+        self.notifier_var = tk.StringVar(value=NOTIFIER_CHOICES['line'][0])  # 選擇的通知方式（顯示名稱）
+        self.chat_id_var = tk.StringVar()  # Telegram 的 chat id
         self.stock_checker = None  # 將在開始監控時初始化
+        self.monitor_task = None  # 背景監控的 asyncio Task
+        self.history = None  # 開始監控時開啟的現貨歷史紀錄
+        self.loop = asyncio.new_event_loop()  # 由 Tk 主迴圈驅動的事件迴圈
         self.json_path = "resources/iphone_models.json"  # 請將此路徑修改為你的 JSON 檔案路徑
+        self.catalog = ModelCatalog(self.json_path)  # 啟動時載入一次型號目錄
 
         # 建立頁面
         self.main_page = self.create_main_page(self.notebook)  # 主頁面
@@ -44,6 +52,9 @@ class App:
             self.models
         )
 
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.pump_event_loop()
+
     def create_root_window(self) -> tk.Tk:
         """
         創建主視窗。
@@ -109,8 +120,15 @@ class App:
         """
         page = ttk.Frame(notebook)
         notebook.add(page, text='監控')
-        self.log_text = tk.Text(page, state='disabled', wrap='word')
-        self.log_text.pack(fill='both', expand=True)
+        # 上方為現貨看板，中間為統計面板，兩者都在開始監控後才建立；下方為日誌
+        self.board_container = ttk.Frame(page)
+        self.board_container.pack(fill='both', expand=True)
+        self.board = None
+        self.stats_container = ttk.Frame(page)
+        self.stats_container.pack(fill='x')
+        self.stats_panel = None
+        self.log_text = tk.Text(page, state='disabled', wrap='word', height=10)
+        self.log_text.pack(fill='both')
         return page
 
     def setup_main_page(
@@ -126,17 +144,34 @@ class App:
         Args:
             page (ttk.Frame): 主頁面的 Frame 物件。
             device_var (tk.StringVar): 用於存儲選擇的機型的變數。
-            token_var (tk.StringVar): 用於存儲 Line Notify Token 的變數。
+            token_var (tk.StringVar): 通知用的 token 或 webhook 網址。
             models (list): 存儲機型資訊的列表。
         """
         # 創建內框架以增加間距
         inner_frame = ttk.Frame(page, padding=20)
         inner_frame.pack(fill='both', expand=True)
 
-        # Line Token 輸入
-        tk.Label(inner_frame, text="Line Notify Token：", font=("Arial", 12, 'bold')).grid(row=0, column=0, sticky='w', pady=(0, 10))
-        token_entry = ttk.Entry(inner_frame, textvariable=token_var, width=50, show="*")
-        token_entry.grid(row=0, column=1, sticky='w', pady=(0, 10))
+        # 通知方式與 token / webhook 網址輸入，Telegram 另外需要 chat id
+        tk.Label(inner_frame, text="通知方式：", font=("Arial", 12, 'bold')).grid(row=0, column=0, sticky='w', pady=(0, 10))
+        notifier_frame = ttk.Frame(inner_frame)
+        notifier_frame.grid(row=0, column=1, sticky='w', pady=(0, 10))
+        notifier_combo = ttk.Combobox(
+            notifier_frame, textvariable=self.notifier_var, state='readonly', width=22,
+            values=[label for label, _ in NOTIFIER_CHOICES.values()]
+        )
+        notifier_combo.pack(side='left')
+        token_entry = ttk.Entry(notifier_frame, textvariable=token_var, width=36, show="*")
+        token_entry.pack(side='left', padx=5)
+        chat_id_entry = ttk.Entry(notifier_frame, textvariable=self.chat_id_var, width=14)
+        chat_id_entry.pack(side='left')
+
+        def on_notifier_selected(event=None):
+            kind = self.notifier_kind()
+            token_entry.config(show="" if kind == 'webhook' else "*")  # webhook 網址不需要遮蔽
+            chat_id_entry.config(state=tk.NORMAL if kind == 'telegram' else tk.DISABLED)
+
+        notifier_combo.bind('<<ComboboxSelected>>', on_notifier_selected)
+        on_notifier_selected()
 
         # 機型選擇標籤
         tk.Label(inner_frame, text="請選擇機型：", font=("Arial", 12, 'bold')).grid(row=1, column=0, sticky='w')
@@ -187,8 +222,36 @@ class App:
         # 儲存按鈕和輸入框，以便在監控開始後禁用
         self.start_button = start_button
         self.token_entry = token_entry
+        self.notifier_combo = notifier_combo
+        self.chat_id_entry = chat_id_entry
         self.device_frame = device_frame
 
+    def notifier_kind(self) -> str:
+        """
+        取得目前選擇的通知類型。
+
+        Returns:
+            str: NOTIFIER_CHOICES 的鍵，例如 'webhook'。
+        """
+        label = self.notifier_var.get()
+        return next((kind for kind, (text, _) in NOTIFIER_CHOICES.items() if text == label), 'line')
+
+    def notifier_config(self, token: str) -> dict:
+        """
+        依介面上的選擇組出 create_notifier 的設定。
+
+        Args:
+            token (str): token 或 webhook 網址。
+
+        Returns:
+            dict: 通知設定，例如 {"type": "telegram", "bot_token": "...", "chat_id": "..."}。
+        """
+        kind = self.notifier_kind()
+        config = {'type': kind, NOTIFIER_CHOICES[kind][1]: token}
+        if kind == 'telegram':
+            config['chat_id'] = self.chat_id_var.get().strip()
+        return config
+
     def on_device_selected(self):
         """
         當選擇機型時載入相應的型號。
@@ -203,23 +266,23 @@ class App:
         for item in self.model_tree.get_children():
             self.model_tree.delete(item)
 
-        # 使用 StockChecker 來載入模型
-        checker = StockChecker(token="", json_path=self.json_path)
-        loaded_models = checker.get_product_models(selected_device)
+        # 從型號目錄載入模型，JSON 檔案有更新時才重新讀取
+        self.catalog.reload_if_changed()
+        loaded_models = self.catalog.family(selected_device)
         if not loaded_models:
             messagebox.showerror("錯誤", "無法載入型號資訊。")
             return
 
-        self.models = loaded_models
+        self.models = list(loaded_models)
 
-        # 顯示模型選項，讓使用者選擇
+        # 顯示模型選項，讓使用者選擇；以型號代碼作為列的 iid，方便之後直接查詢
         for model in self.models:
-            self.model_tree.insert("", "end", values=(
-                model['model'],
-                f"{model['currency']} {model['price']}",
-                model['color'],
-                model['capacity'],
-                model['code']
+            self.model_tree.insert("", "end", iid=model.code, values=(
+                model.name,
+                f"{model.currency} {model.price}",
+                model.color,
+                model.capacity,
+                model.code
             ))
 
     def start_monitoring(
@@ -233,13 +296,17 @@ class App:
         開始監控庫存狀態。
 
         Args:
-            token (str): Line Notify Token。
+            token (str): 所選通知方式的 token 或 webhook 網址。
             models (list): 存儲機型資訊的列表。
             model_tree (ttk.Treeview): 型號列表的 Treeview 物件。
             start_button (ttk.Button): 開始監控按鈕。
         """
         if not token:
-            messagebox.showwarning("警告", "請輸入 Token")
+            messagebox.showwarning("警告", "請輸入 Token 或 Webhook 網址")
+            return
+        notifier_config = self.notifier_config(token.strip())
+        if notifier_config['type'] == 'telegram' and not notifier_config['chat_id']:
+            messagebox.showwarning("警告", "請輸入 Telegram chat id")
             return
 
         selected_items = model_tree.selection()
@@ -250,6 +317,8 @@ class App:
         # 禁用按鈕和輸入框
         start_button.config(state=tk.DISABLED)
         self.token_entry.config(state=tk.DISABLED)
+        self.notifier_combo.config(state=tk.DISABLED)
+        self.chat_id_entry.config(state=tk.DISABLED)
         for child in self.device_frame.winfo_children():
             child.config(state=tk.DISABLED)
 
@@ -257,33 +326,100 @@ class App:
         # 收集選擇的型號資訊
         selected_models = []
         for item in selected_items:
-            item_values = model_tree.item(item, 'values')
-            model_dict = next((model for model in models if model['code'] == item_values[4]), None)
-            if model_dict:
-                selected_models.append(model_dict)
+            record = self.catalog.get(item)
+            if record:
+                selected_models.append(record.to_dict())
 
         if not selected_models:
             messagebox.showwarning("警告", "未選擇任何有效的手機型號")
             start_button.config(state=tk.NORMAL)
             return
 
-        # 初始化 StockChecker 實例
-        self.stock_checker = StockChecker(token=token, json_path=self.json_path)
+        # 初始化 AsyncStockChecker 實例
+        self.stock_checker = AsyncStockChecker(
+            token='',
+            json_path=self.json_path,
+            notifiers=[create_notifier(notifier_config)],
+            catalog=self.catalog,
+            state_store=AvailabilityStateStore("log/availability_state.json")  # 重新啟動後不會重複通知
+        )
 
         # 設置日誌處理器
-        text_handler = TextHandler(self.log_text)
+        text_handler = TextHandler(self.log_text, max_lines=2000, flush_interval=250)
         formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
         text_handler.setFormatter(formatter)
         logging.getLogger().addHandler(text_handler)
 
+        # 建立現貨看板，每輪檢查結果只更新有變化的儲存格
+        self.board = AvailabilityBoard(self.board_container, selected_models)
+        self.board.pack(fill='both', expand=True)
+        self.stock_checker.result_listeners.append(self.board.submit)
+
+        # 統計面板：請求延遲、解析時間、每輪耗時與通知延遲
+        if self.stats_panel:
+            self.stats_panel.destroy()
+        self.stats_panel = StatsPanel(self.stats_container, self.stock_checker.metrics)
+        self.stats_panel.pack(fill='x', pady=4)
+
+        # 每輪檢查結果寫入歷史紀錄，可用 python -m modules.history 查詢
+        self.history = AvailabilityHistory("log/history.sqlite3")
+        self.stock_checker.result_listeners.append(self.history.record)
+        # 以過去的到貨時段調整檢查頻率：常到貨的時段檢查得更頻繁，冷門時段放慢；在背景執行緒載入，不阻塞介面
+        self.loop.run_in_executor(
+            None, self.fit_predictor, self.history, self.stock_checker.predictor,
+            [model['code'] for model in selected_models]
+        )
+
         # 跳轉到監控頁面
         self.notebook.select(self.monitoring_page)
 
         # 開始監控
-        def monitor():
-            self.stock_checker.monitor(selected_models)
+        self.monitor_task = self.loop.create_task(self.stock_checker.run(selected_models))
+
+    @staticmethod
+    def fit_predictor(history: AvailabilityHistory, predictor, parts: list) -> None:
+        """
+        在背景執行緒補齊歷史紀錄的狀態變化並載入到貨時段，尚未載入完成前以預設頻率檢查。
 
-        threading.Thread(target=monitor, daemon=True).start()
+        Args:
+            history (AvailabilityHistory): 現貨歷史紀錄。
+            predictor (RestockPredictor): 要載入的到貨時段預測器。
+            parts (list): 型號代碼。
+        """
+        try:
+            history.backfill_transitions()
+            predictor.fit(history, parts)
+        except sqlite3.Error as e:  # 監控已停止、資料庫已關閉
+            logging.warning(f"載入到貨歷史紀錄失敗：{e}")
+
+    def pump_event_loop(self) -> None:
+        """執行一輪 asyncio 事件迴圈，並排程下一次執行，讓監控 Task 與 Tk 共用主執行緒。"""
+        self.loop.call_soon(self.loop.stop)
+        self.loop.run_forever()
+        self.root.after(50, self.pump_event_loop)
+
+    def stop_monitoring(self) -> None:
+        """取消背景監控 Task 並釋放連線。"""
+        if self.monitor_task and not self.monitor_task.done():
+            self.monitor_task.cancel()
+            try:
+                self.loop.run_until_complete(self.monitor_task)
+            except asyncio.CancelledError:
+                pass
+        self.monitor_task = None
+        if self.stock_checker:
+            self.stock_checker.close()
+            self.stock_checker = None
+        if self.history:
+            self.history.close()
+            self.history = None
+
+    def on_close(self) -> None:
+        """關閉視窗時停止監控並結束事件迴圈。"""
+        self.stop_monitoring()
+        self.loop.run_until_complete(self.loop.shutdown_default_executor())
+        self.loop.close()
+        self.root.destroy()
 
     def run(self) -> None:
         """啟動應用程式的主迴圈。"""
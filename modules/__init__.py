@@ -1,4 +1,29 @@
 from .stock import StockChecker
-from .logger import TextHandler
+from .async_stock import AsyncStockChecker
+from .availability import AvailabilityResult, StoreAvailability
+from .state import AvailabilityStateStore, AvailabilityEvent
+from .catalog import ModelCatalog, ModelRecord
+from .history import AvailabilityHistory
+from .predictor import RestockPredictor
+from .targets import WatchTarget
+from .notifiers import (
+    Notifier, LineNotifier, WebhookNotifier, TelegramNotifier, SmtpNotifier, FileNotifier, create_notifier
+)
+from .service import Subscription, SubscriptionRegistry, MonitorService
+from .logger import TextHandler, setup_logging
+from .metrics import MetricsRegistry, MonitorMetrics, get_registry, start_metrics_server
+from .governor import CircuitBreaker, HostGovernor, TokenBucket, configure_governors, get_host_governor
 
-__all__ = ['StockChecker', 'TextHandler']
\ No newline at end of file
+__all__ = [
+    'StockChecker', 'AsyncStockChecker',
+    'AvailabilityResult', 'StoreAvailability', 'AvailabilityStateStore', 'AvailabilityEvent',
+    'AvailabilityHistory', 'RestockPredictor',
+    'ModelCatalog', 'ModelRecord',
+    'WatchTarget',
+    'Notifier', 'LineNotifier', 'WebhookNotifier', 'TelegramNotifier', 'SmtpNotifier', 'FileNotifier',
+    'create_notifier',
+    'Subscription', 'SubscriptionRegistry', 'MonitorService',
+    'TextHandler', 'setup_logging',
+    'MetricsRegistry', 'MonitorMetrics', 'get_registry', 'start_metrics_server',
+    'TokenBucket', 'CircuitBreaker', 'HostGovernor', 'configure_governors', 'get_host_governor',
+]
@@ -0,0 +1,73 @@
+import asyncio
+import logging
+import time
+from .availability import AvailabilityResult
+from .stock import StockChecker
+from .targets import WatchTarget, plan_queries
+
+
+class AsyncStockChecker(StockChecker):
+    """以 asyncio 同時查詢多批型號庫存的 StockChecker。"""
+
+    def __init__(
+        self,
+        token: str,
+        json_path: str,
+        max_concurrency: int = 4,
+        **kwargs
+    ):
+        """
+        初始化 AsyncStockChecker 實例。
+
+        Args:
+            token (str): 用於發送通知的 Line Notify Token。
+            json_path (str): 本地 JSON 檔案的路徑。
+            max_concurrency (int): 同時進行中的請求數量上限，請求速率由主機共用的 HostGovernor 限制。
+            **kwargs: 其餘傳給 StockChecker 的參數。
+        """
+        kwargs.setdefault('pool_size', max_concurrency)
+        super().__init__(token, json_path, **kwargs)
+        self.max_concurrency = max(1, max_concurrency)
+
+    async def fetch_availability_async(self, model_codes: list) -> AvailabilityResult:
+        """
+        fetch_availability 的 asyncio 版本：依監控目標將型號分組分批後同時請求，並彙整每個型號在各店鋪的取貨狀態。
+
+        Args:
+            model_codes (list): 要查詢的機型代碼列表。
+
+        Returns:
+            AvailabilityResult: 合併後的結果，請求失敗的型號不會出現在結果中。
+        """
+        started = time.monotonic()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def fetch_batch(query: WatchTarget) -> AvailabilityResult:
+            # send_request 在背景執行緒中取得 governor 的 token，與同步版本共用同一個速率限制與斷路器
+            async with semaphore:
+                return await asyncio.to_thread(self.fetch_query, query)
+
+        queries = plan_queries(model_codes, self.targets, self.batch_size)
+        result = AvailabilityResult()
+        for batch_result in await asyncio.gather(*(fetch_batch(query) for query in queries)):
+            result.merge(batch_result)
+        self.record_schedule(model_codes, result)
+        self.metrics.cycle_seconds.observe(time.monotonic() - started)
+        return result
+
+    async def run(self, selected_models: list) -> None:
+        """
+        monitor 的 asyncio 版本：開始監控選定的機型庫存狀態，可透過取消 Task 停止。
+
+        Args:
+            selected_models (list): 要監控的機型資訊列表。
+        """
+        models_by_code = self.start_monitor(selected_models)
+        try:
+            while True:
+                due_codes = self.scheduler.due(lookahead=self.scheduler.min_interval)
+                availability = await self.fetch_availability_async(due_codes) if due_codes else None
+                await asyncio.sleep(self.finish_cycle(models_by_code, due_codes, availability))
+        except asyncio.CancelledError:
+            logging.info("監控已停止。")
+            raise
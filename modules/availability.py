@@ -0,0 +1,180 @@
+import hashlib
+import json
+from dataclasses import dataclass, field
+
+
+@dataclass(frozen=True)
+class StoreAvailability:
+    """單一型號在單一店鋪的取貨狀態。"""
+
+    store_number: str
+    store_name: str
+    pickup_display: str
+    quote: str = None
+
+    @property
+    def available(self) -> bool:
+        """是否可到店取貨。"""
+        return self.pickup_display == 'available'
+
+
+@dataclass
+class AvailabilityResult:
+    """一次或多次 fulfillment-messages 回應整理出的 型號 → 店鋪 → 取貨狀態 索引。"""
+
+    parts: dict = field(default_factory=dict)  # {型號代碼: {店鋪名稱: StoreAvailability}}
+    delivery: dict = field(default_factory=dict)  # {型號代碼: 原始宅配訊息}
+    checked_at: dict = field(default_factory=dict)  # {型號代碼: 檢查時間（epoch 秒）}
+    latency: dict = field(default_factory=dict)  # {型號代碼: 請求耗時（秒）}
+    sources: dict = field(default_factory=dict)  # {WatchTarget.query_key: {型號代碼: {店鋪名稱, ...}}}
+
+    @classmethod
+    def from_json(cls, json_data: dict, model_codes: list = None, query_key: tuple = None) -> 'AvailabilityResult':
+        """
+        走訪一次 stores 陣列建立索引，支援 PickupMessage 與 content.pickupMessage 兩種格式。
+
+        Args:
+            json_data (dict): 從 API 獲取的 JSON 資料。
+            model_codes (list): 只保留這些型號，為 None 時保留回應中的所有型號。
+            query_key (tuple): 此回應對應的 WatchTarget.query_key，提供時記錄各店鋪來自哪個查詢。
+
+        Returns:
+            AvailabilityResult: 整理後的結果，model_codes 中沒有出現在回應的型號對應空字典。
+        """
+        result = cls(parts={code: {} for code in model_codes or []})
+        wanted = set(model_codes) if model_codes is not None else None
+        body = json_data.get('body', {})
+        content = body.get('content', {})
+        stores = body.get('PickupMessage', {}).get('stores', []) or content.get('pickupMessage', {}).get('stores', [])
+        for store in stores:
+            store_name = store.get('storeName')
+            store_number = store.get('storeNumber')
+            for part_number, part_info in store.get('partsAvailability', {}).items():
+                if wanted is not None and part_number not in wanted:
+                    continue
+                result.parts.setdefault(part_number, {})[store_name] = StoreAvailability(
+                    store_number=store_number,
+                    store_name=store_name,
+                    pickup_display=part_info.get('pickupDisplay'),
+                    quote=part_info.get('pickupSearchQuote'),
+                )
+        for part_number, message in content.get('deliveryMessage', {}).items():
+            if part_number in result.parts:
+                result.delivery[part_number] = message
+        if query_key is not None:
+            result.sources[query_key] = {part: set(stores) for part, stores in result.parts.items()}
+        return result
+
+    def merge(self, other: 'AvailabilityResult') -> None:
+        """
+        合併另一批請求的結果。
+
+        Args:
+            other (AvailabilityResult): 要合併的結果。
+        """
+        for part, stores in other.parts.items():
+            self.parts.setdefault(part, {}).update(stores)
+        self.delivery.update(other.delivery)
+        for part, checked_at in other.checked_at.items():
+            self.checked_at[part] = max(checked_at, self.checked_at.get(part, 0.0))
+        for part, latency in other.latency.items():
+            # 同一型號出現在多個請求時，以最慢的請求為準
+            self.latency[part] = max(latency, self.latency.get(part, 0.0))
+        for query_key, parts in other.sources.items():
+            for part, stores in parts.items():
+                self.sources.setdefault(query_key, {}).setdefault(part, set()).update(stores)
+
+    def stamp(self, latency: float, checked_at: float) -> None:
+        """
+        記錄此結果中所有型號的檢查時間與請求耗時。
+
+        Args:
+            latency (float): 請求耗時（秒）。
+            checked_at (float): 檢查時間（epoch 秒）。
+        """
+        for part in self.parts:
+            self.latency[part] = latency
+            self.checked_at[part] = checked_at
+
+    def copy(self) -> 'AvailabilityResult':
+        """
+        複製一份結果，之後 merge 或 stamp 不會影響原本的結果。
+
+        Returns:
+            AvailabilityResult: 複製的結果。
+        """
+        return AvailabilityResult(
+            parts={part: dict(stores) for part, stores in self.parts.items()},
+            delivery=dict(self.delivery),
+            checked_at=dict(self.checked_at),
+            latency=dict(self.latency),
+            sources={key: {part: set(stores) for part, stores in parts.items()} for key, parts in self.sources.items()},
+        )
+
+    def __contains__(self, part: str) -> bool:
+        return part in self.parts
+
+    def stores(self, part: str) -> dict:
+        """
+        取得某型號在各店鋪的取貨狀態。
+
+        Args:
+            part (str): 型號代碼。
+
+        Returns:
+            dict: {店鋪名稱: StoreAvailability}。
+        """
+        return self.parts.get(part, {})
+
+    def earliest_check(self, parts) -> float:
+        """
+        取得指定型號中最早的檢查時間，用來計算到貨偵測延遲。
+
+        Args:
+            parts: 型號代碼，例如本輪開始有現貨的型號。
+
+        Returns:
+            float: 檢查時間（epoch 秒），沒有任何檢查時間時返回 None。
+        """
+        return min((self.checked_at[part] for part in parts if part in self.checked_at), default=None)
+
+    def checked_stores(self, part: str, query_key: tuple = None) -> list:
+        """
+        取得某型號實際查詢成功的店鋪名稱；請求失敗的地區或店鋪不會出現在結果中。
+
+        Args:
+            part (str): 型號代碼。
+            query_key (tuple): 只取這個查詢（WatchTarget.query_key）回應的店鋪，為 None 時不限制。
+
+        Returns:
+            list: 店鋪名稱列表。
+        """
+        if query_key is None:
+            return list(self.stores(part))
+        return [name for name in self.stores(part) if name in self.sources.get(query_key, {}).get(part, ())]
+
+    def available_stores(self, part: str) -> list:
+        """
+        取得某型號有現貨的店鋪名稱。
+
+        Args:
+            part (str): 型號代碼。
+
+        Returns:
+            list: 店鋪名稱列表，依回應中的順序排列。
+        """
+        return [name for name, status in self.stores(part).items() if status.available]
+
+    def signature(self, part: str) -> str:
+        """
+        計算某型號的狀態指紋，涵蓋各店鋪的取貨狀態、取貨時間與宅配訊息。
+
+        Args:
+            part (str): 型號代碼。
+
+        Returns:
+            str: 指紋字串，狀態有任何變化時會不同。
+        """
+        state = sorted((s.store_number or '', s.pickup_display or '', s.quote or '') for s in self.stores(part).values())
+        raw = json.dumps([state, self.delivery.get(part)], sort_keys=True, ensure_ascii=False)
+        return hashlib.md5(raw.encode('utf-8')).hexdigest()
@@ -0,0 +1,302 @@
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+from dataclasses import dataclass
+from decimal import Decimal, InvalidOperation
+
+# 預先編譯的二進位目錄格式（little-endian，不使用 pickle）：
+#   檔頭     magic, 版本, 字串數量, 型號數量
+#   字串表   (字串數量 + 1) 個 uint32 位移，接著是所有字串的 UTF-8 內容
+#   型號     每個型號固定長度：代碼、名稱、貨幣、容量、顏色的字串編號，以及以「分」為單位的 int64 價格
+BINARY_MAGIC = b'IPMC'
+BINARY_VERSION = 1
+HEADER = struct.Struct('<4sHxxII')
+RECORD = struct.Struct('<IIIIIq')
+OFFSET = struct.Struct('<I')
+
+
+def price_to_cents(price) -> int:
+    """
+    將價格字串轉成以「分」為單位的整數。
+
+    Args:
+        price: 價格，例如 "44900.00"。
+
+    Returns:
+        int: 價格（分），例如 4490000。
+
+    Raises:
+        ValueError: 價格無法解析。
+    """
+    try:
+        return int(Decimal(str(price)).scaleb(2).to_integral_exact())
+    except (InvalidOperation, ValueError) as e:
+        raise ValueError(f"無法轉換價格：{price!r}") from e
+
+
+def cents_to_price(cents: int) -> str:
+    """
+    將以「分」為單位的整數轉回 JSON 目錄使用的價格字串。
+
+    Args:
+        cents (int): 價格（分）。
+
+    Returns:
+        str: 價格字串，例如 "44900.00"。
+    """
+    sign = '-' if cents < 0 else ''
+    return f"{sign}{abs(cents) // 100}.{abs(cents) % 100:02d}"
+
+
+def write_binary_catalog(models: dict, path: str) -> None:
+    """
+    將 JSON 格式的型號目錄編譯成二進位目錄，重複的字串只儲存一次。
+
+    Args:
+        models (dict): {型號代碼: {'name', 'price', 'currency', 'capacity', 'color'}}。
+        path (str): 輸出檔案路徑，先寫入暫存檔再取代。
+
+    Raises:
+        ValueError: 價格無法轉換成整數。
+    """
+    strings = {}  # {字串: 編號}
+
+    def intern(value: str) -> int:
+        return strings.setdefault(value, len(strings))
+
+    records = [
+        RECORD.pack(intern(code), intern(info['name']), intern(info['currency']),
+                    intern(info['capacity']), intern(info['color']), price_to_cents(info['price']))
+        for code, info in models.items()
+    ]
+    encoded = [value.encode('utf-8') for value in strings]
+    offsets, position = [], 0
+    for data in encoded:
+        offsets.append(position)
+        position += len(data)
+    offsets.append(position)
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(BINARY_MAGIC, BINARY_VERSION, len(encoded), len(records)))
+        f.write(b''.join(OFFSET.pack(offset) for offset in offsets))
+        f.write(b''.join(encoded))
+        f.write(b''.join(records))
+    os.replace(tmp_path, path)
+
+
+def read_binary_catalog(path: str) -> list:
+    """
+    以 mmap 讀取二進位目錄，每個字串只解碼一次並由所有型號共用。
+
+    Args:
+        path (str): 二進位目錄路徑。
+
+    Returns:
+        list: ModelRecord 列表。
+
+    Raises:
+        ValueError: 檔案格式或版本不符，或內容損毀（位移或字串編號超出範圍）。
+    """
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        if len(data) < HEADER.size:
+            raise ValueError("二進位目錄檔案不完整")
+        magic, version, string_count, record_count = HEADER.unpack_from(data, 0)
+        if magic != BINARY_MAGIC or version != BINARY_VERSION:
+            raise ValueError(f"不支援的二進位目錄格式：{magic!r} v{version}")
+        position = HEADER.size
+        if len(data) < position + OFFSET.size * (string_count + 1):
+            raise ValueError("二進位目錄檔案不完整")
+        offsets = struct.unpack_from(f'<{string_count + 1}I', data, position)
+        position += OFFSET.size * (string_count + 1)
+        blob = position
+        if offsets[0] != 0 or any(a > b for a, b in zip(offsets, offsets[1:])) or blob + offsets[-1] > len(data):
+            raise ValueError("二進位目錄的字串表損毀")
+        strings = [str(data[blob + offsets[i]:blob + offsets[i + 1]], 'utf-8') for i in range(string_count)]
+        position = blob + offsets[-1]
+        if len(data) < position + RECORD.size * record_count:
+            raise ValueError("二進位目錄檔案不完整")
+        prices = {}  # {價格（分）: 價格字串}，同一價格只格式化一次
+        records = []
+        for code, name, currency, capacity, color, cents in RECORD.iter_unpack(
+                data[position:position + RECORD.size * record_count]):
+            if max(code, name, currency, capacity, color) >= string_count:
+                raise ValueError("二進位目錄的字串編號超出範圍")
+            price = prices.get(cents)
+            if price is None:
+                price = prices[cents] = cents_to_price(cents)
+            records.append(ModelRecord(strings[code], strings[name], price, strings[currency],
+                                       strings[capacity], strings[color]))
+        return records
+
+
+@dataclass(frozen=True, slots=True)
+class ModelRecord:
+    """型號目錄中的單一機型。"""
+
+    code: str
+    name: str
+    price: str
+    currency: str
+    capacity: str
+    color: str
+
+    def to_dict(self) -> dict:
+        """
+        轉換成監控流程使用的機型字典。
+
+        Returns:
+            dict: 包含 code、model、price、currency、capacity、color 的字典。
+        """
+        return {
+            'code': self.code,
+            'model': self.name,
+            'price': self.price,
+            'currency': self.currency,
+            'capacity': self.capacity,
+            'color': self.color
+        }
+
+
+class ModelCatalog:
+    """載入一次的型號目錄，預先建立依機型、容量、顏色與型號代碼的索引。"""
+
+    def __init__(self, json_path: str, binary_path: str = None):
+        """
+        初始化 ModelCatalog 實例並載入型號目錄。
+
+        Args:
+            json_path (str): 型號 JSON 檔案的路徑。
+            binary_path (str): 預先編譯的二進位目錄路徑，預設為 json_path 副檔名換成 .bin。
+                比 JSON 新時優先載入，不存在、過期或損毀時改用 JSON。
+        """
+        self.json_path = json_path
+        self.binary_path = binary_path or f"{os.path.splitext(json_path)[0]}.bin"
+        self.mtime = None  # (載入的檔案路徑, 修改時間)
+        self._invalid_binary = None  # 讀取失敗的 (二進位目錄路徑, 修改時間)，避免重複嘗試
+        self.by_code = {}  # {型號代碼: ModelRecord}
+        self.by_name = {}  # {機型名稱: (ModelRecord, ...)}，依顏色排序
+        self.by_capacity = {}  # {容量: (ModelRecord, ...)}
+        self.by_color = {}  # {顏色: (ModelRecord, ...)}
+        self._lock = threading.Lock()
+        self.reload_if_changed()
+
+    def _stat(self, path: str) -> int:
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    def reload_if_changed(self) -> bool:
+        """
+        檔案的修改時間有變化時才重新載入。
+
+        Returns:
+            bool: 是否重新載入。
+        """
+        json_mtime = self._stat(self.json_path)
+        binary_mtime = self._stat(self.binary_path)
+        with self._lock:
+            binary_key = (self.binary_path, binary_mtime)
+            if (binary_mtime is not None and binary_key != self._invalid_binary
+                    and (json_mtime is None or binary_mtime >= json_mtime)):
+                if binary_key == self.mtime:
+                    return False
+                try:
+                    self._index(read_binary_catalog(self.binary_path))
+                    self.mtime = binary_key
+                    logging.info(f"已從二進位目錄載入 {len(self.by_code)} 個型號。")
+                    return True
+                except (OSError, ValueError, IndexError, struct.error) as e:
+                    self._invalid_binary = binary_key
+                    logging.warning(f"讀取二進位目錄失敗，改用 JSON 檔案：{e}")
+            if json_mtime is None:
+                logging.error(f"讀取型號檔案失敗：找不到 {self.json_path}")
+                return False
+            if (self.json_path, json_mtime) == self.mtime:
+                return False
+            try:
+                with open(self.json_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                self._build_indexes(data)
+            except (OSError, ValueError, KeyError) as e:
+                logging.error(f"從 JSON 檔案中提取機型資訊失敗：{e}")
+                return False
+            self.mtime = (self.json_path, json_mtime)
+        logging.info(f"已載入 {len(self.by_code)} 個型號。")
+        return True
+
+    def _build_indexes(self, data: dict) -> None:
+        self._index(
+            ModelRecord(code, info['name'], info['price'], info['currency'], info['capacity'], info['color'])
+            for code, info in data.items()
+        )
+
+    def _index(self, records) -> None:
+        records = sorted(records, key=lambda record: record.color)
+        by_name, by_capacity, by_color = {}, {}, {}
+        for record in records:
+            by_name.setdefault(record.name, []).append(record)
+            by_capacity.setdefault(record.capacity, []).append(record)
+            by_color.setdefault(record.color, []).append(record)
+        self.by_code = {record.code: record for record in records}
+        self.by_name = {key: tuple(value) for key, value in by_name.items()}
+        self.by_capacity = {key: tuple(value) for key, value in by_capacity.items()}
+        self.by_color = {key: tuple(value) for key, value in by_color.items()}
+
+    def __len__(self) -> int:
+        return len(self.by_code)
+
+    def __contains__(self, code: str) -> bool:
+        return code in self.by_code
+
+    def get(self, code: str) -> ModelRecord:
+        """
+        依型號代碼查詢機型。
+
+        Args:
+            code (str): 型號代碼，例如 "MYWY3ZP/A"。
+
+        Returns:
+            ModelRecord: 機型資訊，找不到時返回 None。
+        """
+        return self.by_code.get(code)
+
+    def family(self, name: str) -> tuple:
+        """
+        取得某機型的所有型號。
+
+        Args:
+            name (str): 機型名稱，例如 "iphone16pro"。
+
+        Returns:
+            tuple: 依顏色排序的 ModelRecord。
+        """
+        return self.by_name.get(name, ())
+
+    def with_capacity(self, capacity: str) -> tuple:
+        """
+        取得某容量的所有型號。
+
+        Args:
+            capacity (str): 容量，例如 "256gb"。
+
+        Returns:
+            tuple: ModelRecord。
+        """
+        return self.by_capacity.get(capacity, ())
+
+    def with_color(self, color: str) -> tuple:
+        """
+        取得某顏色的所有型號。
+
+        Args:
+            color (str): 顏色，例如 "沙漠色鈦金屬"。
+
+        Returns:
+            tuple: ModelRecord。
+        """
+        return self.by_color.get(color, ())
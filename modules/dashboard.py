@@ -0,0 +1,187 @@
+import threading
+import time
+from tkinter import ttk
+from .availability import AvailabilityResult
+from .metrics import MonitorMetrics
+
+FIXED_COLUMNS = ("型號", "最後檢查", "延遲")
+
+
+class AvailabilityBoard:
+    """以 Treeview 呈現 型號 × 店鋪 的現貨看板，只更新有變化的儲存格。"""
+
+    def __init__(self, parent, models: list, flush_interval: int = 250):
+        """
+        初始化 AvailabilityBoard 實例。
+
+        Args:
+            parent (tk.Widget): 放置看板的父元件。
+            models (list): 要顯示的機型資訊列表，每個型號一列。
+            flush_interval (int): 套用新結果的間隔（毫秒）。
+        """
+        self.frame = ttk.Frame(parent)
+        self.tree = ttk.Treeview(self.frame, columns=FIXED_COLUMNS, show='headings', height=10)
+        scrollbar = ttk.Scrollbar(self.frame, orient='horizontal', command=self.tree.xview)
+        self.tree.configure(xscroll=scrollbar.set)
+        self.tree.pack(fill='both', expand=True)
+        scrollbar.pack(fill='x')
+
+        self.flush_interval = flush_interval
+        self.stores = []  # 已出現過的店鋪，依出現順序成為欄位
+        self.cells = {}  # {型號代碼: {欄位名稱: 目前顯示的值}}
+        self.pending = {}  # {型號代碼: 尚未套用的列資料}
+        self._lock = threading.Lock()
+
+        self._configure_columns()
+        for model in models:
+            label = f"{model['model']} - {model['color']} ({model['capacity']})"
+            self.tree.insert("", "end", iid=model['code'], values=(label, "-", "-"))
+            self.cells[model['code']] = {"型號": label}
+        self.tree.after(self.flush_interval, self.flush)
+
+    def pack(self, **kwargs) -> None:
+        """擺放看板。"""
+        self.frame.pack(**kwargs)
+
+    def _configure_columns(self) -> None:
+        columns = FIXED_COLUMNS + tuple(self.stores)
+        self.tree.configure(columns=columns)
+        for column in columns:
+            self.tree.heading(column, text=column)
+            self.tree.column(column, anchor='center', width=200 if column == "型號" else 90, stretch=False)
+        for item, cells in self.cells.items():
+            self.tree.item(item, values=[cells.get(column, "-") for column in columns])
+
+    @staticmethod
+    def format_cell(status) -> str:
+        """
+        將取貨狀態轉成儲存格文字。
+
+        Args:
+            status (StoreAvailability): 取貨狀態。
+
+        Returns:
+            str: 有現貨時顯示取貨時間，否則顯示「-」。
+        """
+        if status.available:
+            return f"✔ {status.quote}" if status.quote else "✔"
+        return "-"
+
+    def submit(self, result: AvailabilityResult) -> None:
+        """
+        收下新的檢查結果，可在任何執行緒呼叫，實際更新在 Tk 主執行緒進行。
+
+        Args:
+            result (AvailabilityResult): 檢查結果。
+        """
+        with self._lock:
+            for part in result.parts:
+                if part not in self.cells:
+                    continue
+                row = {store: self.format_cell(status) for store, status in result.stores(part).items()}
+                if part in result.checked_at:
+                    row["最後檢查"] = time.strftime('%H:%M:%S', time.localtime(result.checked_at[part]))
+                if part in result.latency:
+                    row["延遲"] = f"{result.latency[part] * 1000:.0f} ms"
+                self.pending.setdefault(part, {}).update(row)
+
+    def flush(self) -> None:
+        """將累積的結果與目前畫面比對，只更新有變化的儲存格。"""
+        with self._lock:
+            pending, self.pending = self.pending, {}
+        new_stores = [store for row in pending.values() for store in row
+                      if store not in FIXED_COLUMNS and store not in self.stores]
+        if new_stores:
+            self.stores.extend(dict.fromkeys(new_stores))
+            self._configure_columns()
+        for part, row in pending.items():
+            cells = self.cells[part]
+            for column, value in row.items():
+                if cells.get(column) != value:
+                    cells[column] = value
+                    self.tree.set(part, column, value)
+        self.tree.after(self.flush_interval, self.flush)
+
+
+class StatsPanel:
+    """在監控頁面顯示請求、解析與通知的統計，定期從 MonitorMetrics 重新整理。"""
+
+    CIRCUIT_STATES = ("正常", "探測中", "暫停")  # 依 circuit_breaker_state 的數值
+    FIELDS = ("請求", "錯誤 / 限流", "請求延遲 p50 / p99", "解析", "每輪耗時", "沿用結果", "通知延遲", "到貨偵測延遲", "斷路器")
+
+    def __init__(self, parent, metrics: MonitorMetrics, refresh_interval: int = 1000):
+        """
+        初始化 StatsPanel 實例。
+
+        Args:
+            parent (tk.Widget): 放置面板的父元件。
+            metrics (MonitorMetrics): 要顯示的指標。
+            refresh_interval (int): 重新整理的間隔（毫秒）。
+        """
+        self.frame = ttk.LabelFrame(parent, text="統計")
+        self.metrics = metrics
+        self.refresh_interval = refresh_interval
+        self.values = {}  # {欄位名稱: ttk.Label}
+        for index, field in enumerate(self.FIELDS):
+            row, column = divmod(index, 4)
+            ttk.Label(self.frame, text=f"{field}：").grid(row=row, column=column * 2, sticky='e', padx=(8, 0))
+            label = ttk.Label(self.frame, text="-", width=16)
+            label.grid(row=row, column=column * 2 + 1, sticky='w')
+            self.values[field] = label
+        self._after_id = self.frame.after(self.refresh_interval, self.refresh)
+
+    def pack(self, **kwargs) -> None:
+        """擺放面板。"""
+        self.frame.pack(**kwargs)
+
+    def destroy(self) -> None:
+        """停止重新整理並移除面板。"""
+        if self._after_id is not None:
+            self.frame.after_cancel(self._after_id)
+            self._after_id = None
+        self.frame.destroy()
+
+    @staticmethod
+    def format_seconds(seconds: float) -> str:
+        """
+        將秒數轉成易讀的文字。
+
+        Args:
+            seconds (float): 秒數。
+
+        Returns:
+            str: 未滿 1 秒以毫秒顯示，否則以秒顯示。
+        """
+        return f"{seconds * 1000:.0f} ms" if seconds < 1 else f"{seconds:.1f} s"
+
+    def summary(self) -> dict:
+        """
+        整理要顯示的統計。
+
+        Returns:
+            dict: {欄位名稱: 文字}。
+        """
+        m = self.metrics
+        total = m.requests.total()
+        throttled = sum(m.requests.total(status=status) for status in ('403', '429', '503'))
+        failed = total - m.requests.total(status='200') - m.requests.total(status='304') - throttled
+        fmt = self.format_seconds
+        return {
+            "請求": f"{total:.0f} 次",
+            "錯誤 / 限流": f"{failed:.0f} / {throttled:.0f}",
+            "請求延遲 p50 / p99": f"{fmt(m.request_seconds.quantile(0.5))} / {fmt(m.request_seconds.quantile(0.99))}",
+            "解析": f"平均 {fmt(m.parse_seconds.mean())}",
+            "每輪耗時": f"p50 {fmt(m.cycle_seconds.quantile(0.5))}",
+            "沿用結果": f"{m.unchanged.total():.0f} 次",
+            "通知延遲": f"p50 {fmt(m.notification_seconds.quantile(0.5))}",
+            "到貨偵測延遲": f"p50 {fmt(m.detection_lag_seconds.quantile(0.5))}" if m.detection_lag_seconds.count() else "-",
+            "斷路器": f"{self.CIRCUIT_STATES[int(m.circuit_state.max())]}（斷開 {m.circuit_opens.total():.0f} 次）",
+        }
+
+    def refresh(self) -> None:
+        """更新有變化的欄位。"""
+        for field, text in self.summary().items():
+            label = self.values[field]
+            if label.cget('text') != text:
+                label.configure(text=text)
+        self._after_id = self.frame.after(self.refresh_interval, self.refresh)
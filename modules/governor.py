@@ -0,0 +1,220 @@
+import logging
+import random
+import threading
+import time
+
+CLOSED, HALF_OPEN, OPEN = 'closed', 'half_open', 'open'
+STATE_CODES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}  # 輸出到指標時使用的數值
+THROTTLE_STATUSES = (403, 429, 503)  # 視為被限流、計入斷路器的 HTTP 狀態碼
+
+
+class TokenBucket:
+    """執行緒安全的 token bucket，限制平均請求速率並允許短暫的突發。"""
+
+    def __init__(self, rate: float, burst: int = 1):
+        """
+        初始化 TokenBucket 實例。
+
+        Args:
+            rate (float): 每秒補充的 token 數量，即平均每秒請求數。
+            burst (int): 最多累積的 token 數量。
+        """
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """
+        預先取走一個 token。
+
+        Returns:
+            float: 需要等待的秒數，有 token 可用時為 0。
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def acquire(self) -> float:
+        """
+        取得一個 token，不足時阻塞等待。
+
+        Returns:
+            float: 實際等待的秒數。
+        """
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class CircuitBreaker:
+    """連續被限流或逾時時暫停請求，冷卻後只放行一個探測請求，成功才恢復。"""
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 3,
+        cooldown: float = 60,
+        max_cooldown: float = 900,
+        jitter: float = 0.2
+    ):
+        """
+        初始化 CircuitBreaker 實例。
+
+        Args:
+            name (str): 顯示在日誌中的名稱，例如主機名稱。
+            failure_threshold (int): 連續失敗幾次後斷開。
+            cooldown (float): 第一次斷開的冷卻秒數，探測失敗時倍增。
+            max_cooldown (float): 冷卻秒數上限。
+            jitter (float): 冷卻秒數的隨機浮動比例，避免多個程式同時恢復。
+        """
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.jitter = jitter
+        self.state = CLOSED
+        self.failures = 0  # 連續失敗次數
+        self.opened = 0  # 恢復前連續斷開的次數，用來計算冷卻時間
+        self.retry_at = 0.0  # 斷開狀態下可以探測的時間（monotonic）
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """
+        是否可以送出請求。冷卻結束後只放行一個探測請求，結果回報前其他請求都會被擋下。
+
+        Returns:
+            bool: 是否放行。
+        """
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() >= self.retry_at:
+                self.state = HALF_OPEN
+                self._probing = False
+                logging.info(f"{self.name} 冷卻結束，送出探測請求。")
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def seconds_until_retry(self) -> float:
+        """
+        距離下一次可以探測還有多少秒。
+
+        Returns:
+            float: 秒數，未斷開時為 0。
+        """
+        with self._lock:
+            return max(0.0, self.retry_at - time.monotonic()) if self.state == OPEN else 0.0
+
+    def record_success(self) -> None:
+        """回報請求成功，探測成功時恢復正常。"""
+        with self._lock:
+            if self.state != CLOSED:
+                logging.info(f"{self.name} 探測成功，恢復請求。")
+            self.state = CLOSED
+            self.failures = 0
+            self.opened = 0
+            self._probing = False
+
+    def record_failure(self, retry_after: float = None) -> bool:
+        """
+        回報被限流（403/429/503）或逾時。
+
+        Args:
+            retry_after (float): 伺服器要求的等待秒數，會作為冷卻時間的下限。
+
+        Returns:
+            bool: 這次失敗是否使斷路器斷開。
+        """
+        with self._lock:
+            self.failures += 1
+            if self.state == CLOSED and self.failures < self.failure_threshold:
+                return False
+            if self.state == OPEN:
+                return False
+            base = min(self.max_cooldown, self.cooldown * (2 ** self.opened))
+            delay = base * random.uniform(1 - self.jitter, 1 + self.jitter)
+            if retry_after:
+                delay = max(delay, retry_after)
+            self.state = OPEN
+            self.opened += 1
+            self._probing = False
+            self.retry_at = time.monotonic() + delay
+        logging.warning(f"{self.name} 連續 {self.failures} 次被限流或逾時，暫停請求 {delay:.0f} 秒。")
+        return True
+
+    def record_other(self) -> None:
+        """
+        回報不計入斷路器的失敗（例如 500 或連線錯誤）。主機有回應但不是限流，因此中斷連續失敗的計算，
+        429、500、429、429 只算連續 2 次；探測請求遇到這類錯誤時允許再送出一個探測請求。
+        """
+        with self._lock:
+            if self.state == CLOSED:
+                self.failures = 0
+            self._probing = False
+
+    def release(self) -> None:
+        """探測請求沒有明確結果（例如程式錯誤）時，允許再送出一個探測請求。"""
+        with self._lock:
+            self._probing = False
+
+
+class HostGovernor:
+    """單一主機共用的請求速率限制與斷路器。"""
+
+    def __init__(self, host: str, rate: float = 2.0, burst: int = 4, **breaker_kwargs):
+        """
+        初始化 HostGovernor 實例。
+
+        Args:
+            host (str): 主機名稱。
+            rate (float): 每秒最多平均請求數。
+            burst (int): 允許連續送出的請求數。
+            **breaker_kwargs: 傳給 CircuitBreaker 的參數。
+        """
+        self.host = host
+        self.bucket = TokenBucket(rate, burst)
+        self.breaker = CircuitBreaker(host, **breaker_kwargs)
+
+
+_governors = {}  # {主機名稱: HostGovernor}
+_governor_settings = {}
+_governor_lock = threading.Lock()
+
+
+def configure_governors(**settings) -> None:
+    """
+    設定之後建立的 HostGovernor 參數，並清除已建立的實例。
+
+    Args:
+        **settings: HostGovernor 的參數，例如 rate、burst、failure_threshold、cooldown。
+    """
+    with _governor_lock:
+        _governor_settings.clear()
+        _governor_settings.update(settings)
+        _governors.clear()
+
+
+def get_host_governor(host: str) -> HostGovernor:
+    """
+    取得某主機全域共用的 HostGovernor，第一次呼叫時才建立。
+
+    Args:
+        host (str): 主機名稱（含埠號）。
+
+    Returns:
+        HostGovernor: 該主機的 governor。
+    """
+    with _governor_lock:
+        governor = _governors.get(host)
+        if governor is None:
+            governor = _governors[host] = HostGovernor(host, **_governor_settings)
+        return governor
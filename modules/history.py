@@ -0,0 +1,349 @@
+"""
+現貨歷史紀錄：以 SQLite（WAL 模式）保存每一次 (時間, 型號, 店鋪, 狀態, 取貨時間) 的觀測。
+
+查詢範例：
+    python -m modules.history restocks MYX73ZP/A --store 信義 --days 90  # 店鋪名稱包含「信義」即可
+    python -m modules.history stores MYX73ZP/A --days 30
+"""
+import argparse
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+from .availability import AvailabilityResult
+
+# pickupDisplay 以整數保存，未知的值記為 -1
+STATUS_CODES = {'unavailable': 0, 'available': 1, 'ineligible': 2}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS parts (id INTEGER PRIMARY KEY, code TEXT NOT NULL UNIQUE);
+CREATE TABLE IF NOT EXISTS stores (id INTEGER PRIMARY KEY, number TEXT, name TEXT NOT NULL UNIQUE);
+CREATE TABLE IF NOT EXISTS quotes (id INTEGER PRIMARY KEY, text TEXT NOT NULL UNIQUE);
+CREATE TABLE IF NOT EXISTS observations (
+    part_id INTEGER NOT NULL,
+    ts INTEGER NOT NULL,
+    store_id INTEGER NOT NULL,
+    status INTEGER NOT NULL,
+    quote_id INTEGER,
+    PRIMARY KEY (part_id, ts, store_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS observations_ts ON observations (ts);
+"""
+
+# 狀態有變化的觀測，由 record() 寫入時維護，舊資料由 backfill_transitions() 以 LAG() 補齊
+TRANSITIONS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS transitions (
+    part_id INTEGER NOT NULL,
+    ts INTEGER NOT NULL,
+    store_id INTEGER NOT NULL,
+    status INTEGER NOT NULL,
+    PRIMARY KEY (part_id, ts, store_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+# 以 LAG() 取出同一型號在同一店鋪的上一次狀態，找出狀態有變化的觀測
+LAG_TRANSITIONS = """
+    SELECT part_id, ts, store_id, status FROM (
+        SELECT part_id, ts, store_id, status,
+               LAG(status) OVER (PARTITION BY part_id, store_id ORDER BY ts) AS previous
+        FROM observations WHERE part_id IN ({parts})
+    ) WHERE previous != status
+"""
+PART_IDS = "SELECT id FROM parts WHERE code IN ({parts})"
+# 本地時間的一週小時編號（星期一 0 點為 0），與 predictor.time_slot 相同
+HOUR_OF_WEEK = ("((CAST(strftime('%w', t.ts, 'unixepoch', 'localtime') AS INTEGER) + 6) % 7) * 24"
+                " + CAST(strftime('%H', t.ts, 'unixepoch', 'localtime') AS INTEGER)")
+
+
+class AvailabilityHistory:
+    """只新增不修改的現貨觀測紀錄，依 (型號, 時間) 建立索引。"""
+
+    def __init__(self, db_path: str = 'log/history.sqlite3', read_only: bool = False):
+        """
+        初始化 AvailabilityHistory 實例，資料庫不存在時自動建立。
+
+        Args:
+            db_path (str): SQLite 檔案路徑。
+            read_only (bool): 是否以唯讀模式開啟，資料庫不存在時拋出 sqlite3.OperationalError 而不會建立。
+        """
+        self.db_path = db_path
+        if read_only:
+            uri = f"{Path(db_path).resolve().as_uri()}?mode=ro"
+            self.conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        else:
+            self.conn = sqlite3.connect(db_path, check_same_thread=False)
+            self.conn.execute('PRAGMA journal_mode=WAL')
+            self.conn.execute('PRAGMA synchronous=NORMAL')
+            self.conn.executescript(SCHEMA + TRANSITIONS_SCHEMA)
+            if self.conn.execute('SELECT 1 FROM observations LIMIT 1').fetchone() is None:
+                self._mark_transitions_ready()  # 新的資料庫由 record() 維護即可，不需要補齊
+        self._ids = {'parts': {}, 'stores': {}, 'quotes': {}}  # 已知字串的 id 快取
+        self._last_status = {}  # {(part_id, store_id): (時間, 狀態)}，用來判斷狀態是否有變化
+        self._ready = False
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        """關閉資料庫連線。"""
+        with self._lock:
+            self.conn.close()
+
+    def _intern(self, table: str, column: str, value: str, **extra) -> int:
+        """取得字串在對照表中的 id，不存在時新增。"""
+        cache = self._ids[table]
+        if value not in cache:
+            row = self.conn.execute(f"SELECT id FROM {table} WHERE {column} = ?", (value,)).fetchone()
+            if row is None:
+                columns = [column, *extra]
+                placeholders = ', '.join('?' for _ in columns)
+                cursor = self.conn.execute(
+                    f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})",
+                    (value, *extra.values())
+                )
+                cache[value] = cursor.lastrowid
+            else:
+                cache[value] = row[0]
+        return cache[value]
+
+    def record(self, result: AvailabilityResult) -> int:
+        """
+        將一輪的檢查結果以單一交易批次寫入。可直接加入 StockChecker.result_listeners。
+
+        Args:
+            result (AvailabilityResult): 檢查結果。
+
+        Returns:
+            int: 寫入的觀測筆數。
+        """
+        now = int(time.time())
+        with self._lock, self.conn:
+            rows, changes = [], []
+            for part, stores in result.parts.items():
+                part_id = self._intern('parts', 'code', part)
+                ts = int(result.checked_at.get(part, now))
+                for store_name, status in stores.items():
+                    store_id = self._intern('stores', 'name', store_name, number=status.store_number)
+                    quote_id = self._intern('quotes', 'text', status.quote) if status.quote else None
+                    code = STATUS_CODES.get(status.pickup_display, -1)
+                    previous = self._previous_status(part_id, store_id, ts)
+                    if previous is not None and previous != code:
+                        changes.append((part_id, ts, store_id, code))
+                    self._last_status[(part_id, store_id)] = (ts, code)
+                    rows.append((part_id, ts, store_id, code, quote_id))
+            self.conn.executemany('INSERT OR REPLACE INTO observations VALUES (?, ?, ?, ?, ?)', rows)
+            self.conn.executemany('INSERT OR REPLACE INTO transitions VALUES (?, ?, ?, ?)', changes)
+        logging.debug("已寫入 %d 筆現貨紀錄。", len(rows))
+        return len(rows)
+
+    def _previous_status(self, part_id: int, store_id: int, ts: int):
+        """取得某型號在某店鋪早於 ts 的最後一次狀態，快取沒有時才查詢資料庫。"""
+        cached = self._last_status.get((part_id, store_id))
+        if cached is not None and cached[0] < ts:
+            return cached[1]
+        row = self.conn.execute(
+            "SELECT status FROM observations WHERE part_id = ? AND store_id = ? AND ts < ? ORDER BY ts DESC LIMIT 1",
+            (part_id, store_id, ts)
+        ).fetchone()
+        return row[0] if row else None
+
+    def _mark_transitions_ready(self) -> None:
+        """記錄 transitions 已包含所有觀測的狀態變化。"""
+        self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('transitions_ready', '1')")
+        self.conn.commit()
+
+    def transitions_ready(self) -> bool:
+        """
+        transitions 是否已包含所有觀測的狀態變化；舊版資料庫尚未執行 backfill_transitions() 時為 False。
+
+        Returns:
+            bool: 是否可以直接查詢 transitions。
+        """
+        if not self._ready:
+            try:
+                with self._lock:
+                    row = self.conn.execute("SELECT value FROM meta WHERE key = 'transitions_ready'").fetchone()
+            except sqlite3.OperationalError:  # 唯讀開啟的舊版資料庫沒有 meta 表
+                return False
+            self._ready = row is not None
+        return self._ready
+
+    def backfill_transitions(self) -> int:
+        """
+        以 LAG() 從既有的觀測補齊 transitions，只需在升級後執行一次。每個型號各用一個交易，不會長時間佔住寫入鎖。
+
+        Returns:
+            int: 新增的狀態變化筆數。
+        """
+        if self.transitions_ready():
+            return 0
+        with self._lock:
+            part_ids = [row[0] for row in self.conn.execute('SELECT id FROM parts')]
+        added = 0
+        for part_id in part_ids:
+            with self._lock, self.conn:
+                added += self.conn.execute(
+                    f"INSERT OR IGNORE INTO transitions {LAG_TRANSITIONS.format(parts='?')}", (part_id,)
+                ).rowcount
+        with self._lock:
+            self._mark_transitions_ready()
+        self._ready = True
+        logging.info(f"已從歷史紀錄補齊 {added} 筆狀態變化。")
+        return added
+
+    def observations(self, part: str, store: str = None, since: float = None, until: float = None) -> list:
+        """
+        查詢某型號的觀測紀錄。
+
+        Args:
+            part (str): 型號代碼。
+            store (str): 店鋪名稱的一部分，例如「信義」可查到「信義 A13」；為 None 時查詢所有店鋪。
+            since (float): 起始時間（epoch 秒）。
+            until (float): 結束時間（epoch 秒）。
+
+        Returns:
+            list: [(時間, 店鋪名稱, 是否有現貨, 取貨時間), ...]，依時間排序。
+        """
+        sql = """
+            SELECT o.ts, s.name, o.status, q.text
+            FROM observations o
+            JOIN parts p ON p.id = o.part_id
+            JOIN stores s ON s.id = o.store_id
+            LEFT JOIN quotes q ON q.id = o.quote_id
+            WHERE p.code = ? AND o.ts >= ? AND o.ts <= ?
+        """
+        params = [part, int(since or 0), int(until or time.time())]
+        if store:
+            sql += " AND instr(s.name, ?) > 0"
+            params.append(store)
+        sql += " ORDER BY o.ts"
+        with self._lock:
+            rows = self.conn.execute(sql, params).fetchall()
+        return [(ts, name, status == STATUS_CODES['available'], quote) for ts, name, status, quote in rows]
+
+    def _restock_events(self, parts: list, since: float, until: float, select: str, join: str = '',
+                        where: str = '', params: tuple = (), suffix: str = '') -> list:
+        """以到貨事件為子查詢 t 執行統計；transitions 尚未補齊時改用 LAG() 即時計算。"""
+        placeholders = PART_IDS.format(parts=', '.join('?' for _ in parts))
+        if self.transitions_ready():
+            events = f"SELECT part_id, ts, store_id FROM transitions WHERE status = 1 AND part_id IN ({placeholders})"
+        else:
+            events = f"SELECT part_id, ts, store_id FROM ({LAG_TRANSITIONS.format(parts=placeholders)}) WHERE status = 1"
+        sql = f"SELECT {select} FROM ({events}) t {join} WHERE t.ts >= ? AND t.ts <= ? {where} {suffix}"
+        with self._lock:
+            return self.conn.execute(sql, (*parts, int(since or 0), int(until or time.time()), *params)).fetchall()
+
+    def restocks(self, part: str, store: str = None, since: float = None, until: float = None) -> list:
+        """
+        找出某型號從無現貨變成有現貨的時間點。
+
+        Args:
+            part (str): 型號代碼。
+            store (str): 店鋪名稱的一部分，為 None 時查詢所有店鋪。
+            since (float): 起始時間（epoch 秒）。
+            until (float): 結束時間（epoch 秒）。
+
+        Returns:
+            list: [(時間, 店鋪名稱, 取貨時間), ...]，依時間排序。
+        """
+        join = ("JOIN stores s ON s.id = t.store_id "
+                "JOIN observations o ON o.part_id = t.part_id AND o.ts = t.ts AND o.store_id = t.store_id "
+                "LEFT JOIN quotes q ON q.id = o.quote_id")
+        where, params = '', ()
+        if store:
+            where, params = "AND instr(s.name, ?) > 0", (store,)
+        return self._restock_events([part], since, until, 't.ts, s.name, q.text', join, where, params, 'ORDER BY t.ts')
+
+    def restock_slot_counts(self, parts: list, since: float = None, until: float = None) -> dict:
+        """
+        統計各型號在一週中每個小時（本地時間）的到貨次數，供到貨時段預測使用。
+
+        Args:
+            parts (list): 型號代碼。
+            since (float): 起始時間（epoch 秒）。
+            until (float): 結束時間（epoch 秒）。
+
+        Returns:
+            dict: {型號代碼: {小時編號: 到貨次數}}，沒有到貨的型號不會出現。
+        """
+        if not parts:
+            return {}
+        rows = self._restock_events(
+            list(parts), since, until, f"p.code, {HOUR_OF_WEEK} AS slot, COUNT(*)",
+            'JOIN parts p ON p.id = t.part_id', suffix='GROUP BY p.code, slot'
+        )
+        counts = {}
+        for code, slot, count in rows:
+            counts.setdefault(code, {})[slot] = count
+        return counts
+
+    def store_frequencies(self, part: str, since: float = None, until: float = None) -> list:
+        """
+        統計某型號在各店鋪的到貨次數與有現貨的比例。
+
+        Args:
+            part (str): 型號代碼。
+            since (float): 起始時間（epoch 秒）。
+            until (float): 結束時間（epoch 秒）。
+
+        Returns:
+            list: [(店鋪名稱, 到貨次數, 有現貨的觀測比例), ...]，依到貨次數由多到少排序。
+        """
+        since, until = int(since or 0), int(until or time.time())
+        restocks = dict(self._restock_events([part], since, until, 't.store_id, COUNT(*)', suffix='GROUP BY t.store_id'))
+        with self._lock:
+            rows = self.conn.execute(
+                """
+                SELECT o.store_id, s.name, AVG(o.status = 1)
+                FROM observations o
+                JOIN stores s ON s.id = o.store_id
+                WHERE o.part_id IN (SELECT id FROM parts WHERE code = ?) AND o.ts >= ? AND o.ts <= ?
+                GROUP BY o.store_id
+                """,
+                (part, since, until)
+            ).fetchall()
+        frequencies = [(name, restocks.get(store_id, 0), ratio) for store_id, name, ratio in rows]
+        return sorted(frequencies, key=lambda row: (row[1], row[2]), reverse=True)
+
+def main(argv: list = None) -> int:
+    """
+    查詢歷史紀錄的命令列工具。
+
+    Args:
+        argv (list): 命令列參數，預設為 sys.argv[1:]。
+
+    Returns:
+        int: 結束代碼。
+    """
+    parser = argparse.ArgumentParser(prog='python -m modules.history', description='查詢現貨歷史紀錄')
+    parser.add_argument('--db', default='log/history.sqlite3', help='SQLite 檔案路徑')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    restocks_parser = subparsers.add_parser('restocks', help='列出到貨時間')
+    restocks_parser.add_argument('part', help='型號代碼')
+    restocks_parser.add_argument('--store', help='只查詢名稱包含此文字的店鋪，例如「信義」')
+    restocks_parser.add_argument('--days', type=float, default=30, help='查詢最近幾天（預設 30）')
+    stores_parser = subparsers.add_parser('stores', help='各店鋪的到貨次數')
+    stores_parser.add_argument('part', help='型號代碼')
+    stores_parser.add_argument('--days', type=float, default=30, help='查詢最近幾天（預設 30）')
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        print(f"找不到歷史紀錄檔：{args.db}", file=sys.stderr)
+        return 1
+    history = AvailabilityHistory(args.db, read_only=True)
+    since = time.time() - args.days * 86400
+    try:
+        if args.command == 'restocks':
+            for ts, store, quote in history.restocks(args.part, args.store, since):
+                print(f"{time.strftime('%Y-%m-%d %a %H:%M', time.localtime(ts))}\t{store}\t{quote or ''}")
+        else:
+            for store, restocks, ratio in history.store_frequencies(args.part, since):
+                print(f"{store}\t到貨 {restocks} 次\t有現貨 {ratio:.1%}")
+    finally:
+        history.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,18 +1,134 @@
+import atexit
+import collections
+import gzip
 import logging
-import tkinter as tk
+import logging.handlers
+import os
+import queue
+import shutil
 
 class TextHandler(logging.Handler):
-    """自定義日誌處理器，用於將日誌寫入 Tkinter 的 Text 小工具。"""
-    def __init__(self, text_widget):
-        super().__init__()
+    """自定義日誌處理器，用於將日誌寫入 Tkinter 的 Text 小工具。
+
+    任何執行緒的日誌都只放進佇列，由 Tk 主執行緒每隔 flush_interval 毫秒批次寫入，
+    並只保留最近 max_lines 行，避免大量日誌拖慢介面。
+    """
+    def __init__(self, text_widget, max_lines: int = 1000, flush_interval: int = 200, level: int = logging.NOTSET):
+        """
+        Args:
+            text_widget (tk.Text): 顯示日誌的 Text 小工具。
+            max_lines (int): Text 中最多保留的行數。
+            flush_interval (int): 批次寫入的間隔（毫秒）。
+            level (int): 最低顯示的日誌等級。
+        """
+        super().__init__(level)
         self.text_widget = text_widget
+        self.max_lines = max_lines
+        self.flush_interval = flush_interval
+        self.pending = queue.SimpleQueue()
+        self._after_id = self.text_widget.after(self.flush_interval, self.flush_pending)
 
     def emit(self, record):
-        msg = self.format(record)
-        def append():
+        try:
+            self.pending.put(self.format(record))
+        except Exception:
+            self.handleError(record)
+
+    def flush_pending(self):
+        """將佇列中的日誌一次寫入 Text，並刪除超過 max_lines 的舊行。"""
+        lines = collections.deque(maxlen=self.max_lines)
+        try:
+            while True:
+                lines.append(self.pending.get_nowait())
+        except queue.Empty:
+            pass
+        if lines:
             self.text_widget.configure(state='normal')
-            self.text_widget.insert(tk.END, msg + '\n')
+            self.text_widget.insert('end', '\n'.join(lines) + '\n')
+            line_count = int(self.text_widget.index('end-1c').split('.')[0]) - 1
+            if line_count > self.max_lines:
+                self.text_widget.delete('1.0', f'{line_count - self.max_lines + 1}.0')
             self.text_widget.configure(state='disabled')
             # 自動滾動到最後
-            self.text_widget.yview(tk.END)
-        self.text_widget.after(0, append)
+            self.text_widget.yview('end')
+        self._after_id = self.text_widget.after(self.flush_interval, self.flush_pending)
+
+    def close(self):
+        if self._after_id is not None:
+            try:
+                self.text_widget.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+        super().close()
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """只把 LogRecord 放進佇列，訊息格式化留給 QueueListener 的背景執行緒。
+
+    日誌參數必須是不會再被修改的值（字串、數字），因為格式化會延後進行。
+    """
+
+    def prepare(self, record):
+        return record
+
+
+def compress_rotated(source: str, dest: str) -> None:
+    """RotatingFileHandler 的 rotator：將輪替出來的舊日誌壓縮成 .gz。"""
+    with open(source, 'rb') as f_in, gzip.open(dest, 'wb') as f_out:
+        shutil.copyfileobj(f_in, f_out)
+    os.remove(source)
+
+
+def setup_logging(
+    log_path: str = 'log/app.log',
+    level: int = logging.INFO,
+    max_bytes: int = 5 * 1024 * 1024,
+    backup_count: int = 5,
+    compress: bool = True,
+    console: bool = True
+) -> logging.handlers.QueueListener:
+    """
+    設置非阻塞的日誌：呼叫端只把紀錄放進佇列，由背景執行緒寫入檔案與終端機。
+
+    Args:
+        log_path (str): 日誌檔案路徑，為 None 時不寫入檔案。
+        level (int): 日誌等級。
+        max_bytes (int): 單一日誌檔案的大小上限，超過時輪替。
+        backup_count (int): 保留的舊日誌數量。
+        compress (bool): 是否以 gzip 壓縮輪替出來的舊日誌。
+        console (bool): 是否同時輸出到終端機。
+
+    Returns:
+        logging.handlers.QueueListener: 已啟動的 listener，程式結束時會自動停止並寫完剩餘紀錄。
+    """
+    formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+    handlers = []
+    if log_path:
+        os.makedirs(os.path.dirname(log_path) or '.', exist_ok=True)
+        file_handler = logging.handlers.RotatingFileHandler(
+            log_path, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8'
+        )
+        if compress:
+            file_handler.namer = lambda name: f"{name}.gz"
+            file_handler.rotator = compress_rotated
+        handlers.append(file_handler)
+    if console:
+        handlers.append(logging.StreamHandler())
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(DeferredQueueHandler(log_queue))
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+
+    def stop_listener():
+        # 呼叫端可能已自行停止 listener
+        if listener._thread is not None:
+            listener.stop()
+
+    atexit.register(stop_listener)
+    return listener
@@ -0,0 +1,371 @@
+"""
+監控流程的計數器與直方圖，可輸出成 Prometheus 文字格式。
+
+無介面模式以 --metrics-port 開啟 http://127.0.0.1:<port>/metrics；桌面版在監控頁面顯示統計面板。
+"""
+import bisect
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 預設的秒數分界，涵蓋數毫秒的解析到數十秒的逾時
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300)
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labelnames: tuple, values: tuple, extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class Metric:
+    """所有指標共用的標籤處理。"""
+
+    type = 'untyped'
+
+    def __init__(self, name: str, help: str, labelnames: tuple = ()):
+        """
+        初始化 Metric 實例。
+
+        Args:
+            name (str): 指標名稱。
+            help (str): 說明文字。
+            labelnames (tuple): 標籤名稱。
+        """
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}  # {標籤值 tuple: 數值}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} 的標籤應為 {self.labelnames}，收到 {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _matching(self, labels: dict) -> list:
+        """取得符合部分標籤條件的數值，未指定的標籤不限制。"""
+        wanted = {self.labelnames.index(name): str(value) for name, value in labels.items()}
+        with self._lock:
+            return [self._snapshot(value) for key, value in self._values.items()
+                    if all(key[index] == label for index, label in wanted.items())]
+
+    def _snapshot(self, value):
+        """在持有鎖時複製數值，避免讀取時被其他執行緒修改。"""
+        return value
+
+    def render(self) -> list:
+        """
+        輸出成 Prometheus 文字格式。
+
+        Returns:
+            list: 文字行。
+        """
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        with self._lock:
+            items = sorted((key, self._snapshot(value)) for key, value in self._values.items())
+        for key, value in items:
+            lines.extend(self._render_sample(key, value))
+        return lines
+
+    def _render_sample(self, key: tuple, value) -> list:
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {value:g}"]
+
+
+class Counter(Metric):
+    """只會增加的計數器。"""
+
+    type = 'counter'
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        """
+        增加計數。
+
+        Args:
+            amount (float): 增加量。
+            **labels: 標籤值。
+        """
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def total(self, **labels) -> float:
+        """
+        加總符合標籤條件的計數。
+
+        Args:
+            **labels: 部分標籤值，未指定的標籤不限制。
+
+        Returns:
+            float: 計數總和。
+        """
+        return sum(self._matching(labels))
+
+
+class Gauge(Metric):
+    """可任意設定的數值，例如目前的狀態。"""
+
+    type = 'gauge'
+
+    def set(self, value: float, **labels) -> None:
+        """
+        設定數值。
+
+        Args:
+            value (float): 新的數值。
+            **labels: 標籤值。
+        """
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def value(self, **labels) -> float:
+        """
+        取得數值。
+
+        Args:
+            **labels: 標籤值。
+
+        Returns:
+            float: 目前的數值，尚未設定時為 0。
+        """
+        key = self._key(labels)
+        with self._lock:
+            return self._values.get(key, 0)
+
+    def max(self, **labels) -> float:
+        """
+        符合標籤條件的最大值。
+
+        Args:
+            **labels: 部分標籤值，未指定的標籤不限制。
+
+        Returns:
+            float: 最大值，尚未設定時為 0。
+        """
+        return max(self._matching(labels), default=0)
+
+
+class Histogram(Metric):
+    """依固定分界統計分布的直方圖。"""
+
+    type = 'histogram'
+
+    def __init__(self, name: str, help: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        """
+        初始化 Histogram 實例。
+
+        Args:
+            name (str): 指標名稱。
+            help (str): 說明文字。
+            labelnames (tuple): 標籤名稱。
+            buckets (tuple): 由小到大的分界。
+        """
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels) -> None:
+        """
+        記錄一筆觀測值。
+
+        Args:
+            value (float): 觀測值。
+            **labels: 標籤值。
+        """
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]  # [各區間次數, 總和, 次數]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def _snapshot(self, state):
+        return list(state[0]), state[1], state[2]
+
+    def _merged(self, labels: dict) -> tuple:
+        counts, total, count = [0] * (len(self.buckets) + 1), 0.0, 0
+        for state in self._matching(labels):
+            counts = [a + b for a, b in zip(counts, state[0])]
+            total += state[1]
+            count += state[2]
+        return counts, total, count
+
+    def count(self, **labels) -> int:
+        """符合標籤條件的觀測次數。"""
+        return self._merged(labels)[2]
+
+    def mean(self, **labels) -> float:
+        """符合標籤條件的平均值，沒有觀測時為 0。"""
+        _, total, count = self._merged(labels)
+        return total / count if count else 0.0
+
+    def quantile(self, q: float, **labels) -> float:
+        """
+        以區間內線性內插估計分位數，做法與 Prometheus 的 histogram_quantile 相同。
+
+        Args:
+            q (float): 0 ~ 1 的分位，例如 0.99。
+            **labels: 部分標籤值，未指定的標籤不限制。
+
+        Returns:
+            float: 估計值，沒有觀測時為 0；落在最後一個分界之外時返回最後一個分界。
+        """
+        counts, _, count = self._merged(labels)
+        if not count:
+            return 0.0
+        rank = q * count
+        cumulative = 0
+        for index, bucket_count in enumerate(counts):
+            if cumulative + bucket_count >= rank and bucket_count:
+                if index == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[index - 1] if index else 0.0
+                return lower + (self.buckets[index] - lower) * (rank - cumulative) / bucket_count
+            cumulative += bucket_count
+        return self.buckets[-1]
+
+    def _render_sample(self, key: tuple, state) -> list:
+        counts, total, count = state
+        lines, cumulative = [], 0
+        for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+            cumulative += bucket_count
+            le = '+Inf' if bound == float('inf') else f'{bound:g}'
+            bucket_labels = _format_labels(self.labelnames, key, f'le="{le}"')
+            lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+        labels = _format_labels(self.labelnames, key)
+        lines.append(f"{self.name}_sum{labels} {total:g}")
+        lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """保存所有指標，同名的指標只會建立一次。"""
+
+    def __init__(self):
+        """初始化 MetricsRegistry 實例。"""
+        self.metrics = {}  # {指標名稱: Metric}
+        self._lock = threading.Lock()
+
+    def _register(self, cls, name: str, *args, **kwargs) -> Metric:
+        with self._lock:
+            metric = self.metrics.get(name)
+            if metric is None:
+                metric = self.metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"指標 {name} 已註冊為 {metric.type}")
+            return metric
+
+    def counter(self, name: str, help: str, labelnames: tuple = ()) -> Counter:
+        """取得或建立計數器。"""
+        return self._register(Counter, name, help, labelnames)
+
+    def gauge(self, name: str, help: str, labelnames: tuple = ()) -> Gauge:
+        """取得或建立 gauge。"""
+        return self._register(Gauge, name, help, labelnames)
+
+    def histogram(self, name: str, help: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS) -> Histogram:
+        """取得或建立直方圖。"""
+        return self._register(Histogram, name, help, labelnames, buckets)
+
+    def render(self) -> str:
+        """
+        輸出所有指標。
+
+        Returns:
+            str: Prometheus 文字格式。
+        """
+        with self._lock:
+            metrics = list(self.metrics.values())
+        return '\n'.join(line for metric in metrics for line in metric.render()) + '\n'
+
+
+_registry = MetricsRegistry()
+
+
+def get_registry() -> MetricsRegistry:
+    """
+    取得全域共用的 MetricsRegistry。
+
+    Returns:
+        MetricsRegistry: 共用的 registry。
+    """
+    return _registry
+
+
+class MonitorMetrics:
+    """StockChecker 與通知流程使用的指標。"""
+
+    def __init__(self, registry: MetricsRegistry = None):
+        """
+        初始化 MonitorMetrics 實例。
+
+        Args:
+            registry (MetricsRegistry): 註冊指標的 registry，預設為全域共用的 registry。
+        """
+        self.registry = registry or get_registry()
+        self.requests = self.registry.counter(
+            'stock_requests_total', '庫存請求次數，status 為 HTTP 狀態碼、timeout 或 error', ('region', 'store', 'status'))
+        self.request_seconds = self.registry.histogram(
+            'stock_request_seconds', '庫存請求耗時（秒）', ('region', 'store'))
+        self.unchanged = self.registry.counter(
+            'stock_unchanged_responses_total', '回應沒有變化而沿用上次結果的次數（304 或內容相同）')
+        self.parse_seconds = self.registry.histogram(
+            'stock_parse_seconds', '解析庫存回應的耗時（秒）')
+        self.cycle_seconds = self.registry.histogram(
+            'stock_cycle_seconds', '每輪檢查（所有請求與合併）的耗時（秒）')
+        self.notification_seconds = self.registry.histogram(
+            'notification_seconds', '單一通知後端發送的耗時（秒），包含重試', ('notifier', 'outcome'))
+        self.detection_lag_seconds = self.registry.histogram(
+            'detection_lag_seconds', '從檢查到有現貨到通知送達的時間（秒）')
+        self.rate_wait_seconds = self.registry.histogram(
+            'rate_limit_wait_seconds', '請求前等待速率限制的時間（秒）', ('host',))
+        self.circuit_state = self.registry.gauge(
+            'circuit_breaker_state', '斷路器狀態，0 為正常、1 為探測中、2 為斷開', ('host',))
+        self.circuit_opens = self.registry.counter(
+            'circuit_breaker_opens_total', '斷路器斷開的次數', ('host',))
+        self.circuit_skipped = self.registry.counter(
+            'circuit_breaker_skipped_total', '斷路器斷開時略過的請求次數', ('host',))
+
+
+def start_metrics_server(port: int, host: str = '127.0.0.1', registry: MetricsRegistry = None) -> ThreadingHTTPServer:
+    """
+    在背景執行緒提供 /metrics。
+
+    Args:
+        port (int): 監聽埠號。
+        host (str): 監聽位址，預設只接受本機連線。
+        registry (MetricsRegistry): 要輸出的 registry，預設為全域共用的 registry。
+
+    Returns:
+        ThreadingHTTPServer: 伺服器，結束時呼叫 shutdown()。
+    """
+    registry = registry or get_registry()
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            if self.path.split('?', 1)[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = registry.render().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='metrics-server', daemon=True).start()
+    logging.info(f"指標已開放於 http://{host}:{server.server_address[1]}/metrics")
+    return server
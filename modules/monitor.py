@@ -0,0 +1,232 @@
+"""
+無介面的監控程式，適合在伺服器或容器中執行。
+
+使用方式：
+    python -m modules.monitor --part MYWY3ZP/A --part MYWX3ZP/A --notify-stdout
+    python -m modules.monitor --config monitor.json
+    python -m modules.monitor --subscriptions subscriptions.json
+"""
+import argparse
+import json
+import logging
+import signal
+import sys
+from .catalog import ModelCatalog
+from .governor import configure_governors
+from .history import AvailabilityHistory
+from .logger import setup_logging
+from .metrics import start_metrics_server
+from .notifiers import create_notifier
+from .scheduler import AdaptiveScheduler
+from .service import MonitorService, SubscriptionRegistry
+from .state import AvailabilityStateStore
+from .stock import StockChecker
+from .targets import WatchTarget
+from .useragent import configure_user_agents
+
+
+def parse_args(argv: list = None) -> argparse.Namespace:
+    """
+    解析命令列參數。
+
+    Args:
+        argv (list): 命令列參數，預設為 sys.argv[1:]。
+
+    Returns:
+        argparse.Namespace: 解析結果。
+    """
+    parser = argparse.ArgumentParser(prog='python -m modules.monitor', description='Apple 現貨監控（無介面模式）')
+    parser.add_argument('--config', help='JSON 設定檔，命令列參數會覆蓋設定檔中的同名設定')
+    parser.add_argument('-p', '--part', action='append', dest='parts', help='要監控的型號代碼，可重複指定')
+    parser.add_argument('-s', '--store', action='append', dest='stores', help='查詢的中心店鋪代碼，可重複指定')
+    parser.add_argument('--region', help='地區，例如 tw、hk、us（預設 tw）')
+    parser.add_argument('--interval', type=float, help='初始檢查間隔秒數（預設 300）')
+    parser.add_argument('--min-interval', type=float, help='檢查間隔下限秒數（預設 30）')
+    parser.add_argument('--max-interval', type=float, help='檢查間隔上限秒數（預設 1800）')
+    parser.add_argument('--batch-size', type=int, help='每個請求合併查詢的型號數量（預設 10）')
+    parser.add_argument('--line-token', help='Line Notify Token')
+    parser.add_argument('--notify-webhook', help='以 JSON POST 通知到此 webhook 網址')
+    parser.add_argument('--notify-stdout', action='store_true', default=None, help='將通知輸出到 stdout')
+    parser.add_argument('--catalog', help='型號 JSON 檔案路徑（預設 resources/iphone_models.json）')
+    parser.add_argument('--state', help='現貨狀態快照路徑，重新啟動後不會重複通知')
+    parser.add_argument('--history', help='將每輪檢查結果寫入此 SQLite 歷史紀錄檔')
+    parser.add_argument('--subscriptions', help='多使用者模式：訂閱清單 JSON 檔案')
+    parser.add_argument('--log-level', help='日誌等級（預設 INFO）')
+    parser.add_argument('--log-file', help='日誌檔案路徑，超過 5MB 時輪替並壓縮（預設只輸出到終端機）')
+    parser.add_argument('--summary-log', action='store_true', default=None, help='沒有變化的型號每輪只記錄一行摘要')
+    parser.add_argument('--metrics-port', type=int, help='在此埠號提供 Prometheus 格式的 /metrics')
+    parser.add_argument('--metrics-host', help='/metrics 的監聽位址（預設 127.0.0.1）')
+    parser.add_argument('--rate-limit', type=float, help='對 Apple 每秒最多平均請求數（預設 2）')
+    parser.add_argument('--circuit-cooldown', type=float, help='連續被限流或逾時後暫停請求的秒數，再次失敗時倍增（預設 60）')
+    return parser.parse_args(argv)
+
+
+def load_settings(args: argparse.Namespace) -> dict:
+    """
+    合併設定檔與命令列參數，命令列參數優先。
+
+    Args:
+        args (argparse.Namespace): 命令列參數。
+
+    Returns:
+        dict: 合併後的設定。
+    """
+    settings = {}
+    if args.config:
+        with open(args.config, 'r', encoding='utf-8') as f:
+            settings = json.load(f)
+    for key, value in vars(args).items():
+        if value is not None and key != 'config':
+            settings[key] = value
+    return settings
+
+
+def build_notifiers(settings: dict) -> list:
+    """
+    依設定建立通知後端。
+
+    Args:
+        settings (dict): 合併後的設定。
+
+    Returns:
+        list: Notifier 列表。
+    """
+    configs = list(settings.get('notifiers', []))
+    if settings.get('line_token'):
+        configs.append({'type': 'line', 'token': settings['line_token']})
+    if settings.get('notify_webhook'):
+        configs.append({'type': 'webhook', 'url': settings['notify_webhook']})
+    if settings.get('notify_stdout'):
+        configs.append({'type': 'stdout'})
+    return [create_notifier(config) for config in configs]
+
+
+def build_targets(settings: dict) -> list:
+    """
+    依設定建立監控目標；設定檔的 targets 優先，否則以 region 與 stores 組合。
+
+    Args:
+        settings (dict): 合併後的設定。
+
+    Returns:
+        list: WatchTarget 列表。
+    """
+    if settings.get('targets'):
+        return [WatchTarget.from_dict(target) for target in settings['targets']]
+    region = settings.get('region', 'tw')
+    stores = settings.get('stores') or ['R713']
+    return [WatchTarget(region=region, store=store) for store in stores]
+
+
+def build_models(codes: list, catalog: ModelCatalog) -> list:
+    """
+    將型號代碼轉成監控流程使用的機型字典，目錄中沒有的型號以代碼顯示。
+
+    Args:
+        codes (list): 型號代碼列表。
+        catalog (ModelCatalog): 型號目錄。
+
+    Returns:
+        list: 機型資訊列表。
+    """
+    models = []
+    for code in dict.fromkeys(codes):
+        record = catalog.get(code)
+        if record is None:
+            logging.warning(f"型號目錄中沒有 {code}，將以代碼顯示。")
+            models.append({'code': code, 'model': code, 'price': '', 'currency': '', 'capacity': '-', 'color': '-'})
+        else:
+            models.append(record.to_dict())
+    return models
+
+
+def main(argv: list = None) -> int:
+    """
+    命令列進入點。
+
+    Args:
+        argv (list): 命令列參數，預設為 sys.argv[1:]。
+
+    Returns:
+        int: 結束代碼。
+    """
+    args = parse_args(argv)
+    settings = load_settings(args)
+    setup_logging(settings.get('log_file'), level=settings.get('log_level', 'INFO').upper())
+
+    if settings.get('user_agents'):
+        configure_user_agents(settings['user_agents'])
+    governor_settings = {key: settings[name] for name, key in (('rate_limit', 'rate'), ('circuit_cooldown', 'cooldown'))
+                         if settings.get(name) is not None}
+    if governor_settings:
+        configure_governors(**governor_settings)
+
+    scheduler = AdaptiveScheduler(
+        base_interval=settings.get('interval', 300),
+        min_interval=settings.get('min_interval', 30),
+        max_interval=settings.get('max_interval', 1800),
+    )
+    catalog = ModelCatalog(settings.get('catalog', 'resources/iphone_models.json'))
+    checker = StockChecker(
+        token='',
+        json_path=catalog.json_path,
+        batch_size=settings.get('batch_size', 10),
+        scheduler=scheduler,
+        state_store=AvailabilityStateStore(settings.get('state')),
+        targets=build_targets(settings),
+        notifiers=build_notifiers(settings),
+        catalog=catalog,
+        summarize_logs=bool(settings.get('summary_log')),
+    )
+
+    history = AvailabilityHistory(settings['history']) if settings.get('history') else None
+    if history:
+        checker.result_listeners.append(history.record)
+
+    if settings.get('subscriptions'):
+        registry = SubscriptionRegistry.load(settings['subscriptions'])
+        runner = MonitorService(registry, checker)
+        stop = runner.stop
+        parts = registry.watched_parts()
+    else:
+        if not settings.get('parts'):
+            logging.error("請以 --part 或設定檔的 parts 指定至少一個型號。")
+            return 2
+        models = build_models(settings['parts'], catalog)
+        runner = None
+        stop = checker.stop
+        parts = [model['code'] for model in models]
+
+    if history:
+        # 以過去的到貨時段調整檢查頻率：常到貨的時段檢查得更頻繁，冷門時段放慢
+        history.backfill_transitions()
+        checker.predictor.fit(history, parts)
+
+    def handle_signal(signum, frame):
+        logging.info(f"收到訊號 {signum}，準備停止監控。")
+        stop()
+
+    signal.signal(signal.SIGTERM, handle_signal)
+    signal.signal(signal.SIGINT, handle_signal)
+
+    metrics_server = None
+    if settings.get('metrics_port') is not None:
+        metrics_server = start_metrics_server(settings['metrics_port'], settings.get('metrics_host', '127.0.0.1'),
+                                              checker.metrics.registry)
+
+    try:
+        if runner is not None:
+            runner.run()
+        else:
+            checker.monitor(models)
+    finally:
+        checker.close()
+        if history:
+            history.close()
+        if metrics_server:
+            metrics_server.shutdown()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
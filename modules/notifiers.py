@@ -0,0 +1,300 @@
+import asyncio
+import smtplib
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from email.message import EmailMessage
+import requests
+from .session import create_session, NOTIFY_TIMEOUT
+
+
+class NotificationError(Exception):
+    """通知發送失敗，retryable 表示是否值得重試。"""
+
+    def __init__(self, message: str, retryable: bool = True):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+class Notifier(ABC):
+    """通知後端的共同介面，子類別只需實作 send_sync。"""
+
+    name = 'notifier'
+
+    def __init__(self):
+        self.rate_limited_until = 0.0  # 後端要求暫停發送到此時間（epoch 秒）
+
+    @abstractmethod
+    def send_sync(self, message: str) -> None:
+        """
+        以阻塞方式發送一則訊息，失敗時拋出 NotificationError。
+
+        Args:
+            message (str): 要發送的通知訊息。
+        """
+
+    async def send(self, message: str) -> None:
+        """
+        在背景執行緒發送訊息，不阻塞事件迴圈。
+
+        Args:
+            message (str): 要發送的通知訊息。
+        """
+        await asyncio.to_thread(self.send_sync, message)
+
+    def close(self) -> None:
+        """釋放後端持有的連線。"""
+
+
+class HttpNotifier(Notifier):
+    """透過共用的 keep-alive Session 呼叫 HTTP API 的通知後端。"""
+
+    def __init__(self, session: requests.Session = None, timeout: tuple = NOTIFY_TIMEOUT):
+        """
+        Args:
+            session (requests.Session): 共用的 HTTP Session，未提供時自行建立。
+            timeout (tuple): (連線, 讀取) 逾時秒數。
+        """
+        super().__init__()
+        self._owns_session = session is None
+        self.session = session or create_session(pool_maxsize=2)
+        self.timeout = timeout
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        """
+        發送 POST 請求並檢查回應，同時記錄伺服器回傳的速率限制。
+
+        Args:
+            url (str): 請求網址。
+            **kwargs: 傳給 requests.Session.post 的參數。
+
+        Returns:
+            requests.Response: 成功的回應。
+        """
+        try:
+            response = self.session.post(url, timeout=self.timeout, **kwargs)
+        except requests.RequestException as e:
+            raise NotificationError(f"{self.name} 連線失敗：{e}") from e
+        self.update_rate_limit(response)
+        if 200 <= response.status_code < 300:
+            return response
+        retryable = response.status_code == 429 or response.status_code >= 500
+        raise NotificationError(f"{self.name} 回應 {response.status_code}：{response.text[:200]}", retryable)
+
+    def update_rate_limit(self, response: requests.Response) -> None:
+        """依 X-RateLimit-Remaining / X-RateLimit-Reset 或 Retry-After 標頭記錄需要暫停到何時。"""
+        headers = response.headers
+        try:
+            remaining = headers.get('X-RateLimit-Remaining')
+            reset = headers.get('X-RateLimit-Reset')
+            if reset and (response.status_code == 429 or (remaining is not None and int(remaining) <= 0)):
+                self.rate_limited_until = float(reset)
+            elif response.status_code == 429 and headers.get('Retry-After'):
+                self.rate_limited_until = time.time() + float(headers['Retry-After'])
+        except ValueError:
+            pass
+
+    def close(self) -> None:
+        if self._owns_session:
+            self.session.close()
+
+
+class LineNotifier(HttpNotifier):
+    """LINE Notify（已於 2025 年停止服務，保留給相容的自架服務使用）。"""
+
+    name = 'line'
+
+    def __init__(self, token: str, url: str = 'https://notify-api.line.me/api/notify', **kwargs):
+        """
+        Args:
+            token (str): Line Notify Token。
+            url (str): API 網址。
+            **kwargs: 傳給 HttpNotifier 的參數。
+        """
+        super().__init__(**kwargs)
+        self.token = token
+        self.url = url
+
+    def send_sync(self, message: str) -> None:
+        self.post(
+            self.url,
+            headers={'Authorization': f'Bearer {self.token}'},
+            data={'message': message}
+        )
+
+
+class WebhookNotifier(HttpNotifier):
+    """將訊息以 JSON POST 到任意 webhook，例如 Discord 或 Slack。"""
+
+    name = 'webhook'
+
+    def __init__(self, url: str, message_field: str = 'text', headers: dict = None, **kwargs):
+        """
+        Args:
+            url (str): webhook 網址。
+            message_field (str): 訊息放在 JSON 的欄位名稱，Discord 為 'content'，Slack 為 'text'。
+            headers (dict): 額外的請求標頭。
+            **kwargs: 傳給 HttpNotifier 的參數。
+        """
+        super().__init__(**kwargs)
+        self.url = url
+        self.message_field = message_field
+        self.headers = headers or {}
+
+    def send_sync(self, message: str) -> None:
+        self.post(self.url, json={self.message_field: message}, headers=self.headers)
+
+
+class TelegramNotifier(HttpNotifier):
+    """透過 Telegram 風格的 Bot API（sendMessage）發送訊息。"""
+
+    name = 'telegram'
+
+    def __init__(self, bot_token: str, chat_id: str, api_base: str = 'https://api.telegram.org', **kwargs):
+        """
+        Args:
+            bot_token (str): Bot token。
+            chat_id (str): 接收訊息的 chat id。
+            api_base (str): API 網址前綴，可改為相容的自架服務。
+            **kwargs: 傳給 HttpNotifier 的參數。
+        """
+        super().__init__(**kwargs)
+        self.url = f"{api_base.rstrip('/')}/bot{bot_token}/sendMessage"
+        self.chat_id = chat_id
+
+    def send_sync(self, message: str) -> None:
+        self.post(self.url, json={'chat_id': self.chat_id, 'text': message})
+
+
+class SmtpNotifier(Notifier):
+    """以電子郵件發送通知，SMTP 連線會保留給下一次使用。"""
+
+    name = 'smtp'
+
+    def __init__(
+        self,
+        host: str,
+        sender: str,
+        recipients: list,
+        port: int = 587,
+        username: str = None,
+        password: str = None,
+        starttls: bool = True,
+        subject: str = 'Apple 現貨通知',
+        timeout: float = 10
+    ):
+        """
+        Args:
+            host (str): SMTP 伺服器。
+            sender (str): 寄件者地址。
+            recipients (list): 收件者地址列表。
+            port (int): SMTP 連接埠。
+            username (str): 登入帳號，為 None 時不登入。
+            password (str): 登入密碼。
+            starttls (bool): 是否使用 STARTTLS。
+            subject (str): 郵件主旨。
+            timeout (float): 連線逾時秒數。
+        """
+        super().__init__()
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.recipients = list(recipients)
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.subject = subject
+        self.timeout = timeout
+        self._smtp = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> smtplib.SMTP:
+        smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.starttls:
+            smtp.starttls()
+        if self.username:
+            smtp.login(self.username, self.password)
+        return smtp
+
+    def send_sync(self, message: str) -> None:
+        email = EmailMessage()
+        email['From'] = self.sender
+        email['To'] = ', '.join(self.recipients)
+        email['Subject'] = self.subject
+        email.set_content(message)
+        with self._lock:
+            for attempt in range(2):
+                try:
+                    if self._smtp is None:
+                        self._smtp = self._connect()
+                    self._smtp.send_message(email)
+                    return
+                except smtplib.SMTPServerDisconnected:
+                    # 保留的連線已被伺服器關閉，重新連線一次
+                    self._smtp = None
+                except (smtplib.SMTPException, OSError) as e:
+                    self._smtp = None
+                    raise NotificationError(f"smtp 發送失敗：{e}") from e
+        raise NotificationError("smtp 連線中斷")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._smtp is not None:
+                try:
+                    self._smtp.quit()
+                except (smtplib.SMTPException, OSError):
+                    pass
+                self._smtp = None
+
+
+class FileNotifier(Notifier):
+    """將訊息寫入本機檔案或標準輸出，適合測試或搭配其他程式讀取。"""
+
+    name = 'file'
+
+    def __init__(self, path: str = None):
+        """
+        Args:
+            path (str): 輸出檔案路徑，為 None 時寫到 stdout。
+        """
+        super().__init__()
+        self.path = path
+        self._lock = threading.Lock()
+
+    def send_sync(self, message: str) -> None:
+        line = f"{time.strftime('%Y-%m-%d %H:%M:%S')} {message}\n"
+        with self._lock:
+            try:
+                if self.path is None:
+                    sys.stdout.write(line)
+                    sys.stdout.flush()
+                else:
+                    with open(self.path, 'a', encoding='utf-8') as f:
+                        f.write(line)
+            except OSError as e:
+                raise NotificationError(f"file 寫入失敗：{e}", retryable=False) from e
+
+
+def create_notifier(config: dict, session: requests.Session = None) -> Notifier:
+    """
+    依設定建立通知後端。
+
+    Args:
+        config (dict): 包含 'type' 與該後端參數的字典，例如 {"type": "webhook", "url": "..."}。
+        session (requests.Session): HTTP 後端共用的 Session。
+
+    Returns:
+        Notifier: 通知後端。
+    """
+    options = dict(config)
+    kind = options.pop('type')
+    http_backends = {'line': LineNotifier, 'webhook': WebhookNotifier, 'telegram': TelegramNotifier}
+    if kind in http_backends:
+        return http_backends[kind](session=session, **options)
+    if kind == 'smtp':
+        return SmtpNotifier(**options)
+    if kind in ('file', 'stdout'):
+        return FileNotifier(**options)
+    raise ValueError(f"未知的通知類型：{kind}")
+
@@ -0,0 +1,177 @@
+import asyncio
+import logging
+import queue
+import threading
+import time
+from .notifiers import NotificationError
+
+
+class NotificationDispatcher:
+    """以背景執行緒發送通知的佇列，合併短時間內的多則訊息，並同時送到所有通知後端。"""
+
+    def __init__(
+        self,
+        notifiers: list,
+        coalesce_window: float = 2.0,
+        max_retries: int = 3,
+        backoff_factor: float = 2.0,
+        metrics=None
+    ):
+        """
+        初始化 NotificationDispatcher 實例。
+
+        Args:
+            notifiers (list): Notifier 列表，每則訊息會同時送到所有後端。
+            coalesce_window (float): 收到第一則訊息後等待合併其他訊息的秒數。
+            max_retries (int): 單一後端發送失敗時的最大重試次數。
+            backoff_factor (float): 重試間隔的指數退避係數（秒）。
+            metrics (MonitorMetrics): 記錄各後端發送耗時的指標，為 None 時不記錄。
+        """
+        self.notifiers = list(notifiers)
+        self.coalesce_window = coalesce_window
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.metrics = metrics
+        self.queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """啟動背景發送執行緒，重複呼叫不會建立多個執行緒。"""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="notification-dispatcher", daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout: float = 10) -> None:
+        """
+        送出佇列中剩餘的訊息後停止背景執行緒。
+
+        Args:
+            timeout (float): 等待執行緒結束的最長秒數。
+        """
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is not None and thread.is_alive():
+            self.queue.put(None)
+            thread.join(timeout)
+
+    def submit(self, message: str, notifiers: list = None, on_delivered=None) -> None:
+        """
+        將訊息放入佇列，立即返回而不等待發送。
+
+        Args:
+            message (str): 要發送的通知訊息。
+            notifiers (list): 這則訊息要送到的後端，未提供時使用建立時設定的 notifiers。
+            on_delivered (Callable[[bool], None]): 發送完成後的回呼，參數為是否至少送達一個後端。
+        """
+        notifiers = tuple(self.notifiers if notifiers is None else notifiers)
+        if not notifiers:
+            logging.warning(f"未設定任何通知方式，略過通知：{message}")
+            return
+        self.start()
+        self.queue.put((message, notifiers, on_delivered))
+
+    def _run(self) -> None:
+        loop = asyncio.new_event_loop()
+        try:
+            while True:
+                item = self.queue.get()
+                if item is None:
+                    return
+                items = [item]
+                stopping = False
+                deadline = time.monotonic() + self.coalesce_window
+                while not stopping:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = self.queue.get(timeout=remaining)
+                    except queue.Empty:
+                        break
+                    if item is None:
+                        stopping = True
+                    else:
+                        items.append(item)
+                loop.run_until_complete(self._deliver_items(items))
+                if stopping:
+                    return
+        finally:
+            loop.close()
+
+    async def _deliver_items(self, items: list) -> None:
+        """將同一組後端的訊息合併成一則，各組同時發送，完成後呼叫各訊息的回呼。"""
+        groups = {}  # {notifiers: [(message, on_delivered), ...]}
+        for message, notifiers, on_delivered in items:
+            groups.setdefault(notifiers, []).append((message, on_delivered))
+
+        async def deliver_group(notifiers: tuple, entries: list) -> None:
+            results = await self.deliver("\n".join(message for message, _ in entries), notifiers)
+            for _, on_delivered in entries:
+                if on_delivered is not None:
+                    on_delivered(any(results))
+
+        await asyncio.gather(*(deliver_group(notifiers, entries) for notifiers, entries in groups.items()))
+
+    async def deliver(self, message: str, notifiers: tuple = None) -> list:
+        """
+        同時將訊息送到多個通知後端。
+
+        Args:
+            message (str): 合併後的通知訊息。
+            notifiers (tuple): 要送到的後端，未提供時使用建立時設定的 notifiers。
+
+        Returns:
+            list: 與 notifiers 對應的發送結果（bool）。
+        """
+        notifiers = self.notifiers if notifiers is None else notifiers
+        return await asyncio.gather(*(self._deliver_one(notifier, message) for notifier in notifiers))
+
+    async def _deliver_one(self, notifier, message: str) -> bool:
+        """
+        發送到單一後端並記錄耗時。
+
+        Args:
+            notifier (Notifier): 通知後端。
+            message (str): 通知訊息。
+
+        Returns:
+            bool: 是否發送成功。
+        """
+        started = time.monotonic()
+        delivered = await self._send_with_retries(notifier, message)
+        if self.metrics is not None:
+            self.metrics.notification_seconds.observe(
+                time.monotonic() - started, notifier=notifier.name, outcome='ok' if delivered else 'failed')
+        return delivered
+
+    async def _send_with_retries(self, notifier, message: str) -> bool:
+        """
+        發送到單一後端，失敗或被限速時依退避時間重試。
+
+        Args:
+            notifier (Notifier): 通知後端。
+            message (str): 通知訊息。
+
+        Returns:
+            bool: 是否發送成功。
+        """
+        for attempt in range(self.max_retries + 1):
+            wait = notifier.rate_limited_until - time.time()
+            if wait > 0:
+                logging.warning(f"{notifier.name} 通知已達速率限制，等待 {wait:.0f} 秒。")
+                await asyncio.sleep(wait)
+            try:
+                await notifier.send(message)
+                logging.info(f"{notifier.name} 通知發送成功")
+                return True
+            except NotificationError as e:
+                logging.error(f"通知發送失敗：{e}")
+                if not e.retryable:
+                    return False
+            if attempt < self.max_retries:
+                await asyncio.sleep(self.backoff_factor * (2 ** attempt))
+        logging.error(f"{notifier.name} 通知重試 {self.max_retries} 次後仍失敗，放棄發送。")
+        return False
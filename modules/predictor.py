@@ -0,0 +1,126 @@
+import logging
+import threading
+import time
+
+SLOTS = 7 * 24  # 一週中的每個小時
+
+
+def time_slot(timestamp: float) -> int:
+    """
+    將時間轉成一週中的小時編號（星期一 0 點為 0）。
+
+    Args:
+        timestamp (float): epoch 秒。
+
+    Returns:
+        int: 0 ~ 167。
+    """
+    local = time.localtime(timestamp)
+    return local.tm_wday * 24 + local.tm_hour
+
+
+class RestockPredictor:
+    """依過去的到貨時間，估計各型號在一週中每個小時到貨的可能性。"""
+
+    def __init__(self, smoothing: float = 1.0, min_factor: float = 0.25, max_factor: float = 4.0):
+        """
+        初始化 RestockPredictor 實例。
+
+        Args:
+            smoothing (float): 每個時段預設的虛擬到貨次數（Laplace smoothing），資料少時讓估計接近平均。
+            min_factor (float): 檢查間隔最多縮短為原本的倍數。
+            max_factor (float): 檢查間隔最多放大為原本的倍數。
+        """
+        self.smoothing = smoothing
+        self.min_factor = min_factor
+        self.max_factor = max_factor
+        self.counts = {}  # {型號代碼: [各時段的到貨次數] * SLOTS}
+        self.global_counts = [0] * SLOTS
+        self._lock = threading.Lock()
+
+    def record_restock(self, part: str, timestamp: float) -> None:
+        """
+        記錄一次到貨。
+
+        Args:
+            part (str): 型號代碼。
+            timestamp (float): 到貨時間（epoch 秒）。
+        """
+        slot = time_slot(timestamp)
+        with self._lock:
+            self.counts.setdefault(part, [0] * SLOTS)[slot] += 1
+            self.global_counts[slot] += 1
+
+    def observe(self, events: list) -> None:
+        """
+        記錄狀態轉換事件，只有無現貨 → 有現貨的事件會計入。
+
+        Args:
+            events (list): AvailabilityEvent 列表。
+        """
+        for event in events:
+            if event.available:
+                self.record_restock(event.part, event.timestamp)
+
+    def fit(self, history, parts: list, since: float = None) -> int:
+        """
+        從歷史紀錄載入過去的到貨時間。
+
+        Args:
+            history (AvailabilityHistory): 現貨歷史紀錄。
+            parts (list): 要載入的型號代碼。
+            since (float): 只載入此時間之後的紀錄，預設為最近 90 天。
+
+        Returns:
+            int: 載入的到貨次數。
+        """
+        since = time.time() - 90 * 86400 if since is None else since
+        total = 0
+        # 轉換與時段的統計在 SQLite 中完成，只取回每個 (型號, 時段) 的次數
+        restocks = history.restock_slot_counts(parts, since=since)
+        with self._lock:
+            for part, slots in restocks.items():
+                counts = self.counts.setdefault(part, [0] * SLOTS)
+                for slot, count in slots.items():
+                    counts[slot] += count
+                    self.global_counts[slot] += count
+                    total += count
+        logging.info(f"已從歷史紀錄載入 {total} 次到貨時間。")
+        return total
+
+    def likelihood(self, part: str, timestamp: float) -> float:
+        """
+        估計某型號在某時段到貨的相對可能性。
+
+        Args:
+            part (str): 型號代碼。
+            timestamp (float): 要估計的時間（epoch 秒）。
+
+        Returns:
+            float: 相對於一週平均的倍數，1.0 表示與平均相同。該型號沒有紀錄時改用所有型號的整體分布。
+        """
+        with self._lock:
+            counts = self.counts.get(part) or self.global_counts
+            total = sum(counts)
+            if not total:
+                return 1.0
+            slot = time_slot(timestamp)
+            return (counts[slot] + self.smoothing) * SLOTS / (total + self.smoothing * SLOTS)
+
+    def interval_factor(self, part: str, start: float, end: float = None) -> float:
+        """
+        依到貨可能性調整檢查間隔的倍數：可能性高時縮短，冷門時段拉長。
+        以 start ~ end 之間可能性最高的時段為準，避免拉長間隔後錯過即將到來的熱門時段。
+
+        Args:
+            part (str): 型號代碼。
+            start (float): 等待開始的時間（epoch 秒）。
+            end (float): 原本預定的下一次檢查時間，預設與 start 相同。
+
+        Returns:
+            float: 介於 min_factor 與 max_factor 之間的倍數。
+        """
+        end = start if end is None else end
+        hours = min(SLOTS, int((end - start) // 3600) + 1)
+        peak = max(self.likelihood(part, start + hour * 3600) for hour in range(hours))
+        return min(self.max_factor, max(self.min_factor, 1 / peak))
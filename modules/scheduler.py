@@ -0,0 +1,194 @@
+import heapq
+import logging
+import threading
+import time
+
+
+class AdaptiveScheduler:
+    """依每個型號最近的變化程度，動態調整下一次檢查時間的排程器。"""
+
+    def __init__(
+        self,
+        base_interval: float = 300,
+        min_interval: float = 30,
+        max_interval: float = 1800,
+        backoff_factor: float = 1.5,
+        throttle_interval: float = 60,
+        max_throttle_interval: float = 1800,
+        predictor=None
+    ):
+        """
+        初始化 AdaptiveScheduler 實例。
+
+        Args:
+            base_interval (float): 新加入型號的初始檢查間隔（秒）。
+            min_interval (float): 檢查間隔下限，狀態有變化時直接縮短到此值。
+            max_interval (float): 檢查間隔上限，長時間沒有變化的型號最多退避到此值。
+            backoff_factor (float): 沒有變化時檢查間隔的放大倍數。
+            throttle_interval (float): 收到 429/503 時第一次暫停的秒數，連續發生時倍增。
+            max_throttle_interval (float): 429/503 暫停秒數上限。
+            predictor (RestockPredictor): 到貨時段預測，提供時依下一次檢查時段的到貨可能性縮短或拉長間隔。
+        """
+        self.base_interval = base_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff_factor = backoff_factor
+        self.throttle_interval = throttle_interval
+        self.max_throttle_interval = max_throttle_interval
+        self.predictor = predictor
+        self.intervals = {}  # {key: 目前的檢查間隔}
+        self.signatures = {}  # {key: 上一次回應的狀態指紋}
+        self.next_checks = {}  # {key: 下一次檢查時間}
+        self._heap = []  # [(下一次檢查時間, key)]，可能包含已過期的項目
+        self.throttle_until = 0.0
+        self._throttle_count = 0
+        self._lock = threading.Lock()
+
+    def add(self, key: str, now: float = None) -> None:
+        """
+        加入一個要排程的型號，並安排立即檢查。
+
+        Args:
+            key (str): 型號代碼。
+            now (float): 目前時間，預設為 time.time()。
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            self.intervals.setdefault(key, self.base_interval)
+            self._schedule(key, now)
+
+    def remove(self, key: str) -> None:
+        """
+        停止排程一個型號，並清除它的間隔與狀態指紋；之後需要再以 add() 加入。
+
+        Args:
+            key (str): 型號代碼。
+        """
+        with self._lock:
+            self.intervals.pop(key, None)
+            self.signatures.pop(key, None)
+            self.next_checks.pop(key, None)  # 堆積中的舊項目會在 due() 中被略過
+
+    def _schedule(self, key: str, when: float) -> None:
+        self.next_checks[key] = when
+        heapq.heappush(self._heap, (when, key))
+
+    def due(self, now: float = None, lookahead: float = 0) -> list:
+        """
+        取出已到期的型號。lookahead 秒內即將到期的型號也會一併取出，以便合併到同一批請求。
+
+        Args:
+            now (float): 目前時間，預設為 time.time()。
+            lookahead (float): 提前取出的秒數。
+
+        Returns:
+            list: 到期的型號代碼列表，暫停期間返回空列表。
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            if now < self.throttle_until:
+                return []
+            keys = []
+            while self._heap and self._heap[0][0] <= now + lookahead:
+                when, key = heapq.heappop(self._heap)
+                if self.next_checks.get(key) == when:
+                    del self.next_checks[key]
+                    keys.append(key)
+            return keys
+
+    def seconds_until_next(self, now: float = None) -> float:
+        """
+        計算距離下一個型號到期還有多少秒。
+
+        Args:
+            now (float): 目前時間，預設為 time.time()。
+
+        Returns:
+            float: 等待秒數，沒有排程中的型號時返回 max_interval。
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            next_time = min(self.next_checks.values(), default=now + self.max_interval)
+            return max(0.0, max(next_time, self.throttle_until) - now)
+
+    def record_result(self, key: str, signature, now: float = None) -> float:
+        """
+        記錄一次成功的檢查結果，狀態有變化時縮短間隔，沒有變化時指數退避；
+        設定 predictor 時再依下一次檢查時段的到貨可能性調整。
+
+        Args:
+            key (str): 型號代碼。
+            signature: 此次回應的狀態指紋，例如各店鋪的取貨狀態與到貨時間。
+            now (float): 目前時間，預設為 time.time()。
+
+        Returns:
+            float: 距離下一次檢查的秒數。
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            self._throttle_count = 0
+            previous = self.signatures.get(key)
+            self.signatures[key] = signature
+            interval = self.intervals.get(key, self.base_interval)
+            if previous is not None and previous != signature:
+                interval = self.min_interval
+            elif previous is not None:
+                interval = interval * self.backoff_factor
+            interval = min(self.max_interval, max(self.min_interval, interval))
+            self.intervals[key] = interval
+            delay = interval
+            if self.predictor is not None:
+                # 只調整這一次的等待時間，退避的基準間隔不受時段影響
+                delay = min(self.max_interval, max(self.min_interval,
+                                                   interval * self.predictor.interval_factor(key, now, now + interval)))
+            self._schedule(key, now + delay)
+            return delay
+
+    def record_failure(self, key: str, now: float = None, delay: float = None) -> None:
+        """
+        記錄一次失敗的檢查，以目前間隔重新排程而不改變間隔。
+
+        Args:
+            key (str): 型號代碼。
+            now (float): 目前時間，預設為 time.time()。
+            delay (float): 重新檢查前的秒數，提供時改用此值與目前間隔中較短者，例如斷路器恢復的時間。
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            interval = self.intervals.get(key, self.base_interval)
+            if delay is not None:
+                interval = min(interval, delay)
+            self._schedule(key, now + interval)
+
+    def record_throttled(self, retry_after: float = None, now: float = None) -> float:
+        """
+        收到 HTTP 429/503 時暫停所有檢查，連續發生時暫停時間倍增。
+
+        Args:
+            retry_after (float): 伺服器要求的等待秒數（Retry-After），會作為暫停時間的下限。
+            now (float): 目前時間，預設為 time.time()。
+
+        Returns:
+            float: 暫停秒數。
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            delay = min(self.max_throttle_interval, self.throttle_interval * (2 ** self._throttle_count))
+            if retry_after:
+                delay = max(delay, retry_after)
+            self._throttle_count += 1
+            self.throttle_until = max(self.throttle_until, now + delay)
+        logging.warning(f"請求被限制，暫停檢查 {delay:g} 秒。")
+        return delay
+
+    def pause(self, delay: float, now: float = None) -> None:
+        """
+        暫停所有檢查，不影響 429/503 的倍增計數，例如斷路器斷開時。
+
+        Args:
+            delay (float): 暫停秒數。
+            now (float): 目前時間，預設為 time.time()。
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            self.throttle_until = max(self.throttle_until, now + delay)
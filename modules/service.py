@@ -0,0 +1,266 @@
+import functools
+import json
+import logging
+import threading
+from dataclasses import dataclass, field
+from .notifiers import Notifier, LineNotifier, create_notifier
+from .stock import StockChecker
+from .targets import WatchTarget
+
+
+@dataclass(eq=False)
+class Subscription:
+    """單一訂閱者：用哪個 token 通知、監控哪些型號與店鋪，以及剩餘的成功通知次數。"""
+
+    token: str
+    parts: tuple
+    stores: tuple = ()  # 只關心這些店鋪，空 tuple 表示任何店鋪
+    quota: int = 3
+    region: str = 'tw'
+    anchor_store: str = 'R713'
+    notifier: Notifier = None
+    primed_parts: set = field(default_factory=set, repr=False)  # 已送出訂閱當下現貨狀態的型號
+
+    @property
+    def query_key(self) -> tuple:
+        """此訂閱的查詢目標，與 SubscriptionRegistry.targets() 建立的 WatchTarget 相同。"""
+        return WatchTarget(self.region, self.anchor_store).query_key
+
+    @property
+    def active(self) -> bool:
+        """是否還有剩餘的通知次數。"""
+        return self.quota > 0
+
+    def wants(self, part: str, store: str) -> bool:
+        """
+        判斷此訂閱是否關心某型號在某店鋪的狀態；店鋪是否屬於此訂閱的地區由 run_cycle 依查詢來源判斷。
+
+        Args:
+            part (str): 型號代碼。
+            store (str): 店鋪名稱。
+
+        Returns:
+            bool: 是否關心。
+        """
+        return part in self.parts and (not self.stores or store in self.stores)
+
+
+class SubscriptionRegistry:
+    """所有訂閱的登記表，提供排程需要的型號、查詢目標與分送對象。"""
+
+    def __init__(self):
+        self.subscriptions = {}  # {token: Subscription}
+        self._lock = threading.Lock()
+
+    def add(self, subscription: Subscription) -> None:
+        """
+        新增或取代一個訂閱。
+
+        Args:
+            subscription (Subscription): 訂閱資訊。
+        """
+        if subscription.notifier is None:
+            subscription.notifier = LineNotifier(subscription.token)
+        with self._lock:
+            self.subscriptions[subscription.token] = subscription
+        logging.info(f"新增訂閱：{len(subscription.parts)} 個型號，剩餘 {subscription.quota} 次通知。")
+
+    def remove(self, token: str) -> None:
+        """
+        移除訂閱。
+
+        Args:
+            token (str): 訂閱的 token。
+        """
+        with self._lock:
+            subscription = self.subscriptions.pop(token, None)
+        if subscription and subscription.notifier:
+            subscription.notifier.close()
+
+    def active(self) -> list:
+        """
+        取得還有剩餘通知次數的訂閱。
+
+        Returns:
+            list: Subscription 列表。
+        """
+        with self._lock:
+            return [subscription for subscription in self.subscriptions.values() if subscription.active]
+
+    def watched_parts(self) -> list:
+        """
+        取得所有有效訂閱監控的型號，相同型號只出現一次。
+
+        Returns:
+            list: 型號代碼列表。
+        """
+        return list(dict.fromkeys(part for subscription in self.active() for part in subscription.parts))
+
+    def targets(self) -> list:
+        """
+        將有效訂閱轉成 WatchTarget，相同地區與店鋪的訂閱會由 plan_queries 合併成同一個請求。
+
+        Returns:
+            list: WatchTarget 列表。
+        """
+        return [WatchTarget(s.region, s.anchor_store, tuple(s.parts)) for s in self.active()]
+
+    def subscribers(self, part: str) -> list:
+        """
+        取得監控某型號的有效訂閱。
+
+        Args:
+            part (str): 型號代碼。
+
+        Returns:
+            list: Subscription 列表。
+        """
+        return [subscription for subscription in self.active() if part in subscription.parts]
+
+    def consume(self, subscription: Subscription) -> None:
+        """
+        扣除一次成功通知，次數用完時停止監控該訂閱。
+
+        Args:
+            subscription (Subscription): 訂閱資訊。
+        """
+        with self._lock:
+            subscription.quota = max(0, subscription.quota - 1)
+            remaining = subscription.quota
+        logging.info(f"訂閱剩餘 {remaining} 次通知。")
+
+    @classmethod
+    def load(cls, path: str) -> 'SubscriptionRegistry':
+        """
+        從 JSON 檔案載入訂閱，格式為訂閱字典的列表，notifier 欄位與 create_notifier 的設定相同。
+
+        Args:
+            path (str): JSON 檔案路徑。
+
+        Returns:
+            SubscriptionRegistry: 登記表。
+        """
+        registry = cls()
+        with open(path, 'r', encoding='utf-8') as f:
+            entries = json.load(f)
+        for entry in entries:
+            notifier_config = entry.get('notifier')
+            registry.add(Subscription(
+                token=entry['token'],
+                parts=tuple(entry['parts']),
+                stores=tuple(entry.get('stores', ())),
+                quota=entry.get('quota', 3),
+                region=entry.get('region', 'tw'),
+                anchor_store=entry.get('anchor_store', 'R713'),
+                notifier=create_notifier(notifier_config) if notifier_config else None,
+            ))
+        return registry
+
+
+class MonitorService:
+    """無介面的監控服務：每輪只查詢一次各個型號與店鋪，再把結果分送給所有訂閱者。"""
+
+    def __init__(self, registry: SubscriptionRegistry, checker: StockChecker):
+        """
+        初始化 MonitorService 實例。
+
+        Args:
+            registry (SubscriptionRegistry): 訂閱登記表。
+            checker (StockChecker): 負責查詢、排程與狀態記錄的 StockChecker。
+        """
+        self.registry = registry
+        self.checker = checker
+        self.stop_event = threading.Event()
+
+    def label(self, part: str) -> str:
+        """
+        取得型號的顯示名稱，目錄中沒有時使用型號代碼。
+
+        Args:
+            part (str): 型號代碼。
+
+        Returns:
+            str: 顯示名稱。
+        """
+        record = self.checker.catalog.get(part)
+        if record is None:
+            return part
+        return f"{record.name} - {record.color} ({record.capacity})"
+
+    def run_cycle(self) -> None:
+        """檢查所有到期的型號，並通知狀態有變化或剛加入的訂閱者。"""
+        scheduler = self.checker.scheduler
+        watched = set(self.registry.watched_parts())
+        for part in watched:
+            if part not in scheduler.intervals:
+                scheduler.add(part)
+        # 已經沒有訂閱者的型號停止排程，之後有人訂閱時會重新加入
+        for part in set(scheduler.intervals) - watched:
+            scheduler.remove(part)
+        self.checker.targets = self.registry.targets()
+        due_parts = []
+        for part in scheduler.due(lookahead=scheduler.min_interval):
+            if self.registry.subscribers(part):
+                due_parts.append(part)
+            else:
+                scheduler.remove(part)
+        if not due_parts:
+            return
+
+        result = self.checker.fetch_availability(due_parts)
+        self.checker.publish_result(result)
+        restocked = {}  # {型號代碼: [開始有現貨的店鋪, ...]}
+        for part in due_parts:
+            if part not in result:
+                continue
+            events = self.checker.update_state(part, result.available_stores(part), result.checked_stores(part))
+            restocked[part] = [event.store for event in events if event.available]
+
+        pending = {}  # {Subscription: {型號代碼: 訊息}}
+        for part, stores in restocked.items():
+            for subscription in self.registry.subscribers(part):
+                # 剛加入的訂閱者也需要知道目前已經有現貨的店鋪
+                candidates = stores if part in subscription.primed_parts else result.available_stores(part)
+                subscription.primed_parts.add(part)
+                # 所有地區的店鋪合併在同一個結果中，只通知來自此訂閱自己查詢的店鋪
+                own_stores = set(result.checked_stores(part, subscription.query_key))
+                matched = [store for store in candidates
+                           if store in own_stores and subscription.wants(part, store)]
+                if matched:
+                    pending.setdefault(subscription, {})[part] = f"{self.label(part)} 在 {'、'.join(matched)} 有現貨！"
+
+        for subscription, messages in pending.items():
+            self.checker.dispatcher.submit(
+                "\n".join(messages.values()),
+                notifiers=[subscription.notifier],
+                on_delivered=functools.partial(
+                    self.on_delivered, subscription, detected_at=result.earliest_check(messages))
+            )
+        logging.info(f"本輪檢查 {len(due_parts)} 個型號，通知 {len(pending)} 位訂閱者。")
+
+    def on_delivered(self, subscription: Subscription, delivered: bool, detected_at: float = None) -> None:
+        """
+        通知送達後扣除訂閱的剩餘次數，發送失敗不扣次數。
+
+        Args:
+            subscription (Subscription): 訂閱資訊。
+            delivered (bool): 是否送達。
+            detected_at (float): 到貨通知對應的檢查時間，送達後記錄偵測延遲。
+        """
+        if delivered:
+            self.registry.consume(subscription)
+            if detected_at:
+                self.checker.record_detection_lag(detected_at, delivered)
+
+    def run(self) -> None:
+        """持續執行監控，直到呼叫 stop()。"""
+        logging.info("監控服務已啟動。")
+        while not self.stop_event.is_set():
+            self.run_cycle()
+            wait = max(1.0, self.checker.scheduler.seconds_until_next())
+            self.stop_event.wait(wait)
+        logging.info("監控服務已停止。")
+
+    def stop(self) -> None:
+        """要求監控迴圈在目前這輪結束後停止。"""
+        self.stop_event.set()
@@ -0,0 +1,48 @@
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# (連線逾時, 讀取逾時)，單位為秒
+DEFAULT_TIMEOUT = (3.05, 10)
+NOTIFY_TIMEOUT = (3.05, 5)
+
+
+def create_session(
+    pool_connections: int = 4,
+    pool_maxsize: int = 10,
+    max_retries: int = 2,
+    backoff_factor: float = 0.5,
+    status_forcelist: tuple = (500, 502, 504),
+) -> requests.Session:
+    """
+    建立可重複使用的 HTTP Session，保持 keep-alive 連線以省去每次請求的 TCP/TLS 握手。
+
+    Args:
+        pool_connections (int): 連線池快取的主機數量。
+        pool_maxsize (int): 每個主機最多保留的連線數，超過時會等待而不是另開連線。
+        max_retries (int): 連線錯誤或 status_forcelist 狀態碼的最大重試次數，讀取逾時不重試。
+        backoff_factor (float): 重試間隔的指數退避係數。
+        status_forcelist (tuple): 需要重試的 HTTP 狀態碼。
+
+    Returns:
+        requests.Session: 已掛載連線池與重試機制的 Session。
+    """
+    retry = Retry(
+        total=max_retries,
+        read=0,  # 讀取逾時不重試，直接交給斷路器計算，避免每個請求阻塞數倍的讀取逾時
+        backoff_factor=backoff_factor,
+        status_forcelist=status_forcelist,
+        allowed_methods=frozenset(['GET', 'HEAD']),  # POST 不重試，避免重複發送通知
+        respect_retry_after_header=False,  # 429/503 交給排程器與斷路器暫停，不在請求中阻塞等待 Retry-After
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=retry,
+        pool_block=True,
+    )
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
@@ -0,0 +1,99 @@
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class AvailabilityEvent:
+    """單一 (型號, 店鋪) 的庫存狀態轉換。"""
+
+    part: str
+    store: str
+    available: bool
+    timestamp: float
+
+
+class AvailabilityStateStore:
+    """記錄每個 (型號, 店鋪) 的現貨狀態，只在狀態改變時產生事件。"""
+
+    def __init__(self, snapshot_path: str = None):
+        """
+        初始化 AvailabilityStateStore 實例，若快照存在則載入上次的狀態。
+
+        Args:
+            snapshot_path (str): 狀態快照的檔案路徑，為 None 時只保存在記憶體中。
+        """
+        self.snapshot_path = snapshot_path
+        self.available = {}  # {型號代碼: {有現貨的店鋪, ...}}
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self) -> None:
+        """從快照檔案載入狀態，檔案不存在或損毀時從空狀態開始。"""
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return
+        try:
+            with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.available = {part: set(stores) for part, stores in data.items()}
+            logging.info(f"已載入 {len(self.available)} 個型號的現貨狀態快照。")
+        except (OSError, ValueError) as e:
+            logging.error(f"載入現貨狀態快照失敗：{e}")
+
+    def save(self) -> None:
+        """將目前狀態寫入快照，先寫入暫存檔再取代，避免寫到一半中斷造成檔案損毀。"""
+        if not self.snapshot_path:
+            return
+        data = {part: sorted(stores) for part, stores in self.available.items() if stores}
+        tmp_path = f"{self.snapshot_path}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(tmp_path, self.snapshot_path)
+        except OSError as e:
+            logging.error(f"儲存現貨狀態快照失敗：{e}")
+
+    def is_available(self, part: str, store: str) -> bool:
+        """
+        查詢某型號在某店鋪目前是否有現貨。
+
+        Args:
+            part (str): 型號代碼。
+            store (str): 店鋪名稱。
+
+        Returns:
+            bool: 是否有現貨。
+        """
+        return store in self.available.get(part, ())
+
+    def update(self, part: str, available_stores, timestamp: float = None, checked_stores=None) -> list:
+        """
+        以最新的檢查結果更新狀態，並返回有變化的 (型號, 店鋪)。
+
+        Args:
+            part (str): 型號代碼。
+            available_stores: 此次檢查中有現貨的店鋪名稱。
+            timestamp (float): 檢查時間，預設為 time.time()。
+            checked_stores: 此次實際查詢成功的店鋪名稱，提供時其他店鋪維持原本的狀態；
+                為 None 時視為所有店鋪都已檢查。
+
+        Returns:
+            list: AvailabilityEvent 列表，沒有變化時為空列表。
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        current = set(available_stores)
+        with self._lock:
+            previous = self.available.get(part, set())
+            if checked_stores is not None:
+                # 請求失敗的地區或店鋪沒有新的資訊，不能當成已無現貨
+                current |= previous - set(checked_stores)
+            if current == previous:
+                return []
+            events = [AvailabilityEvent(part, store, True, timestamp) for store in sorted(current - previous)]
+            events += [AvailabilityEvent(part, store, False, timestamp) for store in sorted(previous - current)]
+            self.available[part] = current
+            self.save()
+        return events
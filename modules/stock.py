@@ -1,27 +1,134 @@
-import json
+import functools
+import hashlib
 import logging
+import threading
 import time
 import requests
-from fake_useragent import UserAgent
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+from urllib3.exceptions import ConnectTimeoutError, ReadTimeoutError
+from .availability import AvailabilityResult
+from .catalog import ModelCatalog
+from .governor import CLOSED, STATE_CODES, THROTTLE_STATUSES, HostGovernor, get_host_governor
+from .metrics import MonitorMetrics
+from .notifiers import LineNotifier
+from .notify import NotificationDispatcher
+from .predictor import RestockPredictor
+from .scheduler import AdaptiveScheduler
+from .state import AvailabilityStateStore
+from .targets import WatchTarget, plan_queries
+from .session import create_session, DEFAULT_TIMEOUT, NOTIFY_TIMEOUT
+from .useragent import UserAgentProvider, get_user_agent_provider
 
 
 class StockChecker:
     """負責檢查 iPhone 現貨並發送通知的類別。"""
 
-    def __init__(self, token: str, json_path: str):
+    def __init__(
+        self,
+        token: str,
+        json_path: str,
+        batch_size: int = 10,
+        pool_size: int = 10,
+        timeout: tuple = DEFAULT_TIMEOUT,
+        notify_timeout: tuple = NOTIFY_TIMEOUT,
+        session: requests.Session = None,
+        user_agent_provider: UserAgentProvider = None,
+        scheduler: AdaptiveScheduler = None,
+        state_store: AvailabilityStateStore = None,
+        targets: list = None,
+        notifiers: list = None,
+        catalog: ModelCatalog = None,
+        summarize_logs: bool = False,
+        predictor: RestockPredictor = None,
+        base_url: str = 'https://www.apple.com',
+        metrics: MonitorMetrics = None,
+        governor: HostGovernor = None,
+        payload_cache_size: int = 256
+    ):
         """
         初始化 StockChecker 實例。
 
         Args:
-            token (str): 用於發送通知的 Line Notify Token。
+            token (str): 用於發送通知的 Line Notify Token，使用 notifiers 時可為空字串。
             json_path (str): 本地 JSON 檔案的路徑。
+            batch_size (int): 每次請求最多合併查詢的型號數量。
+            pool_size (int): 每個主機保留的 keep-alive 連線數量。
+            timeout (tuple): 庫存請求的 (連線, 讀取) 逾時秒數。
+            notify_timeout (tuple): 通知請求的 (連線, 讀取) 逾時秒數。
+            session (requests.Session): 共用的 HTTP Session，未提供時自行建立。
+            user_agent_provider (UserAgentProvider): UA 來源，未提供時使用全域共用的 provider。
+            scheduler (AdaptiveScheduler): 決定各型號檢查時間的排程器，未提供時使用預設值建立。
+            state_store (AvailabilityStateStore): 記錄現貨狀態的 store，未提供時只保存在記憶體中。
+            targets (list): WatchTarget 列表，未提供時只查詢台灣 R713 及附近店鋪。
+            notifiers (list): Notifier 列表，未提供時以 token 建立 LineNotifier。
+            catalog (ModelCatalog): 共用的型號目錄，未提供時在第一次使用時從 json_path 載入。
+            summarize_logs (bool): 是否將沒有變化的型號合併成每輪一行摘要，而不是每個型號各一行。
+            predictor (RestockPredictor): 到貨時段預測，未提供時從空白開始學習；排程器沒有自己的 predictor 時共用此實例。
+            base_url (str): fulfillment-messages 的網址前綴，可改為本機的測試伺服器。
+            metrics (MonitorMetrics): 記錄請求、解析與通知耗時的指標，預設註冊到全域共用的 registry。
+            governor (HostGovernor): 請求速率限制與斷路器，預設使用 base_url 主機全域共用的實例。
+            payload_cache_size (int): 最多保留幾個請求的 ETag 與解析結果，超過時淘汰最久未使用的。
         """
         self.token = token
         self.json_path = json_path
+        self.base_url = base_url.rstrip('/')
+        self._catalog = catalog
+        self.batch_size = max(1, batch_size)
+        self.summarize_logs = summarize_logs
+        self.timeout = timeout
+        self.notify_timeout = notify_timeout
+        self.session = session or create_session(pool_maxsize=pool_size)
+        self._user_agents = user_agent_provider
+        self.scheduler = scheduler or AdaptiveScheduler()
+        self.state_store = state_store or AvailabilityStateStore()
+        self.predictor = predictor or RestockPredictor()
+        if self.scheduler.predictor is None:
+            self.scheduler.predictor = self.predictor
+        self.targets = targets or [WatchTarget()]
+        if notifiers is None:
+            notifiers = [LineNotifier(token, session=self.session, timeout=notify_timeout)] if token else []
+        self.notifiers = notifiers
+        self.metrics = metrics or MonitorMetrics()
+        self.dispatcher = NotificationDispatcher(self.notifiers, metrics=self.metrics)
+        self.governor = governor or get_host_governor(urlsplit(self.base_url).netloc)
+        self.stop_event = threading.Event()
+        self.next_alive_time = 0.0  # 下一次發送 alive 訊息的時間，由 start_monitor 設定
+        self.result_listeners = []  # 每輪檢查完成後呼叫 listener(AvailabilityResult)
+        # {(query_key, 型號代碼 tuple): (條件式請求標頭, 回應內容的雜湊, 解析後的 AvailabilityResult)}，依使用順序排列
+        self.payload_cache = OrderedDict()
+        self.payload_cache_size = max(1, payload_cache_size)
+        self._cache_lock = threading.Lock()
+
+    def stop(self) -> None:
+        """要求 monitor 在目前這輪結束後停止。"""
+        self.stop_event.set()
+
+    def close(self) -> None:
+        """送出尚未發送的通知，並關閉通知後端與 HTTP Session 釋放連線池。"""
+        self.dispatcher.stop()
+        for notifier in self.notifiers:
+            notifier.close()
+        self.session.close()
+
+    @property
+    def user_agents(self) -> UserAgentProvider:
+        """第一次送出請求時才載入的 UA 來源，避免啟動時就載入 fake_useragent。"""
+        if self._user_agents is None:
+            self._user_agents = get_user_agent_provider()
+        return self._user_agents
+
+    @property
+    def catalog(self) -> ModelCatalog:
+        """第一次使用時才載入的型號目錄。"""
+        if self._catalog is None:
+            self._catalog = ModelCatalog(self.json_path)
+        return self._catalog
 
     def get_product_models(self, selected_device: str) -> list:
         """
-        從本地 JSON 檔案中提取機型資訊。
+        從型號目錄中提取機型資訊，JSON 檔案有更新時才重新載入。
 
         Args:
             selected_device (str): 選擇的機型代碼，如 "iphone16" 或 "iphone16pro"。
@@ -29,130 +136,490 @@ class StockChecker:
         Returns:
             list: 包含機型資訊的列表，若提取失敗則返回空列表。
         """
-        try:
-            with open(self.json_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            models = []
-            for code, info in data.items():
-                if selected_device == info['name']:
-                    model = {
-                        'code': code,
-                        'model': info['name'],
-                        'price': info['price'],
-                        'currency': info['currency'],
-                        'capacity': info['capacity'],
-                        'color': info['color']
-                    }
-                    models.append(model)
-            models.sort(key=lambda x: x['color'])
-            logging.info(f"成功從 JSON 檔案中提取 {selected_device} 的機型資訊。")
-            return models
-        except Exception as e:
-            logging.error(f"從 JSON 檔案中提取機型資訊失敗：{e}")
-            return []
+        self.catalog.reload_if_changed()
+        models = [record.to_dict() for record in self.catalog.family(selected_device)]
+        logging.info(f"成功從 JSON 檔案中提取 {selected_device} 的機型資訊。")
+        return models
 
-    def request_json_based_on_model(self, model_code: str) -> dict:
+    def build_api_endpoint(self, model_codes: list, target: WatchTarget = None) -> str:
         """
-        根據機身型號發送後續的 JSON 請求，並返回解析後的資料。
+        組合 fulfillment-messages 的請求網址，將多個型號打包成 parts.0..parts.N 參數。
 
         Args:
-            model_code (str): 機型的代碼。
+            model_codes (list): 要查詢的機型代碼列表。
+            target (WatchTarget): 查詢的地區與店鋪，未提供時使用台灣 R713。
 
         Returns:
-            dict: 解析後的 JSON 資料，若請求失敗則返回 None。
+            str: 完整的請求網址。
         """
-        api_endpoint = f"https://www.apple.com/tw/shop/fulfillment-messages?pl=true&mts.0=regular&mts.1=compact&cppart=UNLOCKED/WW&parts.0={model_code}&searchNearby=true&store=R713"
+        target = target or WatchTarget()
+        parts = "&".join(f"parts.{i}={code}" for i, code in enumerate(model_codes))
+        search_nearby = 'true' if target.search_nearby else 'false'
+        return f"{self.base_url}{target.shop_path}/shop/fulfillment-messages?pl=true&mts.0=regular&mts.1=compact&cppart=UNLOCKED/WW&{parts}&searchNearby={search_nearby}&store={target.store}"
+
+    def send_request(self, model_codes: list, target: WatchTarget = None, validators: dict = None) -> requests.Response:
+        """
+        送出庫存請求，處理錯誤與 429/503 限流；請求前先經過主機共用的速率限制與斷路器。
+
+        Args:
+            model_codes (list): 機型的代碼列表。
+            target (WatchTarget): 查詢的地區與店鋪，未提供時使用台灣 R713。
+            validators (dict): 條件式請求標頭（If-None-Match / If-Modified-Since），內容沒有變化時伺服器可回 304。
+
+        Returns:
+            requests.Response: 成功（含 304）的回應，若請求失敗或斷路器斷開則返回 None。
+        """
+        target = target or WatchTarget()
+        api_endpoint = self.build_api_endpoint(model_codes, target)
+        host = self.governor.host
+        allowed = self.governor.breaker.allow()
+        self.update_circuit_state()
+        if not allowed:
+            logging.debug("%s 的斷路器已斷開，略過此請求。", host)
+            self.metrics.circuit_skipped.inc(host=host)
+            return None
+        self.metrics.rate_wait_seconds.observe(self.governor.bucket.acquire(), host=host)
+        started = time.monotonic()
+        status = 'error'
 
         try:
             headers = {
-                'User-Agent': UserAgent().random,
+                'User-Agent': self.user_agents.get(),
                 'Accept': 'application/json',
             }
-            response = requests.get(api_endpoint, headers=headers, timeout=10)
+            if validators:
+                headers.update(validators)
+            response = self.session.get(api_endpoint, headers=headers, timeout=self.timeout)
+            status = str(response.status_code)
             response.raise_for_status()
-            data = response.json()
-            logging.info(f"成功獲取模型 {model_code} 的 JSON 資料。")
-            return data
+        except requests.HTTPError as e:
+            code = e.response.status_code if e.response is not None else None
+            retry_after = None
+            if code in (429, 503):
+                retry_after = self.parse_retry_after(e.response)
+                self.scheduler.record_throttled(retry_after)
+            logging.error(f"請求 JSON 資料失敗：{e}")
+            self.record_circuit(code in THROTTLE_STATUSES, retry_after)
+            return None
         except requests.RequestException as e:
+            if self.is_timeout(e):
+                status = 'timeout'
             logging.error(f"請求 JSON 資料失敗：{e}")
+            self.record_circuit(status == 'timeout')
             return None
+        except Exception:
+            self.governor.breaker.release()
+            raise
+        finally:
+            self.metrics.requests.inc(region=target.region, store=target.store, status=status)
+            self.metrics.request_seconds.observe(time.monotonic() - started, region=target.region, store=target.store)
+
+        self.governor.breaker.record_success()
+        self.update_circuit_state()
+        return response
 
-    def check_availability(self, json_data: dict, model_code: str) -> tuple:
+    def record_circuit(self, failed: bool, retry_after: float = None) -> None:
         """
-        檢查 JSON 資料中的庫存狀態，並返回有無現貨的結果。
+        將失敗的請求回報給斷路器；斷開時暫停排程器直到可以探測。
+
+        Args:
+            failed (bool): 是否為限流（403/429/503）或逾時；其他錯誤會中斷連續失敗的計算。
+            retry_after (float): 伺服器要求的等待秒數。
+        """
+        breaker = self.governor.breaker
+        if not failed:
+            breaker.record_other()
+        elif breaker.record_failure(retry_after):
+            self.metrics.circuit_opens.inc(host=self.governor.host)
+            self.scheduler.pause(breaker.seconds_until_retry())
+        self.update_circuit_state()
+
+    def update_circuit_state(self) -> None:
+        """將斷路器目前的狀態寫入指標。"""
+        self.metrics.circuit_state.set(STATE_CODES[self.governor.breaker.state], host=self.governor.host)
+
+    def request_json_based_on_models(self, model_codes: list, target: WatchTarget = None) -> dict:
+        """
+        以單一請求查詢多個機型的庫存，並返回解析後的資料。
+
+        Args:
+            model_codes (list): 機型的代碼列表。
+            target (WatchTarget): 查詢的地區與店鋪，未提供時使用台灣 R713。
+
+        Returns:
+            dict: 解析後的 JSON 資料，若請求失敗則返回 None。
+        """
+        response = self.send_request(model_codes, target)
+        if response is None:
+            return None
+        started = time.perf_counter()
+        try:
+            data = response.json()
+        except ValueError as e:
+            logging.error(f"解析 JSON 資料失敗：{e}")
+            return None
+        finally:
+            self.metrics.parse_seconds.observe(time.perf_counter() - started)
+        logging.info(f"成功獲取 {len(model_codes)} 個型號的 JSON 資料：{', '.join(model_codes)}")
+        return data
+
+    @staticmethod
+    def response_validators(response: requests.Response) -> dict:
+        """
+        取出下一次條件式請求要帶的標頭。
+
+        Args:
+            response (requests.Response): HTTP 回應。
+
+        Returns:
+            dict: If-None-Match / If-Modified-Since 標頭，回應沒有 ETag 與 Last-Modified 時為空字典。
+        """
+        validators = {}
+        if response.headers.get('ETag'):
+            validators['If-None-Match'] = response.headers['ETag']
+        if response.headers.get('Last-Modified'):
+            validators['If-Modified-Since'] = response.headers['Last-Modified']
+        return validators
+
+    @staticmethod
+    def is_timeout(error: requests.RequestException) -> bool:
+        """
+        判斷請求錯誤是否為逾時；重試用盡的逾時會以 ConnectionError 包裝 urllib3 的逾時錯誤。
+
+        Args:
+            error (requests.RequestException): 請求錯誤。
+
+        Returns:
+            bool: 是否為連線或讀取逾時。
+        """
+        if isinstance(error, requests.Timeout):
+            return True
+        reason = getattr(error.args[0], 'reason', None) if error.args else None
+        return isinstance(reason, (ReadTimeoutError, ConnectTimeoutError))
+
+    @staticmethod
+    def parse_retry_after(response: requests.Response) -> float:
+        """
+        解析回應中的 Retry-After 標頭（秒數格式）。
+
+        Args:
+            response (requests.Response): HTTP 回應。
+
+        Returns:
+            float: 等待秒數，無法解析時返回 None。
+        """
+        try:
+            return float(response.headers.get('Retry-After'))
+        except (TypeError, ValueError):
+            return None
+
+    def request_json_based_on_model(self, model_code: str) -> dict:
+        """
+        根據機身型號發送後續的 JSON 請求，並返回解析後的資料。
 
         Args:
-            json_data (dict): 從 API 獲取的 JSON 資料。
             model_code (str): 機型的代碼。
 
         Returns:
-            tuple: (bool, str 或 None) 是否有現貨及現貨所在的店鋪名稱。
+            dict: 解析後的 JSON 資料，若請求失敗則返回 None。
+        """
+        return self.request_json_based_on_models([model_code])
+
+    def fetch_availability(self, model_codes: list) -> AvailabilityResult:
+        """
+        依監控目標將型號分組分批請求，不同地區同時查詢，並彙整每個型號在各店鋪的取貨狀態。
+
+        Args:
+            model_codes (list): 要查詢的機型代碼列表。
+
+        Returns:
+            AvailabilityResult: 合併後的結果，請求失敗的型號不會出現在結果中。
+        """
+        started = time.monotonic()
+        by_region = {}
+        for query in plan_queries(model_codes, self.targets, self.batch_size):
+            by_region.setdefault(query.region, []).append(query)
+
+        def fetch_region(queries: list) -> list:
+            return [self.fetch_query(query) for query in queries]
+
+        result = AvailabilityResult()
+        with ThreadPoolExecutor(max_workers=max(1, len(by_region))) as executor:
+            for region_results in executor.map(fetch_region, by_region.values()):
+                for batch_result in region_results:
+                    result.merge(batch_result)
+        self.record_schedule(model_codes, result)
+        self.metrics.cycle_seconds.observe(time.monotonic() - started)
+        return result
+
+    def fetch_query(self, query: WatchTarget) -> AvailabilityResult:
+        """
+        送出單一請求並解析回應，同時記錄請求耗時。
+        有上次解析的結果時才送出條件式請求；伺服器回 304，或回應內容與上次完全相同時，直接沿用上次的結果，不再解析 JSON。
+
+        Args:
+            query (WatchTarget): 此請求的地區、店鋪與型號。
+
+        Returns:
+            AvailabilityResult: 此請求的結果，請求失敗時為空結果。
+        """
+        model_codes = list(query.parts)
+        cache_key = (query.query_key, query.parts)
+        with self._cache_lock:
+            cached = self.payload_cache.get(cache_key)
+            if cached is not None:
+                self.payload_cache.move_to_end(cache_key)
+        started = time.monotonic()
+        response = self.send_request(model_codes, query, validators=cached[0] if cached else None)
+        latency = time.monotonic() - started
+        if response is None:
+            return AvailabilityResult()
+
+        digest = None
+        if response.status_code != 304:
+            digest = hashlib.blake2b(response.content, digest_size=16).digest()
+        if cached is not None and (digest is None or digest == cached[1]):
+            logging.debug("%s 的回應沒有變化，沿用上次的結果。", cache_key)
+            self.metrics.unchanged.inc()
+            result = cached[2].copy()
+            result.stamp(latency, time.time())
+            return result
+        if digest is None:
+            # 只有在有快取時才會送出條件式請求，304 卻沒有可沿用的結果表示伺服器回應異常
+            logging.error(f"{cache_key} 收到 304 但沒有可沿用的結果。")
+            return AvailabilityResult()
+
+        started = time.perf_counter()
+        try:
+            json_data = response.json()
+        except ValueError as e:
+            logging.error(f"解析 JSON 資料失敗：{e}")
+            return AvailabilityResult()
+        logging.info(f"成功獲取 {len(model_codes)} 個型號的 JSON 資料：{', '.join(model_codes)}")
+        result = self.process_batch(query, json_data, latency)
+        self.metrics.parse_seconds.observe(time.perf_counter() - started)
+        if result.parts:
+            self.cache_payload(cache_key, self.response_validators(response), digest, result)
+        return result
+
+    def cache_payload(self, cache_key: tuple, validators: dict, digest: bytes, result: AvailabilityResult) -> None:
+        """
+        保存請求的條件式標頭與解析結果，超過 payload_cache_size 時淘汰最久未使用的項目。
+
+        Args:
+            cache_key (tuple): (WatchTarget.query_key, 型號代碼 tuple)。
+            validators (dict): 下一次條件式請求要帶的標頭。
+            digest (bytes): 回應內容的雜湊。
+            result (AvailabilityResult): 解析結果。
+        """
+        with self._cache_lock:
+            self.payload_cache[cache_key] = (validators, digest, result.copy())
+            self.payload_cache.move_to_end(cache_key)
+            while len(self.payload_cache) > self.payload_cache_size:
+                self.payload_cache.popitem(last=False)
+
+    def process_batch(self, query: WatchTarget, json_data: dict, latency: float = None) -> AvailabilityResult:
+        """
+        解析單一請求的回應。
+
+        Args:
+            query (WatchTarget): 此請求的地區、店鋪與型號。
+            json_data (dict): 從 API 獲取的 JSON 資料，請求失敗時為 None。
+            latency (float): 請求耗時（秒）。
+
+        Returns:
+            AvailabilityResult: 此請求的結果，請求失敗時為空結果。
+        """
+        if not json_data:
+            return AvailabilityResult()
+        result = self.check_availability(json_data, list(query.parts), query.query_key)
+        if latency is not None:
+            result.stamp(latency, time.time())
+        return result
+
+    def record_schedule(self, model_codes: list, result: AvailabilityResult) -> None:
+        """
+        將合併後的結果回報給排程器，以決定各型號下一次的檢查時間。
+
+        Args:
+            model_codes (list): 此輪查詢的機型代碼。
+            result (AvailabilityResult): 合併後的結果。
+        """
+        # 斷路器斷開時略過的型號在恢復探測後就重新檢查，不必等完整的間隔
+        breaker = self.governor.breaker
+        retry_in = breaker.seconds_until_retry() if breaker.state != CLOSED else None
+        for code in model_codes:
+            if code in result:
+                self.scheduler.record_result(code, result.signature(code))
+            else:
+                self.scheduler.record_failure(code, delay=retry_in)
+
+    def check_availability(self, json_data: dict, model_codes: list = None, query_key: tuple = None) -> AvailabilityResult:
+        """
+        檢查 JSON 資料中的庫存狀態，一次整理出每個型號在每間店鋪的取貨狀態。
+
+        Args:
+            json_data (dict): 從 API 獲取的 JSON 資料。
+            model_codes (list): 要檢查的機型代碼，為 None 時回報回應中的所有型號。
+            query_key (tuple): 此回應對應的 WatchTarget.query_key，用來區分各店鋪來自哪個地區與中心店鋪。
+
+        Returns:
+            AvailabilityResult: 型號 → 店鋪 → 取貨狀態 的索引，解析失敗時為空結果。
         """
         try:
-            stores = json_data.get('body', {}).get('PickupMessage', {}).get('stores', [])
-            if not stores:
-                stores = json_data.get('body', {}).get('content', {}).get('pickupMessage', {}).get('stores', [])
-            for store in stores:
-                parts_availability = store.get('partsAvailability', {})
-                for part_number, availability in parts_availability.items():
-                    if availability.get('pickupDisplay') == 'available' and part_number == model_code:
-                        return True, store['storeName']
-            return False, None
+            return AvailabilityResult.from_json(json_data, model_codes, query_key)
         except Exception as e:
+            # 返回空結果，讓這些型號視為請求失敗，而不是無現貨
             logging.error(f"檢查庫存時出錯：{e}")
-            return False, None
+            return AvailabilityResult()
 
-    def send_notification(self, message: str) -> None:
+    def send_notification(self, message: str, detected_at: float = None) -> None:
         """
-        使用 Line Notify 發送通知訊息。
+        將通知訊息交給背景佇列發送，不會阻塞監控迴圈。
 
         Args:
             message (str): 要發送的通知訊息。
+            detected_at (float): 到貨通知對應的檢查時間，送達後記錄偵測延遲。
         """
-        headers = {
-            'Authorization': f'Bearer {self.token}',
-            'Content-Type': 'application/x-www-form-urlencoded'
-        }
-        data = {
-            'message': message
-        }
-        try:
-            response = requests.post('https://notify-api.line.me/api/notify', headers=headers, data=data)
-            if response.status_code == 200:
-                logging.info("通知發送成功")
-            else:
-                logging.error(f"通知發送失敗：{response.status_code}, {response.text}")
-        except requests.RequestException as e:
-            logging.error(f"通知發送時發生錯誤：{e}")
+        on_delivered = functools.partial(self.record_detection_lag, detected_at) if detected_at else None
+        self.dispatcher.submit(message, on_delivered=on_delivered)
 
-    def monitor(self, selected_models: list) -> None:
+    def record_detection_lag(self, detected_at: float, delivered: bool) -> None:
         """
-        開始監控選定的機型庫存狀態。
+        記錄從檢查到有現貨到通知送達的時間。
+
+        Args:
+            detected_at (float): 檢查時間（epoch 秒）。
+            delivered (bool): 是否至少送達一個後端。
+        """
+        if delivered:
+            self.metrics.detection_lag_seconds.observe(time.time() - detected_at)
+
+    def publish_result(self, result: AvailabilityResult) -> None:
+        """
+        將本輪的結構化結果交給 result_listeners，例如介面上的現貨看板。
+
+        Args:
+            result (AvailabilityResult): 本輪的檢查結果。
+        """
+        for listener in self.result_listeners:
+            try:
+                listener(result)
+            except Exception as e:
+                logging.error(f"處理檢查結果時出錯：{e}")
+
+    def update_state(self, part: str, available_stores: list, checked_stores: list = None) -> list:
+        """
+        更新某型號的現貨狀態，並將到貨事件提供給到貨時段預測。
+
+        Args:
+            part (str): 型號代碼。
+            available_stores (list): 此次檢查中有現貨的店鋪名稱。
+            checked_stores (list): 此次實際查詢成功的店鋪名稱，只比對這些店鋪；為 None 時比對所有店鋪。
+
+        Returns:
+            list: AvailabilityEvent 列表，沒有變化時為空列表。
+        """
+        events = self.state_store.update(part, available_stores, checked_stores=checked_stores)
+        self.predictor.observe(events)
+        return events
+
+    def report_availability(self, models: list, availability: dict) -> dict:
+        """
+        以檢查結果更新現貨狀態，只有在型號開始有現貨時才整理出通知訊息。
+
+        Args:
+            models (list): 此輪檢查的機型資訊列表。
+            availability (AvailabilityResult): fetch_availability 的結果。
+
+        Returns:
+            dict: {型號代碼: 需要發送的通知訊息}，同一型號在多間店鋪到貨時合併成一則。
+        """
+        messages = {}
+        unchanged = 0
+        for model in models:
+            if model['code'] not in availability:
+                logging.error("無法獲取 %s 的庫存資訊。", model['code'])
+                continue
+            store_names = availability.available_stores(model['code'])
+            events = self.update_state(model['code'], store_names, availability.checked_stores(model['code']))
+            if not events:
+                # 沒有變化的型號是最常見的情況，只在需要時才格式化訊息
+                unchanged += 1
+                if not self.summarize_logs:
+                    if store_names:
+                        logging.info("%s - %s (%s) 在 %s 仍有現貨", model['model'], model['color'], model['capacity'], '、'.join(store_names))
+                    else:
+                        logging.info("%s - %s (%s) 目前無現貨", model['model'], model['color'], model['capacity'])
+                continue
+            label = f"{model['model']} - {model['color']} ({model['capacity']})"
+            restocked = [event.store for event in events if event.available]
+            sold_out = [event.store for event in events if not event.available]
+            if restocked:
+                # 修改通知訊息，包含容量資訊
+                message = f"{label} 在 {'、'.join(restocked)} 有現貨！"
+                messages[model['code']] = message
+                logging.info(message)
+            if sold_out:
+                logging.info("%s 在 %s 已無現貨", label, '、'.join(sold_out))
+        if self.summarize_logs:
+            logging.info("本輪檢查 %d 個型號，%d 個狀態沒有變化，%d 則到貨通知。", len(models), unchanged, len(messages))
+        return messages
+
+    def start_monitor(self, selected_models: list) -> dict:
+        """
+        監控開始前的準備：送出啟動通知並將型號加入排程器。
 
         Args:
             selected_models (list): 要監控的機型資訊列表。
+
+        Returns:
+            dict: {型號代碼: 機型資訊}，傳給 finish_cycle。
         """
         self.send_notification("程式已啟動，開始監控現貨情況。")
-        next_alive_time = time.time() + 3600  # 下一次發送 alive 訊息的時間
-
-        while True:
-            for model in selected_models:
-                model_code = model['code']
-                json_data = self.request_json_based_on_model(model_code)
-                if json_data:
-                    available, store_name = self.check_availability(json_data, model_code)
-                    if available:
-                        # 修改通知訊息，包含容量資訊
-                        message = f"{model['model']} - {model['color']} ({model['capacity']}) 在 {store_name} 有現貨！"
-                        self.send_notification(message)
-                        logging.info(message)
-                    else:
-                        logging.info(f"{model['model']} - {model['color']} ({model['capacity']}) 目前無現貨")
-                else:
-                    logging.error("無法獲取庫存資訊。")
-            current_time = time.time()
-            if current_time >= next_alive_time:
-                self.send_notification("程式正常運作中")
-                next_alive_time = current_time + 3600
-            logging.info("等待 5 分鐘後重新檢查...")
-            time.sleep(300)  # 每五分鐘檢查一次
+        self.next_alive_time = time.time() + 3600
+        models_by_code = {model['code']: model for model in selected_models}
+        for code in models_by_code:
+            self.scheduler.add(code)
+        return models_by_code
+
+    def finish_cycle(self, models_by_code: dict, due_codes: list, availability: AvailabilityResult = None) -> float:
+        """
+        一輪檢查後的共用處理：發布結果、通知狀態變化、定時發送 alive 訊息，並計算下一輪前的等待時間。
+        同步的 monitor 與 AsyncStockChecker.run 都只負責取得結果與等待。
+
+        Args:
+            models_by_code (dict): start_monitor 回傳的 {型號代碼: 機型資訊}。
+            due_codes (list): 本輪檢查的型號代碼。
+            availability (AvailabilityResult): 本輪的檢查結果，沒有到期的型號時為 None。
+
+        Returns:
+            float: 距離下一輪檢查的秒數。
+        """
+        if availability is not None:
+            self.publish_result(availability)
+            messages = self.report_availability([models_by_code[code] for code in due_codes], availability)
+            if messages:
+                self.send_notification("\n".join(messages.values()), availability.earliest_check(messages))
+        current_time = time.time()
+        if current_time >= self.next_alive_time:
+            self.send_notification("程式正常運作中")
+            self.next_alive_time = current_time + 3600
+        wait = max(1.0, self.scheduler.seconds_until_next())
+        logging.info(f"等待 {wait:.0f} 秒後重新檢查...")
+        return wait
+
+    def monitor(self, selected_models: list) -> None:
+        """
+        開始監控選定的機型庫存狀態，檢查頻率由排程器依各型號的變化動態調整，直到呼叫 stop()。
+
+        Args:
+            selected_models (list): 要監控的機型資訊列表。
+        """
+        models_by_code = self.start_monitor(selected_models)
+        while not self.stop_event.is_set():
+            # 即將到期的型號一併取出，合併到同一批請求
+            due_codes = self.scheduler.due(lookahead=self.scheduler.min_interval)
+            availability = self.fetch_availability(due_codes) if due_codes else None
+            self.stop_event.wait(self.finish_cycle(models_by_code, due_codes, availability))
+        logging.info("監控已停止。")
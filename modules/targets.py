@@ -0,0 +1,68 @@
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class WatchTarget:
+    """監控目標：在某地區以某間店鋪為中心查詢的一組型號。"""
+
+    region: str = 'tw'
+    store: str = 'R713'
+    parts: tuple = ()  # 空 tuple 表示監控所有選擇的型號
+    search_nearby: bool = True
+
+    @property
+    def shop_path(self) -> str:
+        """Apple 線上商店的地區路徑，美國商店沒有地區前綴。"""
+        return '' if self.region == 'us' else f"/{self.region}"
+
+    @property
+    def query_key(self) -> tuple:
+        """相同 query_key 的目標可以合併成同一個請求。"""
+        return (self.region, self.store, self.search_nearby)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'WatchTarget':
+        """
+        從設定檔的字典建立 WatchTarget。
+
+        Args:
+            data (dict): 包含 region、store、parts、search_nearby 的字典。
+
+        Returns:
+            WatchTarget: 監控目標。
+        """
+        return cls(
+            region=data.get('region', 'tw'),
+            store=data.get('store', 'R713'),
+            parts=tuple(data.get('parts', ())),
+            search_nearby=data.get('search_nearby', True),
+        )
+
+
+def plan_queries(model_codes: list, targets: list, batch_size: int) -> list:
+    """
+    將監控目標依 (地區, 店鋪) 去重與分組，每組只查詢一次到期的型號，再依 batch_size 分批。
+
+    Args:
+        model_codes (list): 此輪到期的型號代碼。
+        targets (list): WatchTarget 列表。
+        batch_size (int): 每個請求最多包含的型號數量。
+
+    Returns:
+        list: 每個元素是一個要送出的請求，以 parts 為該批型號的 WatchTarget 表示。
+    """
+    due = list(dict.fromkeys(model_codes))
+    grouped = {}  # {query_key: {型號代碼: None}}，用 dict 保持順序並去重
+    for target in targets:
+        parts = grouped.setdefault(target.query_key, {})
+        wanted = set(target.parts) if target.parts else None
+        for code in due:
+            if wanted is None or code in wanted:
+                parts[code] = None
+
+    queries = []
+    for (region, store, search_nearby), parts in grouped.items():
+        codes = list(parts)
+        for i in range(0, len(codes), batch_size):
+            queries.append(WatchTarget(region, store, tuple(codes[i:i + batch_size]), search_nearby))
+    return queries
@@ -0,0 +1,114 @@
+import itertools
+import logging
+import random
+import threading
+
+# fake_useragent 無法載入時使用的備用清單
+FALLBACK_USER_AGENTS = [
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/129.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/18.0 Safari/605.1.15',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/129.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:131.0) Gecko/20100101 Firefox/131.0',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/129.0.0.0 Safari/537.36 Edg/129.0.0.0',
+]
+
+
+class UserAgentProvider:
+    """載入一次 User-Agent 清單後，以輪詢或加權隨機的方式提供 UA 字串。"""
+
+    STRATEGIES = ('round_robin', 'random')
+
+    def __init__(
+        self,
+        user_agents: list = None,
+        weights: list = None,
+        strategy: str = 'round_robin',
+        pool_size: int = 50
+    ):
+        """
+        初始化 UserAgentProvider 實例。
+
+        Args:
+            user_agents (list): 固定的 UA 清單，提供時不會載入 fake_useragent。
+            weights (list): 與 user_agents 對應的權重，僅在 strategy 為 'random' 時使用。
+            strategy (str): 'round_robin' 依序輪流，'random' 依權重隨機挑選。
+            pool_size (int): 從 fake_useragent 取樣的 UA 數量上限。
+        """
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"未知的 User-Agent 策略：{strategy}")
+        self.user_agents = list(user_agents) if user_agents else self.load_fake_user_agents(pool_size)
+        if weights is not None and len(weights) != len(self.user_agents):
+            raise ValueError("weights 數量需與 user_agents 相同")
+        self.weights = weights
+        self.strategy = strategy
+        self._cycle = itertools.cycle(self.user_agents)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def load_fake_user_agents(pool_size: int) -> list:
+        """
+        從 fake_useragent 取樣一批不重複的 UA 字串，只在啟動時執行一次。
+
+        Args:
+            pool_size (int): 取樣數量上限。
+
+        Returns:
+            list: UA 字串列表，若無法載入則返回備用清單。
+        """
+        try:
+            from fake_useragent import UserAgent
+            ua = UserAgent()
+            user_agents = list(dict.fromkeys(ua.random for _ in range(pool_size)))
+            logging.info(f"已載入 {len(user_agents)} 個 User-Agent。")
+            return user_agents
+        except Exception as e:
+            logging.warning(f"無法載入 fake_useragent，改用內建 User-Agent 清單：{e}")
+            return list(FALLBACK_USER_AGENTS)
+
+    def get(self) -> str:
+        """
+        取得下一個 User-Agent 字串。
+
+        Returns:
+            str: UA 字串。
+        """
+        if self.strategy == 'random':
+            return random.choices(self.user_agents, weights=self.weights)[0]
+        with self._lock:
+            return next(self._cycle)
+
+
+_provider = None
+_provider_lock = threading.Lock()
+
+
+def configure_user_agents(user_agents: list = None, weights: list = None, strategy: str = 'round_robin') -> UserAgentProvider:
+    """
+    設定全域共用的 UserAgentProvider，例如改用設定檔中的固定 UA 清單。
+
+    Args:
+        user_agents (list): 固定的 UA 清單，為 None 時從 fake_useragent 載入。
+        weights (list): 加權隨機時使用的權重。
+        strategy (str): 'round_robin' 或 'random'。
+
+    Returns:
+        UserAgentProvider: 新的全域 provider。
+    """
+    global _provider
+    with _provider_lock:
+        _provider = UserAgentProvider(user_agents, weights=weights, strategy=strategy)
+        return _provider
+
+
+def get_user_agent_provider() -> UserAgentProvider:
+    """
+    取得全域共用的 UserAgentProvider，第一次呼叫時才建立。
+
+    Returns:
+        UserAgentProvider: 全域 provider。
+    """
+    global _provider
+    with _provider_lock:
+        if _provider is None:
+            _provider = UserAgentProvider()
+        return _provider
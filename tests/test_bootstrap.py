@@ -0,0 +1,31 @@
+import os
+import pytest
+from utils.get_iphone_models import IPhoneModelsManager
+
+FIXTURE = os.path.join(os.path.dirname(__file__), '..', 'benchmarks', 'fixtures', 'buy_iphone_16_pro_tw.html')
+
+
+@pytest.fixture
+def manager():
+    manager = IPhoneModelsManager(json_path='', url='')
+    yield manager
+    manager.session.close()
+
+
+def test_saved_buy_page(manager):
+    with open(FIXTURE, 'r', encoding='utf-8') as f:
+        data = manager.extract_product_selection_bootstrap(f.read())
+    models = manager.get_product_models(data)
+    assert len(models) == 28
+    assert models['MYNF3ZP/A'] == {
+        'name': 'iphone16pro', 'price': '36900.00', 'currency': 'TWD', 'capacity': '128gb', 'color': '黑色鈦金屬'
+    }
+    assert data['products'][0]['productLink'] == '/tw/shop/buy-iphone/iphone-16-pro/128gb-blacktitanium'
+
+
+def test_json5_fallback_keeps_apostrophes(manager):
+    pytest.importorskip('json5')
+    page = ("<script>window.PRODUCT_SELECTION_BOOTSTRAP = { productSelectionData: "
+            "{products: [{partNumber: 'MYNF3ZP/A', note: \"Apple's 保固\",},], } };</script>")
+    data = manager.extract_product_selection_bootstrap(page)
+    assert data == {'products': [{'partNumber': 'MYNF3ZP/A', 'note': "Apple's 保固"}]}
@@ -0,0 +1,56 @@
+import json
+import logging
+from modules.catalog import HEADER, RECORD, ModelCatalog, ModelRecord, read_binary_catalog, write_binary_catalog
+
+MODELS = {
+    'MYW23ZP/A': {'name': 'iphone16', 'price': '29900.00', 'currency': 'TWD', 'capacity': '128gb', 'color': '黑色'},
+    'MYW43ZP/A': {'name': 'iphone16', 'price': '33400.50', 'currency': 'TWD', 'capacity': '256gb', 'color': '黑色'},
+    'MYNF3ZP/A': {'name': 'iphone16pro', 'price': '36900.00', 'currency': 'TWD', 'capacity': '128gb', 'color': '白色鈦金屬'},
+}
+
+
+def write_json(path, models=MODELS):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(models, f, ensure_ascii=False)
+
+
+def test_binary_round_trip(tmp_path):
+    path = tmp_path / 'models.bin'
+    write_binary_catalog(MODELS, str(path))
+    records = read_binary_catalog(str(path))
+    assert {record.code: record for record in records} == {
+        code: ModelRecord(code, info['name'], info['price'], info['currency'], info['capacity'], info['color'])
+        for code, info in MODELS.items()
+    }
+
+
+def test_corrupt_binary_falls_back_to_json(tmp_path, caplog):
+    json_path = tmp_path / 'models.json'
+    binary_path = tmp_path / 'models.bin'
+    write_json(json_path)
+    write_binary_catalog(MODELS, str(binary_path))
+    # 將最後一個型號的代碼改成不存在的字串編號
+    data = bytearray(binary_path.read_bytes())
+    last = len(data) - RECORD.size
+    fields = list(RECORD.unpack_from(data, last))
+    fields[0] = 999
+    RECORD.pack_into(data, last, *fields)
+    binary_path.write_bytes(bytes(data))
+
+    with caplog.at_level(logging.WARNING):
+        catalog = ModelCatalog(str(json_path), binary_path=str(binary_path))
+    assert catalog.mtime[0] == str(json_path)
+    assert set(catalog.by_code) == set(MODELS)
+    assert '讀取二進位目錄失敗' in caplog.text
+
+
+def test_truncated_binary_falls_back_to_json(tmp_path):
+    json_path = tmp_path / 'models.json'
+    binary_path = tmp_path / 'models.bin'
+    write_json(json_path)
+    write_binary_catalog(MODELS, str(binary_path))
+    binary_path.write_bytes(binary_path.read_bytes()[:HEADER.size + 6])
+
+    catalog = ModelCatalog(str(json_path), binary_path=str(binary_path))
+    assert catalog.mtime[0] == str(json_path)
+    assert len(catalog.by_code) == len(MODELS)
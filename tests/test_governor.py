@@ -0,0 +1,89 @@
+import socket
+import threading
+import time
+from modules.governor import CLOSED, OPEN, HostGovernor
+from modules.metrics import MetricsRegistry, MonitorMetrics
+from modules.scheduler import AdaptiveScheduler
+from modules.stock import StockChecker
+from modules.useragent import UserAgentProvider
+
+
+class HangingServer:
+    """接受連線後不回應的伺服器，讓每個請求都讀取逾時。"""
+
+    def __init__(self):
+        self.sock = socket.socket()
+        self.sock.bind(('127.0.0.1', 0))
+        self.sock.listen()
+        self.connections = []
+        self.accepted = 0
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.sock.getsockname()[1]}"
+
+    def _accept(self):
+        while True:
+            try:
+                connection, _ = self.sock.accept()
+            except OSError:
+                return
+            self.accepted += 1
+            self.connections.append(connection)
+
+    def close(self):
+        self.sock.close()
+        for connection in self.connections:
+            connection.close()
+
+
+def test_read_timeouts_open_breaker():
+    server = HangingServer()
+    governor = HostGovernor('hanging', rate=100, burst=10, failure_threshold=3, cooldown=60)
+    checker = StockChecker(
+        '', json_path='', notifiers=[], base_url=server.url, timeout=(1, 0.2), governor=governor,
+        scheduler=AdaptiveScheduler(), metrics=MonitorMetrics(MetricsRegistry()),
+        user_agent_provider=UserAgentProvider(['test']),
+    )
+    try:
+        for _ in range(2):
+            started = time.monotonic()
+            assert checker.send_request(['MYW23ZP/A']) is None
+            assert time.monotonic() - started < 0.5  # 讀取逾時不重試
+        assert governor.breaker.state == CLOSED
+        assert governor.breaker.failures == 2
+
+        assert checker.send_request(['MYW23ZP/A']) is None
+        assert governor.breaker.state == OPEN
+        assert checker.metrics.requests.total(status='timeout') == 3
+        assert checker.metrics.circuit_opens.total(host='hanging') == 1
+
+        # 斷開後不再送出請求
+        accepted = server.accepted
+        assert checker.send_request(['MYW23ZP/A']) is None
+        assert checker.metrics.circuit_skipped.total(host='hanging') == 1
+        assert server.accepted == accepted
+    finally:
+        checker.close()
+        server.close()
+
+
+def test_other_errors_interrupt_consecutive_throttles():
+    governor = HostGovernor('flaky', rate=100, burst=10, failure_threshold=3, cooldown=60)
+    checker = StockChecker(
+        '', json_path='', notifiers=[], governor=governor, scheduler=AdaptiveScheduler(),
+        metrics=MonitorMetrics(MetricsRegistry()), user_agent_provider=UserAgentProvider(['test']),
+    )
+    try:
+        # 429、500、429、429：500 中斷了連續限流，只算連續 2 次
+        for throttled in (True, False, True, True):
+            checker.record_circuit(throttled)
+        assert governor.breaker.state == CLOSED
+        assert governor.breaker.failures == 2
+
+        checker.record_circuit(True)
+        assert governor.breaker.state == OPEN
+        assert checker.metrics.circuit_opens.total(host='flaky') == 1
+    finally:
+        checker.close()
@@ -0,0 +1,61 @@
+from modules.availability import AvailabilityResult, StoreAvailability
+from modules.history import AvailabilityHistory
+
+HOUR = 3600
+# 2024-01-01（星期一）00:00 UTC 起，每小時一次觀測
+START = 1704067200
+SEQUENCE = ['available', 'unavailable', 'available', 'available', 'ineligible', 'available', 'unavailable']
+
+
+def record_sequence(history: AvailabilityHistory) -> None:
+    """在兩間店鋪依 SEQUENCE 寫入觀測，第二間店鋪晚一小時。"""
+    for index, display in enumerate(SEQUENCE):
+        for offset, store in enumerate(('信義 A13', '101')):
+            result = AvailabilityResult(
+                parts={'P1': {store: StoreAvailability(store, store, display, f'quote {index}')}},
+                checked_at={'P1': START + (index + offset) * HOUR},
+            )
+            history.record(result)
+
+
+def expected_restocks() -> list:
+    """以 Python 逐筆比對上一次狀態得到的到貨時間。"""
+    restocks = []
+    for offset, store in enumerate(('信義 A13', '101')):
+        for index in range(1, len(SEQUENCE)):
+            if SEQUENCE[index] == 'available' and SEQUENCE[index - 1] != 'available':
+                restocks.append((START + (index + offset) * HOUR, store, f'quote {index}'))
+    return sorted(restocks)
+
+
+def test_restocks_from_transitions(tmp_path):
+    history = AvailabilityHistory(str(tmp_path / 'history.sqlite3'))
+    record_sequence(history)
+    assert history.transitions_ready()
+    assert history.restocks('P1') == expected_restocks()
+    assert history.restocks('P1', store='信義') == [row for row in expected_restocks() if row[1] == '信義 A13']
+    assert dict((name, count) for name, count, _ in history.store_frequencies('P1')) == {'信義 A13': 2, '101': 2}
+    assert sum(history.restock_slot_counts(['P1'])['P1'].values()) == 4
+    history.close()
+
+
+def test_backfill_matches_recorded_transitions(tmp_path):
+    path = str(tmp_path / 'history.sqlite3')
+    history = AvailabilityHistory(path)
+    record_sequence(history)
+    counts = history.restock_slot_counts(['P1'])
+    # 模擬升級前的資料庫：只有觀測，沒有狀態變化
+    history.conn.execute('DELETE FROM transitions')
+    history.conn.execute('DELETE FROM meta')
+    history.conn.commit()
+    history.close()
+
+    history = AvailabilityHistory(path)
+    assert not history.transitions_ready()
+    assert history.restocks('P1') == expected_restocks()  # 尚未補齊時以 LAG() 即時計算
+    assert history.restock_slot_counts(['P1']) == counts
+    assert history.backfill_transitions() == 10
+    assert history.transitions_ready()
+    assert history.restocks('P1') == expected_restocks()
+    assert history.restock_slot_counts(['P1']) == counts
+    history.close()
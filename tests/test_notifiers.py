@@ -0,0 +1,111 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from modules.notifiers import NotificationError, TelegramNotifier, WebhookNotifier, create_notifier
+from modules.notify import NotificationDispatcher
+
+
+class NotifyServer:
+    """本機的通知 API，依序回傳 responses 中的 (狀態碼, 標頭)，用完後回傳 200。"""
+
+    def __init__(self, responses: list = ()):
+        self.responses = list(responses)
+        self.requests = []  # [(路徑, JSON 內容), ...]
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                server.requests.append((self.path, json.loads(body or b'null')))
+                status, headers = server.responses.pop(0) if server.responses else (200, {})
+                payload = b'{}'
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, args=(0.05,), daemon=True)
+
+    def __enter__(self) -> 'NotifyServer':
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def test_retry_after_sets_rate_limit():
+    with NotifyServer([(429, {'Retry-After': '30'})]) as server:
+        notifier = WebhookNotifier(f"{server.url}/hook")
+        with pytest.raises(NotificationError) as error:
+            notifier.send_sync('有現貨')
+        assert error.value.retryable
+        assert 25 < notifier.rate_limited_until - time.time() <= 30
+        notifier.close()
+
+
+def test_exhausted_quota_sets_rate_limit_until_reset():
+    reset = time.time() + 120
+    with NotifyServer([(200, {'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': str(reset)})]) as server:
+        notifier = create_notifier({'type': 'telegram', 'bot_token': 'abc', 'chat_id': '42', 'api_base': server.url})
+        assert isinstance(notifier, TelegramNotifier)
+        notifier.send_sync('有現貨')
+        assert notifier.rate_limited_until == pytest.approx(reset)
+        assert server.requests == [('/botabc/sendMessage', {'chat_id': '42', 'text': '有現貨'})]
+        notifier.close()
+
+
+@pytest.mark.parametrize('status, retryable', [(400, False), (401, False), (429, True), (500, True), (503, True)])
+def test_retry_classification(status, retryable):
+    with NotifyServer([(status, {})]) as server:
+        notifier = WebhookNotifier(server.url)
+        with pytest.raises(NotificationError) as error:
+            notifier.send_sync('有現貨')
+        assert error.value.retryable is retryable
+        notifier.close()
+
+
+def test_connection_error_is_retryable():
+    with NotifyServer() as server:
+        url = server.url
+    notifier = WebhookNotifier(url, timeout=(0.5, 0.5))
+    with pytest.raises(NotificationError) as error:
+        notifier.send_sync('有現貨')
+    assert error.value.retryable
+    notifier.close()
+
+
+def test_dispatcher_coalesces_and_retries():
+    with NotifyServer([(500, {})]) as server:
+        notifier = WebhookNotifier(server.url)
+        dispatcher = NotificationDispatcher([notifier], coalesce_window=0.3, backoff_factor=0.01)
+        delivered = []
+        for message in ('型號 A 有現貨', '型號 B 有現貨', '型號 C 有現貨'):
+            dispatcher.submit(message, on_delivered=delivered.append)
+        dispatcher.stop()
+        # 三則訊息合併成一則，第一次 500 後重試一次
+        assert [body for _, body in server.requests] == [{'text': '型號 A 有現貨\n型號 B 有現貨\n型號 C 有現貨'}] * 2
+        assert delivered == [True, True, True]
+        notifier.close()
+
+
+def test_dispatcher_does_not_retry_client_errors():
+    with NotifyServer([(400, {})]) as server:
+        notifier = WebhookNotifier(server.url)
+        dispatcher = NotificationDispatcher([notifier], coalesce_window=0, backoff_factor=0.01)
+        delivered = []
+        dispatcher.submit('有現貨', on_delivered=delivered.append)
+        dispatcher.stop()
+        assert len(server.requests) == 1
+        assert delivered == [False]
+        notifier.close()
@@ -0,0 +1,53 @@
+from modules.metrics import MetricsRegistry, MonitorMetrics
+from modules.notifiers import Notifier
+from modules.scheduler import AdaptiveScheduler
+from modules.service import MonitorService, Subscription, SubscriptionRegistry
+from modules.stock import StockChecker
+
+
+class RecordingNotifier(Notifier):
+    """記錄收到的訊息。"""
+
+    name = 'recording'
+
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def send_sync(self, message: str) -> None:
+        self.messages.append(message)
+
+
+def payload(stores: dict, part: str) -> dict:
+    """產生 fulfillment-messages 回應，stores 為 {店鋪名稱: pickupDisplay}。"""
+    return {'body': {'content': {'pickupMessage': {'stores': [
+        {'storeName': name, 'storeNumber': name, 'partsAvailability': {part: {'pickupDisplay': display}}}
+        for name, display in stores.items()
+    ]}}}}
+
+
+def test_subscribers_only_notified_about_own_region():
+    responses = {
+        'tw': payload({'信義 A13': 'unavailable'}, 'P1'),
+        'hk': payload({'Causeway Bay': 'available'}, 'P1'),
+    }
+    checker = StockChecker('', json_path='', notifiers=[], scheduler=AdaptiveScheduler(base_interval=0, min_interval=0),
+                           metrics=MonitorMetrics(MetricsRegistry()))
+    checker.fetch_query = lambda query: checker.process_batch(query, responses[query.region], 0.0)
+    checker.dispatcher.coalesce_window = 0
+    registry = SubscriptionRegistry()
+    tw, hk = RecordingNotifier(), RecordingNotifier()
+    tw_subscription = Subscription(token='tw', parts=('P1',), region='tw', anchor_store='R713', notifier=tw)
+    hk_subscription = Subscription(token='hk', parts=('P1',), region='hk', anchor_store='R409', notifier=hk)
+    registry.add(tw_subscription)
+    registry.add(hk_subscription)
+    service = MonitorService(registry, checker)
+    try:
+        service.run_cycle()
+    finally:
+        checker.close()
+
+    assert hk.messages == ['P1 在 Causeway Bay 有現貨！']
+    assert tw.messages == []
+    assert tw_subscription.quota == 3
+    assert hk_subscription.quota == 2
@@ -0,0 +1,77 @@
+import asyncio
+import pytest
+from benchmarks.fake_apple import FakeAppleServer, load_payloads
+from modules.async_stock import AsyncStockChecker
+from modules.governor import HostGovernor
+from modules.metrics import MetricsRegistry, MonitorMetrics
+from modules.stock import StockChecker
+from modules.targets import WatchTarget
+from modules.useragent import UserAgentProvider
+
+
+@pytest.fixture
+def server():
+    server = FakeAppleServer(load_payloads(None)).start()
+    yield server
+    server.stop()
+
+
+def make_checker(server, checker_class=StockChecker, **kwargs) -> StockChecker:
+    return checker_class(
+        '', json_path='', notifiers=[], base_url=server.url, metrics=MonitorMetrics(MetricsRegistry()),
+        governor=HostGovernor('fake', rate=1000, burst=100), user_agent_provider=UserAgentProvider(['test']), **kwargs
+    )
+
+
+def test_unchanged_response_sends_one_conditional_request(server):
+    checker = make_checker(server)
+    query = WatchTarget('tw', 'R713', ('MYW23ZP/A',))
+    try:
+        first = checker.fetch_query(query)
+        assert server.reset_stats()['requests'] == 1
+        for _ in range(3):
+            result = checker.fetch_query(query)
+            assert result.parts == first.parts
+        stats = server.reset_stats()
+        assert stats['requests'] == 3
+        assert stats['not_modified'] == 3
+    finally:
+        checker.close()
+
+
+def test_unparsed_response_is_not_requested_twice(server, monkeypatch):
+    checker = make_checker(server)
+    query = WatchTarget('tw', 'R713', ('MYW23ZP/A',))
+    try:
+        monkeypatch.setattr(checker, 'process_batch', lambda *args: checker.check_availability({}, []))
+        checker.fetch_query(query)
+        monkeypatch.undo()
+        server.reset_stats()
+        for _ in range(2):
+            checker.fetch_query(query)
+        assert server.reset_stats()['requests'] == 2
+    finally:
+        checker.close()
+
+
+def test_payload_cache_is_bounded(server):
+    checker = make_checker(server, payload_cache_size=2)
+    try:
+        for part in ('A', 'B', 'C'):
+            checker.fetch_query(WatchTarget('tw', 'R713', (part,)))
+        assert list(checker.payload_cache) == [(('tw', 'R713', True), ('B',)), (('tw', 'R713', True), ('C',))]
+    finally:
+        checker.close()
+
+
+def test_async_checker_keeps_sync_api(server):
+    checker = make_checker(server, AsyncStockChecker)
+    parts = ['MYW23ZP/A', 'MYW33ZP/A']
+    try:
+        # MonitorService.run_cycle 與同步的 monitor 仍呼叫 fetch_availability，不能拿到 coroutine
+        result = checker.fetch_availability(parts)
+        assert set(result.parts) == set(parts)
+        async_result = asyncio.run(checker.fetch_availability_async(parts))
+        assert async_result.parts == result.parts
+    finally:
+        checker.close()
@@ -1,65 +1,242 @@
 # models.py
+# 於專案根目錄執行：
+#     python -m utils.get_iphone_models                       # 更新 DEFAULT_URLS 中的所有機型
+#     python -m utils.get_iphone_models --url <購買頁面網址> ...  # 只更新指定的頁面
 
+import argparse
 import json
 import logging
 import re
 import requests
-from bs4 import BeautifulSoup
-from fake_useragent import UserAgent
-import json5
 import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from modules.catalog import write_binary_catalog
+from modules.session import create_session, DEFAULT_TIMEOUT
+from modules.useragent import get_user_agent_provider
+
+BOOTSTRAP_MARKER = 'window.PRODUCT_SELECTION_BOOTSTRAP'
+DATA_MARKER = 'productSelectionData:'
+# 掃描大括號時只需要停在這些字元上，其餘字元由 regex 一次跳過
+BRACE_TOKENS = re.compile(r'[{}"\'\\]')
+
+# 預設更新的購買頁面，每個機型 / 地區一個網址
+DEFAULT_URLS = [
+    "https://www.apple.com/tw/shop/buy-iphone/iphone-16",
+    "https://www.apple.com/tw/shop/buy-iphone/iphone-16-pro",
+]
+
+
+@dataclass
+class CatalogDiff:
+    """更新前後型號目錄的差異。"""
+
+    added: list = field(default_factory=list)  # [型號代碼, ...]
+    removed: list = field(default_factory=list)  # [型號代碼, ...]
+    repriced: list = field(default_factory=list)  # [(型號代碼, 舊價格, 新價格), ...]
+    updated: list = field(default_factory=list)  # [型號代碼, ...]，價格以外的欄位有變化
+
+    @property
+    def changed(self) -> bool:
+        """是否有任何變化。"""
+        return bool(self.added or self.removed or self.repriced or self.updated)
+
+    def summary(self) -> str:
+        """
+        整理成可讀的報告。
+
+        Returns:
+            str: 多行文字，沒有變化時為一行說明。
+        """
+        if not self.changed:
+            return "型號目錄沒有變化。"
+        lines = [f"新增 {len(self.added)} 個、移除 {len(self.removed)} 個、"
+                 f"價格變動 {len(self.repriced)} 個、其他變動 {len(self.updated)} 個型號。"]
+        lines += [f"  + {code}" for code in self.added]
+        lines += [f"  - {code}" for code in self.removed]
+        lines += [f"  $ {code}: {old} → {new}" for code, old, new in self.repriced]
+        lines += [f"  * {code}" for code in self.updated]
+        return "\n".join(lines)
 
 
 class IPhoneModelsManager:
     """管理 iPhone 型號資訊的類別。"""
 
-    def __init__(self, json_path: str, url: str):
+    def __init__(self, json_path: str, url: str = None, session: requests.Session = None, binary_path: str = None):
         """
         初始化 IPhoneModelsManager 實例。
 
         Args:
             json_path (str): 型號 JSON 檔案的路徑。
+            url (str): 要抓取的 Apple 購買頁面網址，為 None 時 update_models 更新 DEFAULT_URLS。
+            session (requests.Session): 共用的 HTTP Session，未提供時自行建立。
+            binary_path (str): 同時產生的二進位目錄路徑，預設為 json_path 副檔名換成 .bin，空字串表示不產生。
         """
         self.json_path = json_path
+        self.binary_path = f"{os.path.splitext(json_path)[0]}.bin" if binary_path is None else binary_path
         self.models ={}
         self.url = url
+        self.session = session or create_session()
     
-    def update_models(self):
+    def update_models(self) -> CatalogDiff:
         """
         更新 iPhone 型號資訊。
+
+        Returns:
+            CatalogDiff: 與現有型號目錄的差異。
+        """
+        return self.refresh([self.url] if self.url else None)
+
+    def fetch_models(self, url: str) -> dict:
+        """
+        下載單一購買頁面並提取其中的型號。
+
+        Args:
+            url (str): Apple 購買頁面網址。
+
+        Returns:
+            dict: {型號代碼: 型號資訊}，失敗時返回 None。
         """
         # 獲取頁面內容
-        html_content = self.get_page_content(self.url)
+        html_content = self.get_page_content(url)
         if html_content is None:
-            logging.error("無法獲取頁面內容，更新失敗。")
-            return
-    
+            logging.error(f"無法獲取頁面內容：{url}")
+            return None
+
         # 提取 PRODUCT_SELECTION_BOOTSTRAP 資料
         product_selection_data = self.extract_product_selection_bootstrap(html_content)
         if product_selection_data is None:
-            logging.error("無法提取 PRODUCT_SELECTION_BOOTSTRAP 資料，更新失敗。")
-            return
-        
+            logging.error(f"無法提取 PRODUCT_SELECTION_BOOTSTRAP 資料：{url}")
+            return None
+
         # 提取機身型號資訊
-        self.models = self.get_product_models(product_selection_data)
-        if not self.models:
-            logging.error("無法提取機身型號資訊，更新失敗。")
-            return
-        logging.info("成功更新 iPhone 型號資訊。")
-        
-        # 如果存在，則保存型號資訊到 JSON 檔案
-        if os.path.exists(self.json_path):
-            with open(self.json_path, 'r', encoding='utf-8') as f:
-                ex_data = json.load(f)
-                ex_data.update(self.models)
-        
-        with open(self.json_path, 'w', encoding='utf-8') as f:
-            json.dump(ex_data, f, ensure_ascii=False, indent=4)
-            logging.info(f"已將型號資訊保存到 {self.json_path}。")
-    
+        models = self.get_product_models(product_selection_data)
+        if not models:
+            logging.error(f"無法提取機身型號資訊：{url}")
+            return None
+        return models
+
+    def load_existing(self) -> dict:
+        """
+        載入現有的型號目錄。
+
+        Returns:
+            dict: {型號代碼: 型號資訊}，檔案不存在時返回空字典。
+        """
+        if not os.path.exists(self.json_path):
+            return {}
+        with open(self.json_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    @staticmethod
+    def diff_models(existing: dict, fetched: dict) -> tuple:
+        """
+        將新抓取的型號合併到現有目錄。
+        只有已成功更新的機型（依機型名稱與貨幣區分地區）會移除不再出現的型號，其餘型號保持不變。
+
+        Args:
+            existing (dict): 現有的型號目錄。
+            fetched (dict): 本次抓取到的型號。
+
+        Returns:
+            tuple: (合併後的型號目錄, CatalogDiff)。
+        """
+        refreshed = {(info['name'], info['currency']) for info in fetched.values()}
+        merged = {code: info for code, info in existing.items()
+                  if code in fetched or (info.get('name'), info.get('currency')) not in refreshed}
+        diff = CatalogDiff(removed=sorted(code for code in existing if code not in merged))
+        for code, info in fetched.items():
+            old = existing.get(code)
+            if old is None:
+                diff.added.append(code)
+            elif old.get('price') != info['price']:
+                diff.repriced.append((code, old.get('price'), info['price']))
+            elif old != info:
+                diff.updated.append(code)
+            merged[code] = info
+        return merged, diff
+
+    def refresh(self, urls: list = None, max_workers: int = 4) -> CatalogDiff:
+        """
+        同時下載多個購買頁面，與現有目錄比對後只在有變化時寫入。
+
+        Args:
+            urls (list): 購買頁面網址，預設為 DEFAULT_URLS。
+            max_workers (int): 同時下載的頁面數量。
+
+        Returns:
+            CatalogDiff: 與現有型號目錄的差異，所有頁面都失敗時為 None。
+        """
+        urls = list(dict.fromkeys(urls or DEFAULT_URLS))
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(urls)))) as executor:
+            results = list(executor.map(self.fetch_models, urls))
+        fetched = {}
+        for models in results:
+            fetched.update(models or {})
+        if not fetched:
+            logging.error("所有頁面都更新失敗。")
+            return None
+        logging.info(f"成功更新 {sum(1 for models in results if models)}/{len(urls)} 個頁面，共 {len(fetched)} 個型號。")
+
+        merged, diff = self.diff_models(self.load_existing(), fetched)
+        self.models = merged
+        logging.info(diff.summary())
+        if diff.changed:
+            self.save(merged)
+        if diff.changed or self.binary_outdated():
+            self.compile_binary(merged)
+        return diff
+
+    def binary_outdated(self) -> bool:
+        """
+        二進位目錄是否不存在或比 JSON 檔案舊。
+
+        Returns:
+            bool: 是否需要重新產生，未設定 binary_path 時為 False。
+        """
+        if not self.binary_path:
+            return False
+        try:
+            return os.stat(self.binary_path).st_mtime_ns < os.stat(self.json_path).st_mtime_ns
+        except OSError:
+            return True
+
+    def compile_binary(self, models: dict = None) -> bool:
+        """
+        由型號目錄產生 ModelCatalog 可快速載入的二進位目錄。
+
+        Args:
+            models (dict): 完整的型號目錄，預設讀取 json_path。
+
+        Returns:
+            bool: 是否成功產生。
+        """
+        if not self.binary_path:
+            return False
+        try:
+            write_binary_catalog(self.load_existing() if models is None else models, self.binary_path)
+        except (OSError, ValueError, KeyError) as e:
+            logging.error(f"產生二進位目錄失敗：{e}")
+            return False
+        logging.info(f"已產生二進位目錄 {self.binary_path}。")
+        return True
+
+    def save(self, models: dict) -> None:
+        """
+        先寫入暫存檔再取代，避免寫到一半中斷造成型號檔案損毀。
+
+        Args:
+            models (dict): 完整的型號目錄。
+        """
+        tmp_path = f"{self.json_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(models, f, ensure_ascii=False, indent=4)
+        os.replace(tmp_path, self.json_path)
+        logging.info(f"已將型號資訊保存到 {self.json_path}。")
+
     def find_matching_brace(self, s: str, start_index: int) -> int:
         """
-        在字串中尋找與起始索引對應的右大括號位置。
+        在字串中尋找與起始索引對應的右大括號位置，會略過引號字串內的大括號與跳脫字元。
 
         Args:
             s (str): 要搜尋的字串。
@@ -68,15 +245,28 @@ class IPhoneModelsManager:
         Returns:
             int: 對應的右大括號的索引，若未找到則返回 -1。
         """
-        brace_stack = []
-        for i in range(start_index, len(s)):
-            if s[i] == '{':
-                brace_stack.append('{')
-            elif s[i] == '}':
-                brace_stack.pop()
-                if not brace_stack:
-                    return i
-        return -1
+        depth = 0
+        quote = None  # 目前所在字串的引號字元，不在字串中時為 None
+        pos = start_index
+        while True:
+            match = BRACE_TOKENS.search(s, pos)
+            if match is None:
+                return -1
+            char = match.group()
+            pos = match.end()
+            if quote is not None:
+                if char == '\\':
+                    pos += 1  # 跳過被跳脫的字元
+                elif char == quote:
+                    quote = None
+            elif char in '"\'':
+                quote = char
+            elif char == '{':
+                depth += 1
+            elif char == '}':
+                depth -= 1
+                if depth == 0:
+                    return match.start()
 
     def fix_json(self, json_str: str) -> str:
         """
@@ -104,12 +294,11 @@ class IPhoneModelsManager:
             str: 網頁內容，若請求失敗則返回 None。
         """
         try:
-            ua = UserAgent()
             headers = {
-                'User-Agent': ua.random, # 使用隨機 User-Agent
+                'User-Agent': get_user_agent_provider().get(), # 使用輪替的 User-Agent
                 'Accept-Language': 'zh-TW,zh;q=0.9,en-US;q=0.8,en;q=0.7',
             }
-            response = requests.get(url, headers=headers, timeout=10)
+            response = self.session.get(url, headers=headers, timeout=DEFAULT_TIMEOUT)
             response.raise_for_status()
             logging.info(f"成功獲取頁面內容：{url}")
             return response.text
@@ -120,6 +309,7 @@ class IPhoneModelsManager:
     def extract_product_selection_bootstrap(self, html_content: str) -> dict:
         """
         從頁面 HTML 中提取 window.PRODUCT_SELECTION_BOOTSTRAP 的內容。
+        直接在原始 HTML 中搜尋標記，不建立 DOM 樹；先以標準 json 解析，失敗時才改用較慢的 json5。
 
         Args:
             html_content (str): 網頁的 HTML 內容。
@@ -127,40 +317,48 @@ class IPhoneModelsManager:
         Returns:
             dict: 解析後的 PRODUCT_SELECTION_BOOTSTRAP 資料，若解析失敗則返回 None。
         """
-        soup = BeautifulSoup(html_content, 'html.parser')
-        scripts = soup.find_all('script')
+        bootstrap = html_content.find(BOOTSTRAP_MARKER)
+        if bootstrap == -1:
+            logging.error(f"未找到 '{BOOTSTRAP_MARKER}'")
+            return None
+        start = html_content.find(DATA_MARKER, bootstrap) # 尋找 'productSelectionData:'
+        if start == -1:
+            logging.error(f"未找到 '{DATA_MARKER}'")
+            return None
 
-        for script in scripts:
-            script_content = script.string
-            if script_content is None:
+        start_json = start + len(DATA_MARKER)
+        while start_json < len(html_content) and html_content[start_json] in ' \n\r\t':
+            start_json += 1
+        if html_content[start_json:start_json + 1] != '{':
+            logging.error("JSON 數據未以 '{' 開始")
+            return None
+        end_json = self.find_matching_brace(html_content, start_json)
+        if end_json == -1:
+            logging.error("未找到匹配的結束大括號")
+            return None
+        json_str = html_content[start_json:end_json + 1]
+
+        # 大多數情況下修正後已是合法 JSON，以標準 json 解析即可
+        for candidate in (json_str, self.fix_json(json_str)):
+            try:
+                data = json.loads(candidate)
+                logging.info("成功提取 PRODUCT_SELECTION_BOOTSTRAP 資料")
+                return data
+            except ValueError:
                 continue
-            if 'window.PRODUCT_SELECTION_BOOTSTRAP' in script_content:
-                start = script_content.find('productSelectionData:') # 尋找 'productSelectionData:'
-                if start == -1:
-                    logging.error("未找到 'productSelectionData:'")
-                    return None
-                else:
-                    start_json = start + len('productSelectionData:')
-                    while script_content[start_json] in ' \n\r\t':
-                        start_json += 1
-                    if script_content[start_json] != '{':
-                        logging.error("JSON 數據未以 '{' 開始")
-                        return None
-                    end_json = self.find_matching_brace(script_content, start_json)
-                    if end_json == -1:
-                        logging.error("未找到匹配的結束大括號")
-                        return None
-                    json_str = script_content[start_json:end_json+1]
-                    json_str = self.fix_json(json_str)
-                    try:
-                        data = json5.loads(json_str)
-                        logging.info("成功提取 PRODUCT_SELECTION_BOOTSTRAP 資料")
-                        return data
-                    except json.JSONDecodeError as e:
-                        logging.error(f"JSON 解析錯誤: {e}")
-                        return None
-        return None
-    
+        try:
+            import json5
+        except ImportError:
+            logging.error("JSON 解析錯誤，且未安裝 json5 無法改用寬鬆解析。")
+            return None
+        try:
+            data = json5.loads(json_str)  # json5 本身支援單引號與未加引號的鍵，fix_json 會破壞字串中的撇號
+            logging.info("成功提取 PRODUCT_SELECTION_BOOTSTRAP 資料")
+            return data
+        except ValueError as e:
+            logging.error(f"JSON 解析錯誤: {e}")
+            return None
+
     def get_product_models(self, product_selection_data: dict) -> dict  :
             """
             從 PRODUCT_SELECTION_BOOTSTRAP 資料中提取機身型號或其他相關資訊。
@@ -223,14 +421,32 @@ class IPhoneModelsManager:
                 logging.error(f"提取機身型號時出錯：{e}")
                 return {}
 
+def main(argv: list = None) -> int:
+    """
+    更新型號目錄的命令列工具。
+
+    Args:
+        argv (list): 命令列參數，預設為 sys.argv[1:]。
+
+    Returns:
+        int: 結束代碼，所有頁面都失敗時為 1。
+    """
+    parser = argparse.ArgumentParser(prog='python -m utils.get_iphone_models', description='更新 iPhone 型號目錄')
+    parser.add_argument('--url', action='append', dest='urls', help='購買頁面網址，可重複指定（預設為 DEFAULT_URLS）')
+    parser.add_argument('--json', default='resources/iphone_models.json', help='型號 JSON 檔案路徑')
+    parser.add_argument('--workers', type=int, default=4, help='同時下載的頁面數量（預設 4）')
+    parser.add_argument('--binary', help='二進位目錄路徑（預設為 JSON 路徑換成 .bin）')
+    parser.add_argument('--no-binary', action='store_true', help='不產生二進位目錄')
+    parser.add_argument('--compile-only', action='store_true', help='不下載頁面，只由現有 JSON 產生二進位目錄')
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    manager = IPhoneModelsManager(json_path=args.json, binary_path='' if args.no_binary else args.binary)
+    if args.compile_only:
+        return 0 if manager.compile_binary() else 1
+    diff = manager.refresh(args.urls, max_workers=args.workers)
+    return 1 if diff is None else 0
+
+
 if __name__ == "__main__":
-    
-    # iphone_manager = IPhoneModelsManager(
-    #     json_path = "resources/iphone_models.json",
-    #     url = "https://www.apple.com/tw/shop/buy-iphone/iphone-16-pro"
-    # )
-    iphone_manager = IPhoneModelsManager(
-        json_path = "resources/iphone_models.json",
-        url = "https://www.apple.com/tw/shop/buy-iphone/iphone-16"
-    )
-    iphone_manager.update_models()
\ No newline at end of file
+    raise SystemExit(main())